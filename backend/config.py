@@ -21,9 +21,38 @@ PLAYGROUND_DIR = DATA_DIR / "playground"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 PLAYGROUND_DIR.mkdir(parents=True, exist_ok=True)
 
+# --- Database ---
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))  # wait this long for a lock
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "64"))             # max writes per group commit
+
 # --- OpenAI ---
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))                          # seconds per request
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))            # shared pool (backend/services/llm.py)
+LLM_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_KEEPALIVE_CONNECTIONS", "10"))  # idle connections kept open
+
+# --- LLM governor: every model call queues here (backend/services/llm.py) ---
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "6"))        # weight units in flight (wake turn 2, echo 1)
+LLM_TPM = int(os.getenv("LLM_TPM", "30000"))                    # tokens per minute, your account's limit
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))        # on 429, 5xx and connection errors
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))    # seconds, doubling, fully jittered
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))      # consecutive 5xx / timeouts to open
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "60"))   # seconds open before one probe call
+
+
+def _model_chain(env: str, default: str) -> list[str]:
+    return [m.strip() for m in os.getenv(env, default).split(",") if m.strip()]
+
+
+# --- Model routing: task → models, preferred first, the rest are fallbacks while it's rate-limited ---
+LLM_ROUTES = {
+    "wake_turn": _model_chain("LLM_ROUTE_WAKE", f"{OPENAI_MODEL},gpt-4o-mini"),
+    "echo": _model_chain("LLM_ROUTE_ECHO", "gpt-4o-mini,gpt-4.1-mini"),        # ~80-token rewrites
+    "summary": _model_chain("LLM_ROUTE_SUMMARY", "gpt-4o-mini,gpt-4.1-mini"),  # compaction summaries
+    "digest": _model_chain("LLM_ROUTE_DIGEST", "gpt-4o-mini,gpt-4.1-mini"),
+}
 
 # --- Mock mode: no API key = local testing with fake data ---
 MOCK_MODE = not OPENAI_API_KEY or OPENAI_API_KEY == "sk-your-key-here"
@@ -41,6 +70,8 @@ WAKE_TIMES = [
     {"hour": 21, "minute": 0, "session_type": "night"},
 ]
 
+SCHEDULER_LEASE_TTL = float(os.getenv("SCHEDULER_LEASE_TTL", "30"))  # leader failover time across workers
+
 # --- Admin ---
 ADMIN_SECRET = os.getenv("ADMIN_SECRET", "change-me-in-production")
 
@@ -57,10 +88,60 @@ TOTP_ISSUER = os.getenv("TOTP_ISSUER", "GPT Home Admin")
 # --- Agentic wake loop ---
 MAX_WAKE_TURNS = int(os.getenv("MAX_WAKE_TURNS", "20"))       # max tool-call turns per wake
 GPT_TEMPERATURE = float(os.getenv("GPT_TEMPERATURE", "0.6"))  # lower = less poetic drift
+WAKE_TURN_TIMEOUT = float(os.getenv("WAKE_TURN_TIMEOUT", "90"))  # seconds per model call attempt
+WAKE_DEADLINE = float(os.getenv("WAKE_DEADLINE", "600"))         # seconds for the whole wake loop
+WAKE_RESUME_WINDOW = float(os.getenv("WAKE_RESUME_WINDOW", "7200"))  # older interrupted wakes are closed, not resumed
+WAKE_LEASE_TTL = float(os.getenv("WAKE_LEASE_TTL", "60"))  # a crashed wake's lock frees itself after this
 
 # --- Rate limiting ---
 VISITOR_RATE_LIMIT = int(os.getenv("VISITOR_RATE_LIMIT", "5"))       # max messages
 VISITOR_RATE_WINDOW = int(os.getenv("VISITOR_RATE_WINDOW", "3600"))   # per seconds
+BAN_REFRESH_SECONDS = float(os.getenv("BAN_REFRESH_SECONDS", "5"))     # bans from other processes apply after this
+API_RATE_LIMITS = {  # requests per minute per visitor, by route class (backend/middleware.py)
+    "read": int(os.getenv("API_RATE_READ", "300")),
+    "heavy": int(os.getenv("API_RATE_HEAVY", "60")),    # analytics, simulation history
+    "write": int(os.getenv("API_RATE_WRITE", "30")),
+    "stream": int(os.getenv("API_RATE_STREAM", "10")),  # SSE connects
+}
+
+# --- Load shedding (503 + Retry-After when the server is saturated) ---
+SHED_QUEUE_DEPTH = int(os.getenv("SHED_QUEUE_DEPTH", "40"))   # requests waiting for a worker thread
+SHED_P95_MS = float(os.getenv("SHED_P95_MS", "2000"))         # p95 time to first byte, last 10s
+SHED_RETRY_AFTER = int(os.getenv("SHED_RETRY_AFTER", "5"))    # seconds
+
+# --- Near-duplicate visitor messages (backend/services/dedup.py) ---
+DEDUP_WINDOW_HOURS = float(os.getenv("DEDUP_WINDOW_HOURS", "24"))  # compare against messages this recent
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.55"))    # estimated Jaccard to count as a copy
+DEDUP_MIN_CHARS = int(os.getenv("DEDUP_MIN_CHARS", "24"))          # shorter messages are never compared
+DEDUP_REFRESH_SECONDS = float(os.getenv("DEDUP_REFRESH_SECONDS", "2"))  # other processes' messages count after this
+
+# --- Security rescan (POST /api/admin/security/rescan) ---
+RESCAN_CHUNK_SIZE = int(os.getenv("RESCAN_CHUNK_SIZE", "500"))             # messages per read / hide batch
+RESCAN_WORKERS = int(os.getenv("RESCAN_WORKERS", "0")) or os.cpu_count() or 1  # checker processes
+
+# --- Background jobs (backend/services/jobs.py) ---
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))                # jobs run at once by one process
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "8"))        # jobs running at once, all processes
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))  # a crashed worker's job is retried after this
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))      # then it's dead-lettered
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "10"))   # seconds before the first retry, doubling
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "3600"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))    # idle poll for delayed / other-process jobs
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))  # finished jobs are purged after this
+
+# --- Worker (backend/worker.py): scheduler, wakes and jobs run in `python -m backend.worker` ---
+# 1 = the API process runs them itself instead (local development, single-process setups)
+EMBEDDED_WORKER = os.getenv("EMBEDDED_WORKER", "0").lower() in ("1", "true", "yes")
+
+# --- Echo batching (backend/services/echo.py) ---
+ECHO_BATCH_WINDOW = float(os.getenv("ECHO_BATCH_WINDOW", "0.3"))  # seconds to wait for more messages
+ECHO_BATCH_MAX = int(os.getenv("ECHO_BATCH_MAX", "8"))            # messages per LLM request
+ECHO_MEMO_SIZE = int(os.getenv("ECHO_MEMO_SIZE", "2048"))         # repeated messages' fragments kept in memory
+ECHO_MEMO_MAX_ROWS = int(os.getenv("ECHO_MEMO_MAX_ROWS", "50000"))  # ... and in SQLite (least recently used go)
+
+# --- Change log (CDC) ---
+CHANGES_RETENTION_DAYS = int(os.getenv("CHANGES_RETENTION_DAYS", "30"))  # compact older rows
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "1"))  # other processes' writes reach /mind this fast
 
 # --- API ---
 API_PREFIX = "/api"
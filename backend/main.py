@@ -1,8 +1,9 @@
 """
 GPT Home — FastAPI Application
 
-The entry point. Mounts all routers, starts the scheduler,
-and provides a manual wake-up endpoint for testing.
+The entry point. Mounts all routers and provides a manual wake-up
+endpoint for testing. The scheduler, wakes and background jobs run in
+the worker process (backend/worker.py), or in here with EMBEDDED_WORKER=1.
 """
 
 import logging
@@ -11,12 +12,16 @@ from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend import scheduler
-from backend.config import ADMIN_SECRET, API_PREFIX, CORS_ORIGINS, MOCK_MODE
+from backend import worker
+from backend.config import ADMIN_SECRET, API_PREFIX, CORS_ORIGINS, EMBEDDED_WORKER, MOCK_MODE
+from backend.middleware import RateLimitMiddleware
 from backend.routers import admin, analytics, auth, dreams, echoes, pages, playground, room, simulation, thoughts, visitor
 from backend.routers.auth import require_admin_auth
-from backend.services.gpt_mind import wake_up
-from backend.services.storage import init_db, read_memory, count_entries
+from backend.services import llm
+from backend.services.change_feed import feed as change_feed
+from backend.services.events import bus
+from backend.services.simulation import activity
+from backend.services.storage import close_writer, init_db, read_memory, count_entries, snapshot_reads
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +33,11 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize DB and start scheduler on startup."""
+    """Initialize DB (and the embedded worker, if configured) on startup."""
     init_db()
+    bus.bind()
+    await change_feed.start()  # writes from the worker and other API processes
+    await activity.start()
     mode = "MOCK (kein API Key)" if MOCK_MODE else "LIVE"
     logger.info("GPT's Home startet... [%s]", mode)
     if not ADMIN_SECRET or ADMIN_SECRET == "change-me-in-production":
@@ -45,9 +53,17 @@ async def lifespan(app: FastAPI):
             raise SystemExit(1)
     if MOCK_MODE:
         logger.info("Tipp: 'python -m backend.seed' für Demo-Daten, POST /api/wake zum Testen")
-    scheduler.start()
+    if EMBEDDED_WORKER:
+        await worker.start()
+    else:
+        logger.info("Wakes und Jobs laufen im Worker: python -m backend.worker")
     yield
-    scheduler.stop()
+    if EMBEDDED_WORKER:
+        await worker.stop()
+    await change_feed.stop()
+    await activity.stop()
+    await llm.aclose()
+    close_writer()
 
 
 app = FastAPI(
@@ -57,12 +73,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# --- Rate limiting & load shedding (added first so CORS wraps its 429/503s) ---
+app.add_middleware(RateLimitMiddleware)
+
 # --- CORS (Next.js frontend) ---
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
     allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "X-Admin-Key"],
+    expose_headers=["Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining"],
 )
 
 # --- Routers ---
@@ -91,7 +111,7 @@ def root():
     }
 
 
-@app.get("/api/status")
+@app.get("/api/status", dependencies=[Depends(snapshot_reads)])
 def status():
     """Overview of GPT's current state."""
     memory = read_memory()
@@ -108,18 +128,13 @@ def status():
     }
 
 
-@app.post("/api/wake", dependencies=[Depends(require_admin_auth)])
-async def manual_wake():
-    """Manually trigger a wake cycle. Requires admin authentication.
+@app.post("/api/wake", status_code=202, dependencies=[Depends(require_admin_auth), Depends(admin.manual_wake_cooldown)])
+def manual_wake():
+    """Queue a wake cycle; poll GET /api/wake/{job_id}. Requires admin authentication.
     Shares cooldown with admin/wake to prevent cost abuse."""
-    from backend.routers.admin import _last_manual_wake, _WAKE_COOLDOWN
-    import time as _time
-    now = _time.time()
-    if now - _last_manual_wake < _WAKE_COOLDOWN:
-        from fastapi import HTTPException as _Exc
-        remaining = int(_WAKE_COOLDOWN - (now - _last_manual_wake))
-        raise _Exc(status_code=429, detail=f"Wake cooldown active. Try again in {remaining}s.")
-    import backend.routers.admin as _adm
-    _adm._last_manual_wake = now
-    result = await wake_up()
-    return result
+    return admin.queue_manual_wake()
+
+
+@app.get("/api/wake/{job_id}", dependencies=[Depends(require_admin_auth)])
+def manual_wake_status(job_id: int):
+    return admin.wake_status(job_id)
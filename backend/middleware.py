@@ -0,0 +1,170 @@
+"""
+GPT Home — Rate Limiting & Load Shedding Middleware
+
+Pure ASGI middleware in front of every /api route:
+
+1. Per-route-class budgets. Each request is sorted into a class (read,
+   heavy, write, stream) and counted against that class's GCRA bucket for
+   the visitor's fingerprint — the same IP + user-agent hash the visitor
+   router uses. Over budget → 429 with Retry-After.
+
+2. Adaptive load shedding. Sync endpoints run on AnyIO's worker thread
+   pool; once it's full, new requests queue up behind it. If too many are
+   waiting, or p95 time-to-first-byte over the last few seconds is above
+   the threshold, new requests get 503 with Retry-After instead of joining
+   the queue. Only recent samples count, so shedding lifts by itself once
+   the backlog drains.
+
+The health check ("/", /api/status), admin and auth routes and CORS
+preflights are exempt: admins must be able to see and fix an overloaded
+server, and login has its own limiter.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from collections import deque
+
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.config import API_PREFIX, API_RATE_LIMITS, SHED_P95_MS, SHED_QUEUE_DEPTH, SHED_RETRY_AFTER
+from backend.services.metrics import metrics
+from backend.services.rate_limit import GcraLimiter, client_fingerprint
+
+logger = logging.getLogger(__name__)
+
+_EXEMPT_PATHS = {"/", f"{API_PREFIX}/status"}
+_EXEMPT_PREFIXES = (f"{API_PREFIX}/admin", f"{API_PREFIX}/auth")
+_HEAVY_PREFIXES = (f"{API_PREFIX}/analytics", f"{API_PREFIX}/simulation/history")
+_STREAM_PATHS = {f"{API_PREFIX}/simulation/stream"}
+
+_LATENCY_WINDOW = 10.0   # seconds of samples behind the p95
+_P95_REFRESH = 0.5       # recompute p95 at most this often
+_SHED_LOG_INTERVAL = 5.0  # log shedding at most this often
+
+
+def route_class(method: str, path: str) -> str | None:
+    """The rate-limit class for a request, or None if it's exempt."""
+    if method == "OPTIONS" or path in _EXEMPT_PATHS or path.startswith(_EXEMPT_PREFIXES):
+        return None
+    if path in _STREAM_PATHS:
+        return "stream"
+    if method not in ("GET", "HEAD"):
+        return "write"
+    if path.startswith(_HEAVY_PREFIXES):
+        return "heavy"
+    return "read"
+
+
+class _Latency:
+    """Time-to-first-byte samples from the last _LATENCY_WINDOW seconds."""
+
+    def __init__(self) -> None:
+        self._samples: deque[tuple[float, float]] = deque(maxlen=4096)
+        self._p95: float | None = None
+        self._computed = 0.0
+        self._histogram = metrics.histogram("http.ttfb_ms")
+
+    def observe(self, now: float, ms: float) -> None:
+        self._samples.append((now, ms))
+        self._histogram.observe(ms)
+
+    def p95(self, now: float) -> float | None:
+        if now - self._computed >= _P95_REFRESH:
+            cutoff = now - _LATENCY_WINDOW
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            values = sorted(ms for _, ms in self._samples)
+            self._p95 = values[min(len(values) - 1, int(0.95 * len(values)))] if values else None
+            self._computed = now
+        return self._p95
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[str, int] = API_RATE_LIMITS,
+        shed_queue_depth: int = SHED_QUEUE_DEPTH,
+        shed_p95_ms: float = SHED_P95_MS,
+    ) -> None:
+        self.app = app
+        self.limiters = {
+            name: GcraLimiter(per_minute, 60, name=f"http.{name}")
+            for name, per_minute in limits.items()
+        }
+        self.shed_queue_depth = shed_queue_depth
+        self.shed_p95_ms = shed_p95_ms
+        self._latency = _Latency()
+        self._shed = metrics.counter("http.shed")
+        self._last_shed_log = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        cls = route_class(scope["method"], scope["path"])
+        limiter = self.limiters.get(cls) if cls else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or ())
+        client = scope.get("client")
+        fingerprint = client_fingerprint(
+            client[0] if client else None,
+            headers.get(b"user-agent", b"").decode("latin-1"),
+        )
+        allowed, remaining, retry_after = limiter.take(fingerprint)
+        if not allowed:
+            await _reject(send, 429, "Too many requests. Slow down a little.", retry_after, limiter.limit)
+            return
+
+        start = time.monotonic()
+        reason = self._overloaded(start)
+        if reason:
+            self._shed.inc()
+            if start - self._last_shed_log >= _SHED_LOG_INTERVAL:
+                self._last_shed_log = start
+                logger.warning("Shedding load (%s): %s %s", reason, scope["method"], scope["path"])
+            await _reject(send, 503, "Busy right now. Please try again shortly.", SHED_RETRY_AFTER)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.monotonic()
+                self._latency.observe(now, (now - start) * 1000)
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-ratelimit-limit", str(limiter.limit).encode()),
+                    (b"x-ratelimit-remaining", str(remaining).encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _overloaded(self, now: float) -> str | None:
+        waiting = anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting
+        if waiting >= self.shed_queue_depth:
+            return f"{waiting} requests waiting for a worker thread"
+        p95 = self._latency.p95(now)
+        if p95 is not None and p95 >= self.shed_p95_ms:
+            return f"p95 time to first byte {p95:.0f} ms"
+        return None
+
+
+async def _reject(send: Send, status: int, detail: str, retry_after: float, limit: int | None = None) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+    ]
+    if limit is not None:
+        headers += [(b"x-ratelimit-limit", str(limit).encode()), (b"x-ratelimit-remaining", b"0")]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,54 @@
+"""
+GPT Home — Migration Command
+
+Applies pending schema migrations (backend/migrations) to the database.
+The server does the same on startup; running this first during a deploy
+keeps long backfills out of the startup path.
+
+Usage:
+    python -m backend.migrate             # apply pending migrations
+    python -m backend.migrate --dry-run   # list what would run
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+
+from backend import migrations
+from backend.config import DB_PATH
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.migrate", description=__doc__.split("\n\n")[1])
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    parser.add_argument("--db", default=str(DB_PATH), help=f"database path (default: {DB_PATH})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA recursive_triggers=ON")
+        current = migrations.current_version(conn)
+        todo = migrations.pending(conn)
+        print(f"Database: {args.db}")
+        print(f"Schema version: {current}")
+        if not todo:
+            print("Up to date.")
+            return 0
+        print(f"Pending migrations ({len(todo)}):")
+        for mig in todo:
+            print(f"  {mig.version:03d}  {mig.name:<28} {mig.description}")
+        if args.dry_run:
+            return 0
+        ran = migrations.migrate(conn)
+        print(f"Applied {len(ran)} migration(s); schema version is now {migrations.current_version(conn)}.")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+GPT Home — Schema Migrations
+
+Versioned, ordered schema changes for the SQLite database.
+
+Each migration is a module in this package named mNNN_<slug>.py that
+defines `up(m: Migrator)`. The module docstring's first line is its
+description. Applied versions are recorded in `schema_version`, so every
+migration runs exactly once per database:
+
+    m001_initial.py            → version 1
+    m002_integer_timestamps.py → version 2
+
+Migrations must be safe to re-run from the start. Long backfills commit
+between batches, so a migration interrupted halfway is not recorded and
+picks up where it left off on the next start.
+
+Run pending migrations ahead of a deploy (or just see what would run) with:
+    python -m backend.migrate [--dry-run]
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import pkgutil
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_MODULE_RE = re.compile(r"^m(\d{3})_(\w+)$")
+
+BACKFILL_BATCH = 5000
+_PROGRESS_INTERVAL = 2.0  # seconds between backfill progress log lines
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    description: str
+    up: Callable[[Migrator], None]
+
+
+def discover() -> list[Migration]:
+    """All migration modules in this package, ordered by version."""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        match = _MODULE_RE.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        doc = (module.__doc__ or "").strip()
+        migrations.append(Migration(
+            version=int(match.group(1)),
+            name=info.name,
+            description=doc.splitlines()[0] if doc else match.group(2).replace("_", " "),
+            up=module.up,
+        ))
+    migrations.sort(key=lambda mig: mig.version)
+    versions = [mig.version for mig in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+class Migrator:
+    """What a migration's up() gets: the connection plus schema helpers."""
+
+    def __init__(self, conn: sqlite3.Connection, migration: Migration) -> None:
+        self.conn = conn
+        self.migration = migration
+
+    def execute(self, sql: str, params: tuple | list = ()) -> sqlite3.Cursor:
+        return self.conn.execute(sql, params)
+
+    def script(self, sql: str) -> None:
+        """
+        Run several statements inside the migration's transaction.
+        (conn.executescript would COMMIT first.)
+        """
+        statement = ""
+        for line in sql.splitlines(keepends=True):
+            statement += line
+            if sqlite3.complete_statement(statement):
+                self.conn.execute(statement)
+                statement = ""
+        if statement.strip():
+            raise ValueError(f"Incomplete SQL statement in {self.migration.name}: {statement!r}")
+
+    def commit(self) -> None:
+        """Commit work so far and start a new write transaction."""
+        self.conn.execute("COMMIT")
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def has_column(self, table: str, column: str) -> bool:
+        return any(r[1] == column for r in self.conn.execute(f"PRAGMA table_info({table})"))
+
+    def add_column(self, table: str, column: str, decl: str) -> bool:
+        """ALTER TABLE ... ADD COLUMN unless it already exists. Returns True if added."""
+        if self.has_column(table, column):
+            return False
+        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+        return True
+
+    def create_index(self, name: str, table: str, columns: str, unique: bool = False) -> None:
+        """Create an index if missing, logging how long the build took."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+        ).fetchone()
+        if exists:
+            return
+        start = time.perf_counter()
+        self.conn.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table}({columns})"
+        )
+        rows = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        logger.info(
+            "[%s] built index %s on %d rows in %.0f ms",
+            self.migration.name, name, rows, (time.perf_counter() - start) * 1000,
+        )
+
+    def backfill(
+        self,
+        table: str,
+        column: str,
+        source: str,
+        compute: Callable[[Any], Any],
+        default: Any = None,
+        batch_size: int = BACKFILL_BATCH,
+    ) -> int:
+        """
+        Set `column` = compute(`source`) for every row where it is NULL,
+        batch_size rows per transaction, logging progress as it goes.
+
+        Rows whose value can't be computed get `default`, which must not be
+        NULL (otherwise they would be selected again forever). Returns the
+        number of rows updated.
+        """
+        total = self.conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE {column} IS NULL"
+        ).fetchone()[0]
+        if not total:
+            return 0
+        label = f"{table}.{column}"
+        logger.info("[%s] backfilling %s: %d rows", self.migration.name, label, total)
+        done = 0
+        start = last_log = time.perf_counter()
+        while True:
+            rows = self.conn.execute(
+                f"SELECT rowid, {source} FROM {table} WHERE {column} IS NULL LIMIT ?",
+                (batch_size,),
+            ).fetchall()
+            if not rows:
+                break
+            updates = []
+            for rowid, value in rows:
+                try:
+                    updates.append((compute(value), rowid))
+                except (TypeError, ValueError):
+                    logger.warning("[%s] %s: bad %s %r on rowid %s", self.migration.name, label, source, value, rowid)
+                    updates.append((default, rowid))
+            self.conn.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", updates)
+            self.commit()
+            done += len(updates)
+            now = time.perf_counter()
+            if now - last_log >= _PROGRESS_INTERVAL:
+                rate = done / (now - start)
+                logger.info(
+                    "[%s] %s: %d/%d (%.0f%%), ~%.0fs left",
+                    self.migration.name, label, done, total, 100 * done / total,
+                    max(total - done, 0) / rate if rate else 0,
+                )
+                last_log = now
+        logger.info(
+            "[%s] backfilled %s: %d rows in %.1fs",
+            self.migration.name, label, done, time.perf_counter() - start,
+        )
+        return done
+
+
+# --- Runner ---
+
+
+def _ensure_version_table(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version     INTEGER PRIMARY KEY,
+            name        TEXT NOT NULL,
+            applied_at  TEXT NOT NULL,
+            duration_ms INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def applied_versions(conn: sqlite3.Connection) -> set[int]:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not exists:
+        return set()
+    return {r[0] for r in conn.execute("SELECT version FROM schema_version")}
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration version (0 for a new or pre-migration database)."""
+    return max(applied_versions(conn), default=0)
+
+
+def pending(conn: sqlite3.Connection) -> list[Migration]:
+    applied = applied_versions(conn)
+    return [mig for mig in discover() if mig.version not in applied]
+
+
+def migrate(conn: sqlite3.Connection, dry_run: bool = False) -> list[Migration]:
+    """
+    Apply all pending migrations in order. Returns the migrations that ran
+    (or, with dry_run, the ones that would run).
+
+    Each migration runs in its own BEGIN IMMEDIATE transaction, so two
+    processes starting at once serialize on the write lock and the second
+    one skips migrations the first already recorded.
+    """
+    todo = pending(conn)
+    if dry_run or not todo:
+        return todo
+
+    isolation = conn.isolation_level
+    conn.isolation_level = None  # explicit transactions only
+    ran = []
+    try:
+        _ensure_version_table(conn)
+        for mig in todo:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute(
+                    "SELECT 1 FROM schema_version WHERE version = ?", (mig.version,)
+                ).fetchone():
+                    conn.execute("COMMIT")  # another process got here first
+                    continue
+                logger.info("Applying migration %s: %s", mig.name, mig.description)
+                start = time.perf_counter()
+                mig.up(Migrator(conn, mig))
+                duration_ms = int((time.perf_counter() - start) * 1000)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)",
+                    (mig.version, mig.name, datetime.now(timezone.utc).isoformat(), duration_ms),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                logger.error("Migration %s failed; database left at its last committed state", mig.name)
+                raise
+            logger.info("Applied migration %s in %d ms", mig.name, duration_ms)
+            ran.append(mig)
+    finally:
+        conn.isolation_level = isolation
+    return ran
@@ -0,0 +1,119 @@
+"""Base schema: entries, memory, logs, admin tables, transcripts and the room."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.script("""
+        CREATE TABLE IF NOT EXISTS entries (
+            id          TEXT PRIMARY KEY,
+            section     TEXT NOT NULL,
+            title       TEXT DEFAULT '',
+            content     TEXT DEFAULT '',
+            mood        TEXT DEFAULT '',
+            name        TEXT DEFAULT '',
+            message     TEXT DEFAULT '',
+            inspired_by TEXT DEFAULT '[]',
+            type        TEXT DEFAULT '',
+            created_at  TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_entries_section
+            ON entries(section, created_at DESC);
+
+        CREATE TABLE IF NOT EXISTS memory (
+            id              INTEGER PRIMARY KEY CHECK (id = 1),
+            last_wake_time  TEXT NOT NULL,
+            visitors_read   TEXT DEFAULT '[]',
+            actions_taken   TEXT DEFAULT '[]',
+            mood            TEXT DEFAULT 'curious',
+            plans           TEXT DEFAULT '[]'
+        );
+
+        INSERT OR IGNORE INTO memory (id, last_wake_time)
+            VALUES (1, '2000-01-01T00:00:00+00:00');
+
+        CREATE TABLE IF NOT EXISTS activity_log (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            event       TEXT NOT NULL,
+            detail      TEXT DEFAULT '',
+            created_at  TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS admin_news (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            content     TEXT NOT NULL,
+            read_by_gpt INTEGER DEFAULT 0,
+            created_at  TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            fingerprint  TEXT PRIMARY KEY,
+            count        INTEGER DEFAULT 0,
+            window_start TEXT NOT NULL,
+            blocked      INTEGER DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS admin_sessions (
+            token       TEXT PRIMARY KEY,
+            method      TEXT NOT NULL,
+            created_at  TEXT NOT NULL,
+            expires_at  TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS admin_settings (
+            key   TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS custom_pages (
+            slug        TEXT PRIMARY KEY,
+            title       TEXT NOT NULL,
+            content     TEXT NOT NULL,
+            created_by  TEXT DEFAULT 'gpt',
+            nav_order   INTEGER DEFAULT 0,
+            show_in_nav INTEGER DEFAULT 1,
+            created_at  TEXT NOT NULL,
+            updated_at  TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS transcripts (
+            id                TEXT PRIMARY KEY,
+            session_type      TEXT DEFAULT '',
+            messages          TEXT NOT NULL,
+            turns             INTEGER DEFAULT 0,
+            prompt_tokens     INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            total_tokens      INTEGER DEFAULT 0,
+            cost_usd REAL DEFAULT 0.0,
+            actions           TEXT DEFAULT '[]',
+            mood              TEXT DEFAULT '',
+            created_at        TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_transcripts_created
+            ON transcripts(created_at DESC);
+
+        CREATE TABLE IF NOT EXISTS room_objects (
+            id          TEXT PRIMARY KEY,
+            type        TEXT NOT NULL,
+            pos_x       REAL DEFAULT 0,
+            pos_y       REAL DEFAULT 0,
+            pos_z       REAL DEFAULT 0,
+            color       TEXT DEFAULT '#ffffff',
+            metadata    TEXT DEFAULT '{}',
+            created_at  TEXT NOT NULL,
+            updated_at  TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS room_history (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            action      TEXT NOT NULL,
+            object_id   TEXT,
+            detail      TEXT DEFAULT '',
+            created_at  TEXT NOT NULL
+        );
+    """)
+
+    # Visitor moderation status
+    m.add_column("entries", "status", "TEXT DEFAULT 'pending'")
@@ -0,0 +1,49 @@
+"""Integer epoch-microsecond twins of the ISO timestamp columns, indexed for range queries."""
+
+from datetime import datetime, timedelta, timezone
+
+from backend.migrations import Migrator
+
+# table → [(integer column, ISO column it is derived from)]
+_COLUMNS = {
+    "entries": [("created_ts", "created_at")],
+    "transcripts": [("created_ts", "created_at")],
+    "activity_log": [("created_ts", "created_at")],
+    "room_history": [("created_ts", "created_at")],
+    "admin_sessions": [("created_ts", "created_at"), ("expires_ts", "expires_at")],
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ts(iso: str) -> int:
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def up(m: Migrator) -> None:
+    for table, columns in _COLUMNS.items():
+        for ts_col, _ in columns:
+            m.add_column(table, ts_col, "INTEGER")
+
+    # Databases that already have the change log would get one 'update'
+    # row per backfilled entry; this is derived data, so drop the trigger
+    # for the duration (m003 reinstalls it).
+    m.execute("DROP TRIGGER IF EXISTS trg_changes_entries_update")
+    m.execute("DROP TRIGGER IF EXISTS trg_rollup_entries_update")
+
+    for table, columns in _COLUMNS.items():
+        for ts_col, iso_col in columns:
+            m.backfill(table, ts_col, iso_col, _to_ts, default=0)
+
+    m.create_index("idx_entries_section_ts", "entries", "section, created_ts")
+    m.create_index("idx_transcripts_ts", "transcripts", "created_ts")
+    m.create_index("idx_activity_log_ts", "activity_log", "created_ts")
+    m.create_index("idx_room_history_ts", "room_history", "created_ts")
+    m.create_index("idx_admin_sessions_expires", "admin_sessions", "expires_ts")
+
+    # Superseded by the integer indexes above
+    m.execute("DROP INDEX IF EXISTS idx_entries_section")
+    m.execute("DROP INDEX IF EXISTS idx_transcripts_created")
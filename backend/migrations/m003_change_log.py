@@ -0,0 +1,38 @@
+"""Durable change log (`changes`) fed by triggers on the tracked tables."""
+
+from backend.migrations import Migrator
+
+# table → primary key column used as row_id
+_TRACKED_TABLES = {
+    "entries": "id",
+    "custom_pages": "slug",
+    "room_objects": "id",
+    "memory": "id",
+    "admin_news": "id",
+}
+
+_TS_SQL = "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"
+
+
+def up(m: Migrator) -> None:
+    m.script("""
+        CREATE TABLE IF NOT EXISTS changes (
+            seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+            "table"     TEXT NOT NULL,
+            op          TEXT NOT NULL,
+            row_id      TEXT NOT NULL,
+            ts          TEXT NOT NULL
+        );
+    """)
+    m.create_index("idx_changes_ts", "changes", "ts")
+
+    for table, key in _TRACKED_TABLES.items():
+        for op, ref in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+            m.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_changes_{table}_{op}
+                AFTER {op.upper()} ON {table}
+                BEGIN
+                    INSERT INTO changes ("table", op, row_id, ts)
+                    VALUES ('{table}', '{op}', CAST({ref}.{key} AS TEXT), {_TS_SQL});
+                END
+            """)
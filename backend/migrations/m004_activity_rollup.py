@@ -0,0 +1,82 @@
+"""Trigger-maintained hourly activity rollup and visitor name counts."""
+
+import logging
+import time
+
+from backend.migrations import Migrator
+
+logger = logging.getLogger(__name__)
+
+# UTC hour of created_ts, falling back to created_at for rows without it
+_BUCKET_SQL = (
+    "COALESCE(strftime('%Y-%m-%dT%H', {ref}.created_ts / 1000000, 'unixepoch'),"
+    " strftime('%Y-%m-%dT%H', {ref}.created_at))"
+)
+
+
+def _bump(ref: str, delta: int) -> str:
+    bucket = _BUCKET_SQL.format(ref=ref)
+    return f"""
+        INSERT INTO activity_rollup (bucket_hour, section, mood, count)
+        VALUES ({bucket}, {ref}.section, COALESCE({ref}.mood, ''), {delta})
+        ON CONFLICT (bucket_hour, section, mood) DO UPDATE SET count = count + ({delta});
+        INSERT INTO visitor_names (name, count)
+        SELECT COALESCE({ref}.name, ''), {delta} WHERE {ref}.section = 'visitor'
+        ON CONFLICT (name) DO UPDATE SET count = count + ({delta});
+    """
+
+
+def up(m: Migrator) -> None:
+    m.script("""
+        CREATE TABLE IF NOT EXISTS activity_rollup (
+            bucket_hour TEXT NOT NULL,
+            section     TEXT NOT NULL,
+            mood        TEXT NOT NULL DEFAULT '',
+            count       INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket_hour, section, mood)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS visitor_names (
+            name    TEXT PRIMARY KEY,
+            count   INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+    """)
+    m.create_index("idx_rollup_section", "activity_rollup", "section, bucket_hour")
+
+    # Replace triggers left by a pre-migration install (text-based buckets)
+    m.script(f"""
+        DROP TRIGGER IF EXISTS trg_rollup_entries_insert;
+        DROP TRIGGER IF EXISTS trg_rollup_entries_delete;
+        DROP TRIGGER IF EXISTS trg_rollup_entries_update;
+
+        CREATE TRIGGER trg_rollup_entries_insert
+        AFTER INSERT ON entries
+        BEGIN {_bump("NEW", 1)} END;
+
+        CREATE TRIGGER trg_rollup_entries_delete
+        AFTER DELETE ON entries
+        BEGIN {_bump("OLD", -1)} END;
+
+        CREATE TRIGGER trg_rollup_entries_update
+        AFTER UPDATE OF section, mood, name, created_ts ON entries
+        BEGIN {_bump("OLD", -1)} {_bump("NEW", 1)} END;
+    """)
+
+    # Populate from existing entries (same transaction as the triggers, so
+    # nothing written concurrently is missed or counted twice)
+    start = time.perf_counter()
+    bucket = _BUCKET_SQL.format(ref="entries")
+    m.execute("DELETE FROM activity_rollup")
+    m.execute("DELETE FROM visitor_names")
+    m.execute(f"""
+        INSERT INTO activity_rollup (bucket_hour, section, mood, count)
+        SELECT {bucket}, section, COALESCE(mood, ''), COUNT(*)
+        FROM entries GROUP BY 1, 2, 3
+    """)
+    m.execute("""
+        INSERT INTO visitor_names (name, count)
+        SELECT COALESCE(name, ''), COUNT(*) FROM entries
+        WHERE section = 'visitor' GROUP BY 1
+    """)
+    rows = m.execute("SELECT COUNT(*) FROM activity_rollup").fetchone()[0]
+    logger.info("[%s] built %d rollup rows in %.0f ms", m.migration.name, rows, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,19 @@
+"""Integer window start on rate_limits so the limiter can decide in one UPSERT."""
+
+from datetime import datetime, timedelta, timezone
+
+from backend.migrations import Migrator
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ts(iso: str) -> int:
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def up(m: Migrator) -> None:
+    m.add_column("rate_limits", "window_ts", "INTEGER")
+    m.backfill("rate_limits", "window_ts", "window_start", _to_ts, default=0)
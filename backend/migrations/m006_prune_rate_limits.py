@@ -0,0 +1,7 @@
+"""Drop per-fingerprint counters from rate_limits; the table now only stores bans."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.execute("DELETE FROM rate_limits WHERE blocked = 0")
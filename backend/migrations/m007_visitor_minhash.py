@@ -0,0 +1,14 @@
+"""MinHash signatures of recent visitor messages for near-duplicate detection."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS visitor_minhash (
+            entry_id    TEXT PRIMARY KEY,
+            signature   BLOB NOT NULL,
+            created_ts  INTEGER NOT NULL
+        )
+    """)
+    m.create_index("idx_visitor_minhash_ts", "visitor_minhash", "created_ts")
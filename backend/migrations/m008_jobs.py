@@ -0,0 +1,28 @@
+"""Durable background job queue (echoes and other async work)."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id            INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind          TEXT NOT NULL,
+            payload       TEXT NOT NULL DEFAULT '{}',
+            priority      INTEGER NOT NULL DEFAULT 0,
+            status        TEXT NOT NULL DEFAULT 'queued',
+            attempts      INTEGER NOT NULL DEFAULT 0,
+            max_attempts  INTEGER NOT NULL,
+            run_after     INTEGER NOT NULL,
+            lease_owner   TEXT,
+            lease_until   INTEGER,
+            last_error    TEXT,
+            dedupe_key    TEXT UNIQUE,
+            created_ts    INTEGER NOT NULL,
+            started_ts    INTEGER,
+            finished_ts   INTEGER
+        )
+    """)
+    # status: queued → running → done, or back to queued (retry) / dead (out of attempts)
+    m.create_index("idx_jobs_ready", "jobs", "status, priority DESC, run_after")
+    m.create_index("idx_jobs_finished", "jobs", "status, finished_ts")
@@ -0,0 +1,16 @@
+"""Echo fragments by normalized-message hash, reused for repeated visitor messages."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS echo_memo (
+            key         TEXT PRIMARY KEY,
+            fragment    TEXT NOT NULL,
+            hits        INTEGER NOT NULL DEFAULT 0,
+            created_ts  INTEGER NOT NULL,
+            used_ts     INTEGER NOT NULL
+        )
+    """)
+    m.create_index("idx_echo_memo_used", "echo_memo", "used_ts")
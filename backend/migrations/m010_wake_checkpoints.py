@@ -0,0 +1,28 @@
+"""Per-turn checkpoints of running wakes and a ledger of their tool calls."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS in_progress_wakes (
+            id            TEXT PRIMARY KEY,
+            session_type  TEXT NOT NULL DEFAULT '',
+            meta          TEXT NOT NULL DEFAULT '{}',
+            messages      TEXT NOT NULL DEFAULT '[]',
+            progress      TEXT NOT NULL DEFAULT '{}',
+            turns         INTEGER NOT NULL DEFAULT 0,
+            started_ts    INTEGER NOT NULL,
+            updated_ts    INTEGER NOT NULL
+        )
+    """)
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS wake_tool_calls (
+            tool_call_id  TEXT PRIMARY KEY,
+            wake_id       TEXT NOT NULL,
+            name          TEXT NOT NULL,
+            result        TEXT NOT NULL,
+            created_ts    INTEGER NOT NULL
+        )
+    """)
+    m.create_index("idx_wake_tool_calls_wake", "wake_tool_calls", "wake_id")
@@ -0,0 +1,14 @@
+"""Named leases shared by all processes (wake lock, scheduler leader, cooldowns)."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            name         TEXT PRIMARY KEY,
+            owner        TEXT NOT NULL,
+            expires_ts   INTEGER NOT NULL,
+            acquired_ts  INTEGER NOT NULL
+        )
+    """)
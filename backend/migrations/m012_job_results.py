@@ -0,0 +1,7 @@
+"""Keep a job's return value, for callers that enqueue and poll (manual wakes)."""
+
+from backend.migrations import Migrator
+
+
+def up(m: Migrator) -> None:
+    m.add_column("jobs", "result", "TEXT")
@@ -7,7 +7,6 @@ Secret admin panel API. All endpoints require authentication
 
 import shutil
 import logging
-import time
 from datetime import datetime, timezone
 from typing import Literal
 
@@ -15,8 +14,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from backend.config import MOCK_MODE, DATA_DIR, BASE_DIR
-from backend.services import storage
-from backend.services.gpt_mind import wake_up
+from backend.services import jobs, leases, rescan, storage
+from backend.services.events import bus
+from backend.services.metrics import metrics
+from backend.services.rate_limit import visitor_limiter
 from backend.services.security import sanitize_for_context
 from backend.routers.auth import require_admin_auth as require_admin
 
@@ -26,7 +27,51 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 # --- Wake cooldown (prevent cost abuse via rapid manual triggers) ---
 _WAKE_COOLDOWN = 60  # seconds
-_last_manual_wake = 0.0
+
+
+def _raise_if_wake_running() -> None:
+    if any(lease["name"] == "wake" for lease in storage.list_leases()):
+        raise HTTPException(status_code=409, detail="A wake is already running.")
+
+
+async def manual_wake_cooldown() -> None:
+    """
+    Start the manual-wake cooldown, shared by every worker; 429 while one is
+    running. A wake already running is a 409 first, without using up the
+    cooldown — the retry once it's done shouldn't have to wait a minute.
+    """
+    _raise_if_wake_running()
+    remaining = await leases.cooldown("manual-wake", _WAKE_COOLDOWN)
+    if remaining:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Wake cooldown active. Try again in {int(remaining) + 1}s.",
+            headers={"Retry-After": str(int(remaining) + 1)},
+        )
+
+
+def queue_manual_wake() -> dict:
+    """
+    Queue a wake for the worker (backend/worker.py) and return its job id
+    to poll with wake_status(); 409 if a wake is already running somewhere.
+    """
+    _raise_if_wake_running()
+    job_id = jobs.enqueue("wake", {"trigger": "manual"}, priority=10, max_attempts=1)
+    return {"ok": True, "job_id": job_id, "status": "queued"}
+
+
+def wake_status(job_id: int) -> dict:
+    """Where a queued manual wake is: queued → running → done (with its result) or dead."""
+    job = storage.get_job(job_id)
+    if job is None or job["kind"] != "wake":
+        raise HTTPException(status_code=404, detail="No wake job with that id")
+    status = {"job_id": job_id, "status": job["status"]}
+    if job["status"] == "done":
+        status.update(ok=True, result=job["result"])
+    elif job["status"] == "dead":
+        held = (job["last_error"] or "").startswith("LeaseHeld")
+        status.update(ok=False, error="A wake is already running." if held else "Wake cycle failed. Check server logs.")
+    return status
 
 
 # --- Models ---
@@ -47,34 +92,23 @@ class BanInput(BaseModel):
 # === Wake / Run ===
 
 
-@router.post("/wake", dependencies=[Depends(require_admin)])
-async def admin_wake():
-    """Manually trigger a wake cycle. Rate-limited to prevent cost abuse."""
-    global _last_manual_wake
-    now = time.time()
-    if now - _last_manual_wake < _WAKE_COOLDOWN:
-        remaining = int(_WAKE_COOLDOWN - (now - _last_manual_wake))
-        raise HTTPException(
-            status_code=429,
-            detail=f"Wake cooldown active. Try again in {remaining}s.",
-        )
-    _last_manual_wake = now
-
+@router.post("/wake", status_code=202, dependencies=[Depends(require_admin), Depends(manual_wake_cooldown)])
+def admin_wake():
+    """Queue a wake cycle; poll GET /admin/wake/{job_id}. Rate-limited to prevent cost abuse."""
+    queued = queue_manual_wake()
     storage.log_activity("wake", "manual trigger from admin panel")
-    try:
-        result = await wake_up()
-        storage.log_activity("wake_complete", f"actions: {result.get('actions', [])}")
-        return {"ok": True, "result": result}
-    except Exception as e:
-        storage.log_activity("wake_error", str(e)[:200])
-        logger.exception("Wake cycle failed")
-        return {"ok": False, "error": "Wake cycle failed. Check server logs."}
+    return queued
+
+
+@router.get("/wake/{job_id}", dependencies=[Depends(require_admin)])
+def admin_wake_status(job_id: int):
+    return wake_status(job_id)
 
 
 # === Status ===
 
 
-@router.get("/status", dependencies=[Depends(require_admin)])
+@router.get("/status", dependencies=[Depends(require_admin), Depends(storage.snapshot_reads)])
 def admin_status():
     """Full system status for admin panel."""
     memory = storage.read_memory()
@@ -105,6 +139,7 @@ def admin_status():
             "dreams": storage.count_entries("dreams"),
             "visitor": storage.count_entries("visitor"),
         },
+        "leases": storage.list_leases(),  # who's waking / leading the scheduler right now
     }
 
 
@@ -166,7 +201,7 @@ def moderate_visitor(entry_id: str, data: ModerateInput):
 @router.post("/visitors/ban", dependencies=[Depends(require_admin)])
 def ban_visitor(data: BanInput):
     """Ban a fingerprint from posting."""
-    storage.block_fingerprint(data.fingerprint)
+    visitor_limiter.block(data.fingerprint).result()
     storage.log_activity("visitor_banned", data.fingerprint)
     return {"ok": True}
 
@@ -174,7 +209,7 @@ def ban_visitor(data: BanInput):
 @router.post("/visitors/unban", dependencies=[Depends(require_admin)])
 def unban_visitor(data: BanInput):
     """Unban a fingerprint."""
-    storage.unblock_fingerprint(data.fingerprint)
+    visitor_limiter.unblock(data.fingerprint).result()
     storage.log_activity("visitor_unbanned", data.fingerprint)
     return {"ok": True}
 
@@ -185,6 +220,50 @@ def list_blocked_visitors():
     return storage.list_blocked()
 
 
+# === Security ===
+
+
+@router.post("/security/rescan", status_code=202, dependencies=[Depends(require_admin)])
+def start_rescan(dry_run: bool = False):
+    """Re-check visitor messages against the current injection patterns and hide matches."""
+    try:
+        job_id = rescan.start(dry_run=dry_run)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    storage.log_activity("security_rescan_started", "dry run" if dry_run else "")
+    return {"job_id": job_id, "status": "queued", "dry_run": dry_run}
+
+
+@router.get("/security/rescan", dependencies=[Depends(require_admin)])
+def rescan_status():
+    """Progress of the queued or running rescan, or the result of the last one."""
+    return rescan.current() or {"status": "idle"}
+
+
+# === Background Jobs ===
+
+
+@router.get("/jobs", dependencies=[Depends(require_admin)])
+def job_queue(status: str | None = None, limit: int = 50):
+    """Queue depth per kind/status, wait and run latency, and the latest jobs."""
+    limit = max(1, min(limit, 500))
+    snapshot = metrics.snapshot()
+    return {
+        "stats": storage.get_job_stats(),
+        "latency": {name: snapshot.get(f"jobs.{name}") for name in ("wait_ms", "run_ms")},
+        "jobs": storage.list_jobs(status=status, limit=limit),
+    }
+
+
+@router.post("/jobs/{job_id}/retry", dependencies=[Depends(require_admin)])
+def retry_job(job_id: int):
+    """Requeue a dead-lettered job with fresh attempts."""
+    if not storage.retry_dead_job(job_id):
+        raise HTTPException(status_code=404, detail="No dead job with that id")
+    storage.log_activity("job_retried", str(job_id))
+    return {"ok": True}
+
+
 # === Backups ===
 
 
@@ -245,6 +324,35 @@ def rate_limit_info():
     }
 
 
+# === Change log (CDC) ===
+
+
+@router.get("/changes", dependencies=[Depends(require_admin), Depends(storage.snapshot_reads)])
+def list_changes(since: int = 0, limit: int = 500):
+    """Incremental change feed for mirrors/exporters. Resume with ?since=<latest seq>."""
+    limit = max(1, min(limit, 5000))
+    since = max(0, since)
+    changes = storage.changes_since(since, limit=limit)
+    oldest = storage.oldest_change_seq()
+    latest = storage.latest_change_seq()
+    # Compacted past the cursor: rows it hasn't seen are gone (all of them if the log is empty)
+    first_kept = oldest if oldest is not None else latest + 1
+    return {
+        "changes": changes,
+        "latest_seq": latest,
+        "resync_required": since < first_kept - 1,
+    }
+
+
+# === Metrics ===
+
+
+@router.get("/metrics", dependencies=[Depends(require_admin)])
+def get_metrics():
+    """In-process metrics (DB writer queue, commit latency, ...) and event bus stats."""
+    return {"metrics": metrics.snapshot(), "events": bus.stats()}
+
+
 # === Transcripts ===
 
 
@@ -4,7 +4,7 @@ GPT Home — Analytics Router
 Public analytics data for visualization pages.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from backend.services import storage
 
@@ -67,38 +67,27 @@ def visitor_analytics():
 
 @router.get("/moods")
 def mood_analytics():
-    """Mood and seasonal patterns."""
-    mood_data = storage.get_mood_timeline()
-
-    # Group by month and time-of-day
-    by_month: dict[str, list[str]] = {}
-    by_hour: dict[int, list[str]] = {}
-    for entry in mood_data:
-        ts = entry.get("created_at", "")
-        mood = entry.get("mood", "")
-        if ts and mood:
-            month = ts[:7]
-            by_month.setdefault(month, []).append(mood)
-            try:
-                hour = int(ts[11:13])
-                by_hour.setdefault(hour, []).append(mood)
-            except (ValueError, IndexError):
-                pass
-
+    """Mood and seasonal patterns (aggregates come from the hourly rollup)."""
     return {
-        "timeline": mood_data,
-        "by_month": {k: _mood_summary(v) for k, v in sorted(by_month.items())},
-        "by_hour": {k: _mood_summary(v) for k, v in sorted(by_hour.items())},
+        "timeline": storage.get_mood_timeline(limit=200),
+        "by_month": _mood_groups(storage.get_mood_rollup("month")),
+        "by_hour": _mood_groups(storage.get_mood_rollup("hour")),
+        "overall": _mood_groups(storage.get_mood_rollup("all")).get("", _mood_summary({})),
     }
 
 
-def _mood_summary(moods: list[str]) -> dict:
-    """Summarize a list of moods."""
-    counts: dict[str, int] = {}
-    for m in moods:
-        counts[m] = counts.get(m, 0) + 1
+def _mood_groups(rows: list[dict]) -> dict:
+    """Turn rollup rows (bucket, mood, cnt) into {bucket: summary}."""
+    grouped: dict = {}
+    for r in rows:
+        grouped.setdefault(r["bucket"], {})[r["mood"]] = r["cnt"]
+    return {k: _mood_summary(v) for k, v in sorted(grouped.items())}
+
+
+def _mood_summary(counts: dict[str, int]) -> dict:
+    """Summarize mood counts."""
     return {
-        "total": len(moods),
+        "total": sum(counts.values()),
         "distribution": dict(sorted(counts.items(), key=lambda x: -x[1])),
     }
 
@@ -261,7 +250,7 @@ def thought_topics():
     }
 
 
-@router.get("/memory")
+@router.get("/memory", dependencies=[Depends(storage.snapshot_reads)])
 def memory_garden():
     """Memory data for visualization."""
     memory = storage.read_memory()
@@ -358,7 +347,7 @@ def memory_garden():
     }
 
 
-@router.get("/status")
+@router.get("/status", dependencies=[Depends(storage.snapshot_reads)])
 def site_status():
     """Lightweight public status endpoint for homepage widgets."""
     memory = storage.read_memory()
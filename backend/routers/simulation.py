@@ -1,17 +1,87 @@
 """
 GPT Home — Simulation State Router
 
-Public endpoint exposing GPT's derived mental state for the particle visualizer.
+Public endpoints exposing GPT's derived mental state for the particle visualizer.
+
+GET /api/simulation/state    → one-shot snapshot (polling fallback)
+GET /api/simulation/stream   → Server-Sent Events: "state" on change, "pulse" on activity
+GET /api/simulation/history  → downsampled time series of energy/coherence/mode weights
 """
 
-from fastapi import APIRouter
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from backend.services.simulation import build_simulation_state
+from backend.services.simulation import broadcaster, build_history, build_simulation_state
 
 router = APIRouter(prefix="/simulation", tags=["simulation"])
 
+_KEEPALIVE_SECONDS = 15.0
+
 
 @router.get("/state")
 def get_simulation_state():
     """Return GPT's current simulation state for the mind visualizer."""
     return build_simulation_state()
+
+
+def _parse_time(value: str | None, name: str) -> float | None:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' timestamp (ISO-8601 expected)")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+@router.get("/history")
+def get_simulation_history(
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    resolution: int = 300,
+):
+    """GPT's derived state over time. Defaults to the last 30 days, ≤300 points; spans up to 2 years."""
+    resolution = max(10, min(resolution, 2000))
+    try:
+        return build_history(_parse_time(from_, "from"), _parse_time(to, "to"), resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@router.get("/stream")
+async def stream_simulation_state(request: Request):
+    """Stream state changes and activity pulses to the mind visualizer."""
+    sub = broadcaster.subscribe()
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    item = await asyncio.wait_for(sub.queue.get(), timeout=_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:  # dropped as a slow consumer
+                    break
+                yield _sse(*item)
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
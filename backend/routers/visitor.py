@@ -5,13 +5,12 @@ GET   /api/visitor          → count only (messages are private)
 POST  /api/visitor          → leave a message (rate-limited)
 """
 
-import hashlib
-
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
-from backend.services import storage
-from backend.services.echo import generate_echo
+from backend.services import dedup, storage
+from backend.services.dedup import visitor_index
+from backend.services.rate_limit import client_fingerprint, visitor_limiter
 from backend.services.security import check_message
 
 router = APIRouter(prefix="/visitor", tags=["visitor"])
@@ -24,10 +23,10 @@ class VisitorMessage(BaseModel):
 
 def _get_fingerprint(request: Request) -> str:
     """Create a hash from IP + user agent for rate limiting."""
-    ip = request.client.host if request.client else "unknown"
-    ua = request.headers.get("user-agent", "")
-    raw = f"{ip}:{ua}"
-    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+    return client_fingerprint(
+        request.client.host if request.client else None,
+        request.headers.get("user-agent", ""),
+    )
 
 
 @router.get("")
@@ -58,18 +57,24 @@ def all_replies(limit: int = 50):
 
 
 @router.post("", status_code=201)
-def leave_message(msg: VisitorMessage, request: Request, background_tasks: BackgroundTasks):
+def leave_message(msg: VisitorMessage, request: Request):
     """Leave a message. Rate-limited by IP fingerprint."""
     fingerprint = _get_fingerprint(request)
 
     # Security check — block prompt injection attempts
     is_safe, reason = check_message(msg.message)
     if not is_safe:
-        storage.log_activity("injection_blocked", f"reason={reason}, fp={fingerprint}, preview={msg.message[:60]}")
         # Auto-block repeat offenders
-        if reason in ("credential_extraction", "code_execution", "sql_injection", "jailbreak"):
-            storage.block_fingerprint(fingerprint)
-            storage.log_activity("auto_blocked", f"fingerprint={fingerprint}, reason={reason}")
+        auto_block = reason in ("credential_extraction", "code_execution", "sql_injection", "jailbreak")
+        if auto_block:
+            visitor_limiter.block(fingerprint)  # persisted write-behind
+
+        def reject(uow: storage.UnitOfWork) -> None:
+            uow.log_activity("injection_blocked", f"reason={reason}, fp={fingerprint}, preview={msg.message[:60]}")
+            if auto_block:
+                uow.log_activity("auto_blocked", f"fingerprint={fingerprint}, reason={reason}")
+
+        storage.unit_of_work(reject)
         raise HTTPException(
             status_code=400,
             detail="Message could not be processed.",
@@ -80,7 +85,7 @@ def leave_message(msg: VisitorMessage, request: Request, background_tasks: Backg
     if not name_safe:
         raise HTTPException(status_code=400, detail="Invalid name.")
 
-    allowed, remaining = storage.check_rate_limit(fingerprint)
+    allowed, remaining = visitor_limiter.check(fingerprint)
     if not allowed:
         raise HTTPException(
             status_code=429,
@@ -88,12 +93,39 @@ def leave_message(msg: VisitorMessage, request: Request, background_tasks: Backg
         )
 
     entry = {
+        "id": storage.generate_id("visitor"),
         "name": msg.name.strip() or "Anonym",
         "message": msg.message.strip(),
         "type": "visitor",
         "status": "pending",
     }
-    saved = storage.save_entry("visitor", entry)
-    storage.log_activity("visitor_message", f"{entry['name']}: {entry['message'][:60]}")
-    background_tasks.add_task(generate_echo, saved["id"], entry["message"])
+
+    # Near-duplicate of a recent message (from any fingerprint)? Reject it
+    # before it costs an echo call and a slot in the wake context.
+    signature = dedup.signature(entry["message"])
+    if signature is not None:
+        duplicate_of = visitor_index.claim(entry["id"], signature)
+        if duplicate_of is not None:
+            storage.log_activity("duplicate_blocked", f"of={duplicate_of}, fp={fingerprint}, preview={entry['message'][:60]}")
+            raise HTTPException(
+                status_code=429,
+                detail="A very similar message was left recently.",
+            )
+
+    # Insert, signature, echo job and activity log commit together or not at all
+    def post(uow: storage.UnitOfWork) -> dict:
+        saved = uow.save_entry("visitor", entry)
+        if signature is not None:
+            visitor_index.persist(uow, entry["id"], signature)
+        uow.enqueue_job("echo", {"entry_id": entry["id"]}, dedupe_key=f"echo:{entry['id']}")
+        uow.log_activity("visitor_message", f"{entry['name']}: {entry['message'][:60]}")
+        return saved
+
+    try:
+        saved = storage.unit_of_work(post)
+    except Exception:
+        if signature is not None:
+            visitor_index.release(entry["id"])
+        raise
+
     return {"id": saved["id"], "name": saved["name"], "remaining": remaining}
@@ -2,20 +2,38 @@
 GPT Home — Scheduler
 
 Wakes GPT up 8x daily (every 3 hours) using APScheduler.
-Runs inside the FastAPI process (lifespan event).
+Runs in the worker (backend/worker.py), or in the FastAPI process's
+lifespan with EMBEDDED_WORKER=1.
+
+Every process that runs it starts a scheduler, but only the one holding
+the "scheduler" lease runs jobs; the others keep theirs paused and take
+over within SCHEDULER_LEASE_TTL if the leader goes away.
 """
 
+import asyncio
 import logging
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-from backend.config import WAKE_TIMES
+from backend.config import SCHEDULER_LEASE_TTL, WAKE_TIMES
+from backend.services import leases, storage
 from backend.services.gpt_mind import wake_up
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
+leadership = leases.Lease("scheduler", SCHEDULER_LEASE_TTL)
+_election: asyncio.Task | None = None
+
+
+async def _scheduled_wake(session_type: str) -> None:
+    try:
+        await wake_up(session_type=session_type)
+    except leases.LeaseHeld as exc:
+        logger.warning("Skipping %s wake: %s", session_type, exc)
+    except leases.LeaseLost as exc:
+        logger.error("%s wake cut short: %s", session_type, exc)
 
 
 def setup_scheduler() -> None:
@@ -24,7 +42,7 @@ def setup_scheduler() -> None:
         session_type = wake.get("session_type", "")
         trigger = CronTrigger(hour=wake["hour"], minute=wake["minute"])
         scheduler.add_job(
-            wake_up,
+            _scheduled_wake,
             trigger=trigger,
             kwargs={"session_type": session_type},
             id=f"gpt-wake-{i}",
@@ -33,13 +51,61 @@ def setup_scheduler() -> None:
         )
         logger.info("Scheduled wake at %02d:%02d (%s)", wake["hour"], wake["minute"], session_type)
 
+    # Daily housekeeping: trim the change log to its retention window
+    scheduler.add_job(
+        storage.compact_changes,
+        trigger=CronTrigger(hour=4, minute=30),
+        id="compact-changes",
+        name="Compact change log",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        storage.compact_jobs,
+        trigger=CronTrigger(hour=4, minute=40),
+        id="compact-jobs",
+        name="Purge finished jobs",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        storage.compact_echo_memo,
+        trigger=CronTrigger(hour=4, minute=50),
+        id="compact-echo-memo",
+        name="Trim echo memo",
+        replace_existing=True,
+    )
+
+
+async def _elect() -> None:
+    """Renew (or try to take) the scheduler lease every ttl/3; run jobs only while leader."""
+    while True:
+        was_leader = leadership.held
+        try:
+            await leadership.acquire()
+        except Exception:
+            logger.exception("Scheduler lease check failed")
+            leadership.held = False
+        if leadership.held and not was_leader:
+            scheduler.resume()
+            logger.info("Scheduler leader: %s", leadership.owner)
+        elif was_leader and not leadership.held:
+            scheduler.pause()
+            logger.warning("Lost scheduler leadership — jobs paused")
+        await asyncio.sleep(SCHEDULER_LEASE_TTL / 3)
+
 
-def start() -> None:
+async def start() -> None:
+    global _election
     setup_scheduler()
-    scheduler.start()
+    scheduler.start(paused=True)
+    _election = asyncio.create_task(_elect(), name="scheduler-election")
     logger.info("Scheduler gestartet — %d Wake-Ups geplant", len(WAKE_TIMES))
 
 
-def stop() -> None:
+async def stop() -> None:
+    global _election
+    if _election is not None:
+        _election.cancel()
+        _election = None
     scheduler.shutdown(wait=False)
+    await leadership.release()
     logger.info("Scheduler gestoppt")
@@ -0,0 +1,73 @@
+"""
+GPT Home — Change Feed
+
+The event bus only reaches subscribers in the process that made the write.
+Wakes and echoes run in the worker (backend/worker.py), and visitors may
+post to another uvicorn worker, so the API's /mind counters, memory cache
+and SSE pulses would never hear about them. The feed tails the durable
+change log (storage.changes_since) and republishes those writes on the
+local bus as EntrySaved / MemorySaved.
+
+Writes this process made itself are skipped (storage.pop_own_change): they
+already published their events when they committed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from backend.config import CHANGE_FEED_POLL_SECONDS
+from backend.services import storage
+from backend.services.events import EntrySaved, Event, MemorySaved, bus
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeFeed:
+    def __init__(self, poll_seconds: float = CHANGE_FEED_POLL_SECONDS) -> None:
+        self.poll_seconds = poll_seconds
+        self.cursor = 0
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Follow the change log from its current end. Call once at startup."""
+        if self._task is None:
+            self.cursor = await asyncio.to_thread(storage.latest_change_seq)
+            self._task = asyncio.create_task(self._follow(), name="change-feed")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _follow(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                events = await asyncio.to_thread(self.poll)
+            except Exception:
+                logger.exception("Reading the change log failed")
+                continue
+            for event in events:
+                bus.publish(event)
+
+    def poll(self) -> list[Event]:
+        """Events for the change-log rows other processes wrote since the last poll."""
+        rows = storage.changes_since(self.cursor)
+        if not rows:
+            return []
+        self.cursor = rows[-1]["seq"]
+        foreign = [r for r in rows if not storage.pop_own_change(r["seq"])]
+
+        entry_ids = [r["row_id"] for r in foreign if r["table"] == "entries" and r["op"] == "insert"]
+        events: list[Event] = [
+            EntrySaved(section=section, entry_id=entry_id, ts=created_ts / 1_000_000)
+            for entry_id, section, created_ts in storage.get_entry_sections(entry_ids)
+        ]
+        if any(r["table"] == "memory" for r in foreign):
+            events.append(MemorySaved(mood=storage.read_memory().get("mood", "")))
+        return events
+
+
+feed = ChangeFeed()
@@ -0,0 +1,170 @@
+"""
+GPT Home — Database Writer
+
+All SQLite writes go through one dedicated thread with its own connection.
+
+SQLite allows a single writer at a time. With FastAPI's threadpool, a wake
+and a burst of visitors can all try to write at once, and each one waits on
+the file lock until busy_timeout expires with "database is locked". Here
+the callers just enqueue a function and get a Future back. The writer
+thread drains whatever is queued (up to max_batch) and runs it in a single
+transaction, with one SAVEPOINT per request. That makes a group commit
+(one fsync for the whole batch) and a failure in one request rolls back
+only that request.
+
+    future = writer.submit(lambda conn: conn.execute("INSERT ..."))
+    cursor = future.result()        # returns once the batch has committed
+
+Write functions must only use the connection they are given, must not
+commit, and must not submit to the writer themselves (that would deadlock).
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, TypeVar
+
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+@dataclass
+class _Request:
+    fn: Callable[[sqlite3.Connection], Any]
+    future: Future
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class DbWriter:
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        max_batch: int = 64,
+        name: str = "db-writer",
+    ) -> None:
+        self._connect = connect
+        self.max_batch = max_batch
+        self.name = name
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+        self._commits = metrics.counter("writer.commits")
+        self._errors = metrics.counter("writer.errors")
+        self._batch_size = metrics.histogram("writer.batch_size")
+        self._commit_ms = metrics.histogram("writer.commit_ms")
+        self._wait_ms = metrics.histogram("writer.wait_ms")
+        metrics.gauge("writer.queue_depth", self._queue.qsize)
+
+    # --- Caller side ---
+
+    def submit(self, fn: Callable[[sqlite3.Connection], T]) -> Future[T]:
+        """Queue a write. The future resolves after its transaction commits."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Nested write submitted from the writer thread")
+        self._ensure_started()
+        future: Future[T] = Future()
+        self._queue.put(_Request(fn, future))
+        return future
+
+    def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Queue a write and wait for it to commit. Re-raises its exception."""
+        return self.submit(fn).result()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything queued so far, then stop the thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+
+    # --- Writer thread ---
+
+    def _loop(self) -> None:
+        conn = self._connect()
+        conn.isolation_level = None  # transactions are managed explicitly below
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                stopping = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit(conn, batch)
+                if stopping:
+                    return
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list[_Request]) -> None:
+        start = time.perf_counter()
+        outcomes: list[tuple[_Request, bool, Any]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for req in batch:
+                if not req.future.set_running_or_notify_cancel():
+                    continue  # cancelled while queued
+                conn.execute("SAVEPOINT write")
+                try:
+                    value = req.fn(conn)
+                except BaseException as exc:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    outcomes.append((req, False, exc))
+                else:
+                    conn.execute("RELEASE write")
+                    outcomes.append((req, True, value))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            # BEGIN or COMMIT itself failed (disk full, lock held by another
+            # process past busy_timeout...). Nothing in the batch was kept.
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._errors.inc()
+            logger.error("Write batch of %d failed: %s", len(batch), exc)
+            for req in batch:
+                if not req.future.done():
+                    req.future.set_exception(exc)
+            return
+
+        done = time.perf_counter()
+        self._commits.inc()
+        self._batch_size.observe(len(batch))
+        self._commit_ms.observe((done - start) * 1000)
+        for req, ok, value in outcomes:
+            self._wait_ms.observe((done - req.enqueued) * 1000)
+            if ok:
+                req.future.set_result(value)
+            else:
+                self._errors.inc()
+                req.future.set_exception(value)
@@ -0,0 +1,172 @@
+"""
+GPT Home — Near-Duplicate Detection
+
+Catches floods of slightly varied copies of one visitor message, which
+the per-fingerprint limiter can't (rotate the user agent, get a fresh
+budget). Every copy would otherwise cost an echo LLM call and a slot in
+GPT's wake context.
+
+Each message gets a MinHash signature over its character 3-grams: NUM_PERM
+minimums under random universal hashes, where the share of equal positions
+between two signatures estimates the Jaccard similarity of their 3-gram
+sets. Two copies with a few typos each and an extra "!!" mostly land around
+0.6-0.8; unrelated sentences almost never reach 0.45.
+
+Lookup is LSH banding: the signature is cut into BANDS bands of ROWS
+values and each band hashes to a bucket, so a new message is only compared
+against messages sharing at least one bucket — a handful of dict lookups
+however many messages are in the window. With 16 x 4 the chance of sharing
+a bucket is ~99% at similarity 0.75 and ~6% at 0.25; candidates then need
+an estimated similarity of DEDUP_SIMILARITY to count as copies.
+
+The buckets live in memory. Signatures are persisted in `visitor_minhash`
+alongside the message (same transaction), loaded on first use, so a
+restart doesn't open the door again, and re-read every
+DEDUP_REFRESH_SECONDS for the rows other uvicorn workers added — otherwise
+copies spread round-robin over N workers would get N through.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from random import Random
+
+from backend.config import DEDUP_MIN_CHARS, DEDUP_REFRESH_SECONDS, DEDUP_SIMILARITY, DEDUP_WINDOW_HOURS
+from backend.services import storage
+from backend.services.metrics import metrics
+
+# Rows are read again from this far behind the newest one seen: another
+# process may commit a row stamped a moment before ours.
+_REFRESH_OVERLAP = 10.0
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_rng = Random(0x6770)  # fixed seed: persisted signatures must stay comparable
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(NUM_PERM)]
+_PACK = struct.Struct(f">{NUM_PERM}Q")
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+Signature = tuple[int, ...]
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+
+
+def signature(text: str) -> Signature | None:
+    """MinHash signature of a message, or None if it's too short to compare."""
+    text = _normalize(text)
+    if len(text) < DEDUP_MIN_CHARS:
+        return None
+    shingles = {zlib.crc32(text[i:i + 3].encode()) for i in range(len(text) - 2)}
+    return tuple(min([(a * h + b) % _PRIME for h in shingles]) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two messages' 3-gram sets."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _bands(sig: Signature) -> list[tuple[int, int]]:
+    return [(i, hash(sig[i * ROWS:(i + 1) * ROWS])) for i in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        window: float = DEDUP_WINDOW_HOURS * 3600,
+        threshold: float = DEDUP_SIMILARITY,
+        max_entries: int = 50_000,
+        refresh: float = DEDUP_REFRESH_SECONDS,
+    ) -> None:
+        self.window = window
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self._entries: OrderedDict[str, tuple[Signature, float]] = OrderedDict()  # oldest first
+        self._buckets: dict[tuple[int, int], set[str]] = {}
+        self._loaded_at: float | None = None  # monotonic
+        self._newest = 0.0  # created time of the newest row read
+        self._lock = threading.Lock()
+        self._duplicates = metrics.counter("dedup.duplicates")
+        metrics.gauge("dedup.indexed", lambda: len(self._entries))
+
+    def _load(self, now: float) -> None:
+        """Read the rows added since the last load (all of the window the first time)."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh:
+            return
+        self._loaded_at = time.monotonic()
+        since = max(now - self.window, self._newest - _REFRESH_OVERLAP)
+        for entry_id, blob, created_ts in storage.list_signatures(int(since * 1_000_000)):
+            at = created_ts / 1_000_000
+            self._newest = max(self._newest, at)
+            if entry_id not in self._entries:
+                # May land behind newer entries; _expire gets to it once they're gone
+                self._insert(entry_id, _PACK.unpack(blob), at)
+
+    def _insert(self, key: str, sig: Signature, at: float) -> None:
+        self._entries[key] = (sig, at)
+        for band in _bands(sig):
+            self._buckets.setdefault(band, set()).add(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in _bands(entry[0]):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._entries:
+            key, (_, at) = next(iter(self._entries.items()))
+            if at >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            self._remove(key)
+
+    def claim(self, key: str, sig: Signature, now: float | None = None) -> str | None:
+        """
+        Look for a near-duplicate of `sig` in the window. Returns the
+        matching key, or None after adding `sig` under `key` — check and
+        add are one step, so two copies posted at once can't both get in.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._load(now)
+            self._expire(now)
+            candidates = set().union(*(self._buckets.get(band, ()) for band in _bands(sig)))
+            for other in candidates:
+                if similarity(sig, self._entries[other][0]) >= self.threshold:
+                    self._duplicates.inc()
+                    return other
+            self._insert(key, sig, now)
+        return None
+
+    def release(self, key: str) -> None:
+        """Forget a claimed key (its message was never saved)."""
+        with self._lock:
+            self._remove(key)
+
+    def persist(self, uow: storage.UnitOfWork, key: str, sig: Signature) -> None:
+        """Write a claimed signature in the caller's unit of work."""
+        now = time.time()
+        uow.record_signature(
+            key, _PACK.pack(*sig), int(now * 1_000_000), int((now - self.window) * 1_000_000),
+        )
+
+
+visitor_index = NearDuplicateIndex()
@@ -6,12 +6,32 @@ No names, no locations, no identifying information — just the feeling.
 
 Example: "I miss the rain in Berlin" → "Someone misses the rain somewhere"
          or "Rain-longing floats through the room."
+
+During a burst, echo jobs don't each make their own LLM call: the batcher
+collects messages for ECHO_BATCH_WINDOW seconds (or until ECHO_BATCH_MAX
+are waiting) and transforms them in one structured-output request, then
+hands each job its own fragment. A lone message still goes out as a
+plain single-message request.
+
+Repeats skip the model entirely. Lots of visitors write the same thing
+("hi gpt love your site"), so fragments are memoized by a hash of the
+normalized, sanitized message — an LRU in memory in front of the
+`echo_memo` table — and a repeat gets the stored fragment with its
+opening subject varied, so the echo wall doesn't show identical lines.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+import random
+import re
+import unicodedata
+from collections import OrderedDict
 
-from backend.config import MOCK_MODE, OPENAI_API_KEY, OPENAI_MODEL
-from backend.services import storage
+from backend.config import ECHO_BATCH_MAX, ECHO_BATCH_WINDOW, ECHO_MEMO_SIZE, MOCK_MODE
+from backend.services import jobs, llm, storage
+from backend.services.metrics import metrics
 from backend.services.security import sanitize_for_context
 
 logger = logging.getLogger(__name__)
@@ -39,14 +59,44 @@ Output: "Someone wonders if loneliness has company after dark."
 
 Return ONLY the fragment text. No quotes, no labels, no explanation."""
 
+_BATCH_PROMPT = _SYSTEM_PROMPT.rsplit("\n\n", 1)[0] + """
+
+You will receive a JSON array of messages, each with a number "n".
+Transform every message on its own — never mix details between them.
+Return one echo per message, with the same "n"."""
+
+_BATCH_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "echoes",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "echoes": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "n": {"type": "integer"},
+                            "fragment": {"type": "string"},
+                        },
+                        "required": ["n", "fragment"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["echoes"],
+            "additionalProperties": False,
+        },
+    },
+}
+
 
 async def _generate_with_ai(message: str) -> str:
     """Call OpenAI to generate a poetic echo fragment."""
-    from openai import AsyncOpenAI
-
-    client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-    response = await client.chat.completions.create(
-        model=OPENAI_MODEL,
+    response = await llm.chat(
+        "echo",
         messages=[
             {"role": "system", "content": _SYSTEM_PROMPT},
             {"role": "user", "content": message},
@@ -57,6 +107,150 @@ async def _generate_with_ai(message: str) -> str:
     return response.choices[0].message.content.strip()
 
 
+async def _generate_batch_with_ai(messages: list[str]) -> list[str | None]:
+    """One request for several messages; None where the model skipped one."""
+    response = await llm.chat(
+        "echo",
+        messages=[
+            {"role": "system", "content": _BATCH_PROMPT},
+            {"role": "user", "content": json.dumps(
+                [{"n": i, "message": m} for i, m in enumerate(messages)], ensure_ascii=False,
+            )},
+        ],
+        response_format=_BATCH_FORMAT,
+        temperature=0.85,
+        max_tokens=80 * len(messages) + 40,
+    )
+    fragments: list[str | None] = [None] * len(messages)
+    for item in json.loads(response.choices[0].message.content)["echoes"]:
+        n, fragment = item["n"], item["fragment"].strip()
+        if 0 <= n < len(messages) and fragment:
+            fragments[n] = fragment
+    return fragments
+
+
+class _EchoBatcher:
+    """Collects concurrent transform() calls into shared LLM requests."""
+
+    def __init__(self, window: float = ECHO_BATCH_WINDOW, max_size: int = ECHO_BATCH_MAX) -> None:
+        self.window = window
+        self.max_size = max_size
+        self._pending: list[tuple[str, asyncio.Future[str]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._sending: set[asyncio.Task] = set()
+        self._batches = metrics.counter("echo.batches")
+        self._batch_size = metrics.histogram("echo.batch_size")
+
+    async def transform(self, message: str) -> str:
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._pending.append((message, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future[str]]]) -> None:
+        self._batches.inc()
+        self._batch_size.observe(len(batch))
+        messages = [m for m, _ in batch]
+        try:
+            if len(batch) == 1:
+                fragments: list[str | None] = [await _generate_with_ai(messages[0])]
+            else:
+                fragments = await _generate_batch_with_ai(messages)
+                # Rare, but the model can drop one: ask for those individually.
+                missing = [i for i, f in enumerate(fragments) if f is None]
+                if missing:
+                    logger.warning("Echo batch skipped %d of %d messages", len(missing), len(batch))
+                    for i, fragment in zip(missing, await asyncio.gather(
+                        *(_generate_with_ai(messages[i]) for i in missing)
+                    )):
+                        fragments[i] = fragment
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), fragment in zip(batch, fragments):
+            if not future.done():
+                future.set_result(fragment)
+
+
+_batcher = _EchoBatcher()
+
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Openings the prompt itself uses; a reused fragment swaps one for another.
+_SUBJECTS = ("Someone", "A stranger", "A voice", "A visitor", "Somebody")
+_SUBJECT_START = re.compile(r"^(" + "|".join(_SUBJECTS) + r")\b")
+
+
+def _memo_key(message: str) -> str:
+    normalized = _NON_WORD.sub(" ", unicodedata.normalize("NFKC", message).casefold()).strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+
+def _vary(fragment: str, seed: str) -> str:
+    """Swap the fragment's opening subject; stable per seed so job retries agree."""
+    match = _SUBJECT_START.match(fragment)
+    if match is None:
+        return fragment
+    other = random.Random(seed).choice([s for s in _SUBJECTS if s != match.group(1)])
+    return other + fragment[match.end():]
+
+
+class _EchoMemo:
+    """Fragments by message hash: an in-memory LRU over the echo_memo table."""
+
+    def __init__(self, size: int = ECHO_MEMO_SIZE) -> None:
+        self.size = size
+        self._lru: OrderedDict[str, str] = OrderedDict()
+        self._hits = metrics.counter("echo.memo.hits")
+        self._misses = metrics.counter("echo.memo.misses")
+        metrics.gauge("echo.memo.hit_rate", self.hit_rate)
+
+    def hit_rate(self) -> float | None:
+        lookups = self._hits.value + self._misses.value
+        return round(self._hits.value / lookups, 3) if lookups else None
+
+    def get(self, key: str) -> str | None:
+        fragment = self._lru.get(key)
+        if fragment is None:
+            fragment = storage.get_echo_memo(key)
+        if fragment is None:
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        self._remember(key, fragment)
+        storage.touch_echo_memo(key)
+        return fragment
+
+    def put(self, key: str, fragment: str) -> None:
+        self._remember(key, fragment)
+        storage.save_echo_memo(key, fragment)
+
+    def _remember(self, key: str, fragment: str) -> None:
+        self._lru[key] = fragment
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+
+_memo = _EchoMemo()
+
+
 def _generate_mock(message: str) -> str:
     """Fallback fragment for mock/no-API-key mode."""
     words = message.lower().split()
@@ -69,25 +263,41 @@ def _generate_mock(message: str) -> str:
     return "A quiet presence passed through."
 
 
-async def generate_echo(visitor_entry_id: str, message: str) -> None:
+async def generate_echo(visitor_entry_id: str) -> None:
     """
     Generate a poetic echo fragment from a visitor message and store it.
 
-    Called as a background task — failures are logged but never raised.
+    Runs as an "echo" job, so failures raise and the queue retries them.
+    Idempotent: the echo's id is derived from the visitor entry, so a
+    retried job overwrites rather than duplicates.
     """
-    try:
-        # Sanitize before sending to LLM (defense-in-depth against prompt injection)
-        safe_message = sanitize_for_context(message)
-        if MOCK_MODE:
-            fragment = _generate_mock(safe_message)
+    entry = storage.get_entry("visitor", visitor_entry_id)
+    if entry is None or entry.get("status") == "hidden":
+        logger.info("Skipping echo for %s (deleted or hidden)", visitor_entry_id)
+        return
+
+    # Sanitize before sending to LLM (defense-in-depth against prompt injection)
+    safe_message = sanitize_for_context(entry.get("message", ""))
+    if MOCK_MODE:
+        fragment = _generate_mock(safe_message)
+    else:
+        key = _memo_key(safe_message)
+        fragment = _memo.get(key)
+        if fragment is not None:
+            fragment = _vary(fragment, visitor_entry_id)
         else:
-            fragment = await _generate_with_ai(safe_message)
-
-        storage.save_entry("echoes", {
-            "content": fragment,
-            "inspired_by": [visitor_entry_id],
-            "type": "echo",
-        })
-        logger.info("Echo generated for visitor entry %s", visitor_entry_id)
-    except Exception:
-        logger.exception("Echo generation failed for entry %s", visitor_entry_id)
+            fragment = await _batcher.transform(safe_message)
+            _memo.put(key, fragment)
+
+    storage.save_entry("echoes", {
+        "id": f"echo-for-{visitor_entry_id}",
+        "content": fragment,
+        "inspired_by": [visitor_entry_id],
+        "type": "echo",
+    })
+    logger.info("Echo generated for visitor entry %s", visitor_entry_id)
+
+
+@jobs.handler("echo")
+async def echo_job(payload: dict) -> None:
+    await generate_echo(payload["entry_id"])
@@ -0,0 +1,279 @@
+"""
+GPT Home — Event Bus
+
+In-process asyncio pub/sub for storage write events.
+
+Storage write functions publish typed events after their transaction
+commits. Anything that wants to react to writes (SSE streams, caches,
+counters, metrics) subscribes instead of polling SQLite.
+
+    sub = bus.subscribe(EntrySaved, maxsize=64, policy="drop_oldest")
+    async for event in sub:
+        ...
+
+Publishing is safe from any thread: storage runs in FastAPI's threadpool,
+so events from worker threads are handed to the event loop with
+call_soon_threadsafe. Every subscriber has a bounded buffer and a policy
+for what happens when it is full, so a slow consumer can never block a
+writer or grow memory without limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Literal
+
+logger = logging.getLogger(__name__)
+
+Policy = Literal["drop_oldest", "drop_newest", "coalesce"]
+
+
+# --- Event types ---
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class for all bus events."""
+
+    ts: float = field(default_factory=time.time, kw_only=True)
+
+
+@dataclass(frozen=True)
+class EntrySaved(Event):
+    """A thought, dream, visitor message, echo or reply was written."""
+
+    section: str
+    entry_id: str
+
+
+@dataclass(frozen=True)
+class EntryUpdated(Event):
+    """An entry's moderation status changed."""
+
+    section: str
+    entry_id: str
+    status: str
+
+
+@dataclass(frozen=True)
+class EntryDeleted(Event):
+    section: str
+    entry_id: str
+
+
+@dataclass(frozen=True)
+class MemorySaved(Event):
+    """GPT's memory row was rewritten (end of every wake)."""
+
+    mood: str
+
+
+@dataclass(frozen=True)
+class RoomChanged(Event):
+    """A room object was added/modified/removed or the ambient changed."""
+
+    action: str
+    object_id: str | None = None
+
+
+@dataclass(frozen=True)
+class PageChanged(Event):
+    slug: str
+    action: str  # "saved" | "deleted"
+
+
+@dataclass(frozen=True)
+class NewsChanged(Event):
+    action: str  # "saved" | "read" | "deleted"
+
+
+@dataclass(frozen=True)
+class JobQueued(Event):
+    """A background job was enqueued (wakes idle job runners)."""
+
+    kind: str
+    job_id: int
+
+
+@dataclass(frozen=True)
+class WakeCompleted(Event):
+    mood: str
+    actions: tuple[str, ...] = ()
+
+
+# --- Subscriptions ---
+
+
+class Subscription:
+    """
+    A bounded buffer of events for one consumer.
+
+    Policies when the buffer is full:
+      drop_oldest — discard the oldest buffered event (latest-wins streams)
+      drop_newest — discard the incoming event (keep history, lose the tail)
+      coalesce    — keep one pending event per key(event); a newer event with
+                    the same key replaces the buffered one. Falls back to
+                    drop_oldest when there are more distinct keys than maxsize.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        types: tuple[type[Event], ...],
+        maxsize: int,
+        policy: Policy,
+        key: Callable[[Event], Hashable] | None,
+    ) -> None:
+        self._bus = bus
+        self.types = types
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._key = key or type
+        self._fifo: deque[Event] = deque()
+        self._pending: OrderedDict[Hashable, Event] = OrderedDict()
+        self._ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending) if self.policy == "coalesce" else len(self._fifo)
+
+    def _offer(self, event: Event) -> None:
+        """Called on the event loop thread by the bus."""
+        if self.closed:
+            return
+        if self.policy == "coalesce":
+            k = self._key(event)
+            if k in self._pending:
+                del self._pending[k]
+                self.dropped += 1
+            elif len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[k] = event
+        elif len(self._fifo) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == "drop_newest":
+                return
+            self._fifo.popleft()
+            self._fifo.append(event)
+        else:
+            self._fifo.append(event)
+        self._ready.set()
+
+    def get_nowait(self) -> Event | None:
+        if self.policy == "coalesce":
+            if not self._pending:
+                return None
+            return self._pending.popitem(last=False)[1]
+        return self._fifo.popleft() if self._fifo else None
+
+    async def get(self) -> Event:
+        """Wait for the next event. Raises StopAsyncIteration once closed."""
+        while True:
+            event = self.get_nowait()
+            if event is not None:
+                return event
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        return await self.get()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+        self._bus._remove(self)
+
+
+# --- Bus ---
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self._subscribers: list[Subscription] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.published = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Attach the bus to the application's event loop (call at startup)."""
+        self._loop = loop or asyncio.get_running_loop()
+
+    def subscribe(
+        self,
+        *types: type[Event],
+        maxsize: int = 256,
+        policy: Policy = "drop_oldest",
+        key: Callable[[Event], Hashable] | None = None,
+    ) -> Subscription:
+        """Subscribe to one or more event types (all events if none given)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is None or self._loop.is_closed():
+            self._loop = loop
+        sub = Subscription(self, types or (Event,), maxsize, policy, key)
+        self._subscribers.append(sub)
+        return sub
+
+    def _remove(self, sub: Subscription) -> None:
+        try:
+            self._subscribers.remove(sub)
+        except ValueError:
+            pass
+
+    def publish(self, event: Event) -> None:
+        """
+        Publish an event. Never blocks and never raises.
+
+        Callable from the event loop or from any thread; events from other
+        threads are dispatched on the loop in publication order.
+        """
+        loop = self._loop
+        if not self._subscribers or loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        try:
+            if running is loop:
+                self._dispatch(event)
+            else:
+                loop.call_soon_threadsafe(self._dispatch, event)
+        except RuntimeError:
+            pass  # loop shut down between the check and the call
+
+    def _dispatch(self, event: Event) -> None:
+        self.published += 1
+        for sub in list(self._subscribers):
+            if isinstance(event, sub.types):
+                try:
+                    sub._offer(event)
+                except Exception:
+                    logger.exception("Event subscriber failed to accept %s", type(event).__name__)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "published": self.published,
+            "subscribers": [
+                {
+                    "types": [t.__name__ for t in s.types],
+                    "policy": s.policy,
+                    "buffered": len(s),
+                    "maxsize": s.maxsize,
+                    "dropped": s.dropped,
+                }
+                for s in self._subscribers
+            ],
+        }
+
+
+bus = EventBus()
@@ -4,18 +4,28 @@ GPT Home — GPT Mind (The Core)
 The wake cycle: Perceive → Wake → Remember
 One API call. GPT receives everything, decides and creates in a single breath.
 
-In mock mode (no API key), uses mock_writer for local testing.
+In mock mode (no API key), uses mock_writer for local testing. In live
+mode, a wake whose first model call fails (circuit open, deadline, provider
+error) degrades to mock_writer.rest() and leaves memory untouched, so the
+next wake still sees the visitors and news this one couldn't read.
+
+Live wakes are checkpointed turn by turn (in_progress_wakes). On startup,
+recover_interrupted_wakes() resumes a wake the process died in the middle
+of, or — if it's too old to pick up again — closes it with what it did.
 """
 
 import json
 import logging
+import time
 from datetime import date, datetime, timezone
 from pathlib import Path
 
 import httpx
+from openai import APIError
 
-from backend.config import DATA_DIR, MOCK_MODE
-from backend.services import storage
+from backend.config import DATA_DIR, MOCK_MODE, WAKE_LEASE_TTL, WAKE_RESUME_WINDOW
+from backend.services import gpt_writer, leases, llm, mock_writer, storage
+from backend.services.events import WakeCompleted, bus
 from backend.services.security import sanitize_for_context
 
 if MOCK_MODE:
@@ -405,11 +415,21 @@ async def wake_up(session_type: str = "") -> dict:
 
     Perceive → Wake (agentic tool loop) → Remember
 
+    Only one wake runs at a time across all processes: the "wake" lease is
+    held for the whole cycle, and LeaseHeld is raised if another is running.
+    If the lease is lost midway the wake is cancelled (LeaseLost); its
+    checkpoint is left for recover_interrupted_wakes().
+
     Args:
         session_type: e.g. "morning", "midnight". Falls back to hour-based detection.
 
     Returns a summary of what GPT did.
     """
+    async with leases.hold("wake", WAKE_LEASE_TTL):
+        return await _wake_cycle(session_type)
+
+
+async def _wake_cycle(session_type: str) -> dict:
     if not session_type:
         session_type = _session_type_now()
 
@@ -417,6 +437,7 @@ async def wake_up(session_type: str = "") -> dict:
     logger.info("GPT waking up... [%s mode, session=%s]", mode, session_type)
 
     # --- PERCEIVE ---
+    perceived_at = datetime.now(timezone.utc).isoformat()
     memory = storage.read_memory()
     last_wake = memory.get("last_wake_time", "2000-01-01T00:00:00+00:00")
 
@@ -447,8 +468,53 @@ async def wake_up(session_type: str = "") -> dict:
                 len(new_visitors), len(recent_thoughts), len(recent_dreams), len(admin_news))
 
     # --- WAKE (agentic tool loop) ---
-    result = await writer.wake(system_prompt, context, session_type=session_type)
+    wake_id = None
+    if not MOCK_MODE:
+        wake_id = storage.generate_id("wakes")
+        storage.begin_wake(wake_id, session_type, {
+            "perceived_at": perceived_at,
+            "visitors_read": [v.get("id", "") for v in new_visitors],
+            "news_ids": [n["id"] for n in admin_news],
+        })
+    try:
+        result = await writer.wake(system_prompt, context, session_type=session_type, wake_id=wake_id)
+    except (llm.LLMUnavailable, APIError) as exc:
+        logger.error("Model unavailable, degraded wake: %s", exc)
+        if wake_id:
+            storage.finish_wake(wake_id)
+        result = await mock_writer.rest(type(exc).__name__)
+        storage.log_activity("wake", f"mode=DEGRADED, error={type(exc).__name__}: {str(exc)[:200]}")
+        return {
+            "wake_time": datetime.now(timezone.utc).isoformat(),
+            "actions": [],
+            "mood": result["mood"],
+            "turns": 0,
+            "has_self_prompt": False,
+            "mode": "DEGRADED",
+        }
 
+    # --- REMEMBER ---
+    summary = _remember(
+        result, mode,
+        perceived_at=perceived_at,
+        visitors_read=[v.get("id", "") for v in new_visitors],
+        news_ids=[n["id"] for n in admin_news],
+    )
+    if wake_id:
+        storage.finish_wake(wake_id)
+    return summary
+
+
+def _remember(
+    result: dict, mode: str, *, perceived_at: str, visitors_read: list[str], news_ids: list[int],
+) -> dict:
+    """
+    The REMEMBER phase: self-prompt, memory, news, activity log, WakeCompleted.
+
+    `perceived_at` becomes last_wake_time: the moment the wake read its
+    visitors, not the moment it ended, so whoever posted while it ran (or
+    while it lay interrupted) is still new to the next wake.
+    """
     mood = result.get("mood", "quiet")
     self_prompt = result.get("self_prompt", "")
 
@@ -459,25 +525,26 @@ async def wake_up(session_type: str = "") -> dict:
         _save_self_prompt(self_prompt)
         logger.info("Self-prompt saved for next wake (%d chars)", len(self_prompt))
 
-    # --- REMEMBER ---
     # ACT phase removed: GPT writes directly via save_thought/save_dream tools during wake.
     new_memory = {
-        "last_wake_time": datetime.now(timezone.utc).isoformat(),
-        "visitors_read": [v.get("id", "") for v in new_visitors],
+        "last_wake_time": perceived_at,
+        "visitors_read": visitors_read,
         "actions_taken": result.get("actions_taken", []),
         "mood": mood,
         "plans": [],  # Plans now live in self_prompt prose
     }
     storage.save_memory(new_memory)
 
-    if admin_news:
-        storage.mark_news_read([n["id"] for n in admin_news])
+    if news_ids:
+        storage.mark_news_read(news_ids)
 
     storage.log_activity(
         "wake",
         f"mode={mode}, actions={result.get('actions_taken', [])}, mood={mood}, turns={result.get('turns', 0)}",
     )
 
+    bus.publish(WakeCompleted(mood=mood, actions=tuple(result.get("actions_taken", []))))
+
     logger.info("Memory saved. Actions: %s, Self-prompt: %s",
                 result.get("actions_taken", []), "yes" if self_prompt else "no")
 
@@ -489,3 +556,54 @@ async def wake_up(session_type: str = "") -> dict:
         "has_self_prompt": bool(self_prompt),
         "mode": mode,
     }
+
+
+async def recover_interrupted_wakes() -> list[dict]:
+    """
+    Deal with wakes a crash or deploy cut off (call once at startup).
+
+    A checkpoint younger than WAKE_RESUME_WINDOW is resumed where it
+    stopped: the model isn't asked again for turns it already answered and
+    tools that already ran aren't run again. Older ones, or ones the model
+    can't be reached for, are finalized as they stand. Either way the
+    REMEMBER phase runs, so the visitors and news the wake read are marked.
+
+    Holds the "wake" lease: a checkpoint another process is still writing
+    belongs to a live wake, not a crashed one, so there's nothing to do then.
+    """
+    if not storage.list_interrupted_wakes():
+        return []  # the common case: don't block a wake queued at startup
+    try:
+        async with leases.hold("wake", WAKE_LEASE_TTL):
+            return await _recover()
+    except leases.LeaseHeld as exc:
+        logger.info("Skipping wake recovery: %s", exc)
+        return []
+    except leases.LeaseLost as exc:
+        logger.error("Wake recovery cut short: %s", exc)
+        return []
+
+
+async def _recover() -> list[dict]:
+    summaries = []
+    for checkpoint in storage.list_interrupted_wakes():
+        age = time.time() - checkpoint["updated_ts"] / 1_000_000
+        result = None
+        if checkpoint["turns"] and age < WAKE_RESUME_WINDOW and not MOCK_MODE:
+            try:
+                result = await gpt_writer.resume(checkpoint)
+                mode = "RESUMED"
+            except (llm.LLMUnavailable, APIError) as exc:
+                logger.warning("Could not resume wake %s: %s", checkpoint["id"], exc)
+        if result is None:
+            result = gpt_writer.finalize(checkpoint)
+            mode = "FINALIZED"
+        summaries.append(_remember(
+            result, mode,
+            perceived_at=checkpoint["meta"]["perceived_at"],
+            visitors_read=checkpoint["meta"].get("visitors_read", []),
+            news_ids=checkpoint["meta"].get("news_ids", []),
+        ))
+        storage.finish_wake(checkpoint["id"])
+        logger.info("Interrupted wake %s %s after %d turns", checkpoint["id"], mode.lower(), result["turns"])
+    return summaries
@@ -11,26 +11,28 @@ Returns: {actions_taken, files_written, mood, summary, self_prompt, turns}
 import json
 import logging
 import subprocess
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Callable
 
-from openai import AsyncOpenAI
+from openai import APIError
 
 from backend.config import (
     BASE_DIR,
     DATA_DIR,
     GPT_TEMPERATURE,
     MAX_WAKE_TURNS,
-    OPENAI_API_KEY,
-    OPENAI_MODEL,
     PLAYGROUND_DIR,
+    WAKE_DEADLINE,
+    WAKE_TURN_TIMEOUT,
 )
 
 FRONTEND_APP_DIR = BASE_DIR.parent / "frontend" / "app"
-from backend.services import storage
+from backend.services import llm, storage
 
 logger = logging.getLogger(__name__)
 
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-
 # Directories that may be read but never written
 _READ_ONLY_DIRS = {"visitors", "news", "gifts", "backups"}
 
@@ -647,15 +649,18 @@ def _tool_write_file(path: str, content: str) -> str:
             if stripped.startswith("# "):
                 title = stripped[2:].strip()
                 break
-        try:
-            storage.save_custom_page(
+        def write(uow: storage.UnitOfWork) -> str:
+            uow.save_custom_page(
                 slug=slug,
                 title=title,
                 content=content,
                 created_by="gpt",
             )
-            storage.log_activity("page_saved", f"/{slug}")
+            uow.log_activity("page_saved", f"/{slug}")
             return f"Page saved: /{slug} (title: {title!r}, {len(content)} chars)"
+
+        try:
+            return _once(write)
         except Exception as exc:
             return f"Error saving page '{slug}': {exc}"
 
@@ -899,15 +904,46 @@ def _tool_run_python(code: str) -> str:
         return f"Error: {exc}"
 
 
+# (wake_id, tool_call_id, tool name) of the tool call being run, inside a checkpointed wake
+_current_call: ContextVar[tuple[str, str, str] | None] = ContextVar("wake_tool_call", default=None)
+
+
+def _once(write: Callable[[storage.UnitOfWork], str]) -> str:
+    """
+    Run a tool's database writes as write(uow) and return its result. Inside
+    a checkpointed wake the tool call is recorded in the same transaction,
+    so a wake resumed after a crash can never run them twice.
+    """
+    call = _current_call.get()
+
+    def run(uow: storage.UnitOfWork) -> str:
+        result = write(uow)
+        if call:
+            uow.record_tool_call(*call, result)
+        return result
+
+    return storage.unit_of_work(run)
+
+
+def _save_once(section: str, data: dict, describe: Callable[[dict], str], activity: tuple[str, str] | None = None) -> str:
+    """Save an entry (see _once) and return describe(saved)."""
+    def write(uow: storage.UnitOfWork) -> str:
+        result = describe(uow.save_entry(section, data))
+        if activity:
+            uow.log_activity(*activity)
+        return result
+
+    return _once(write)
+
+
 def _tool_save_thought(title: str, content: str, mood: str = "") -> str:
     try:
-        saved = storage.save_entry("thoughts", {
+        return _save_once("thoughts", {
             "title": title,
             "content": content,
             "mood": mood or "",
             "type": "thought",
-        })
-        return f"Thought saved (id: {saved['id']})"
+        }, lambda saved: f"Thought saved (id: {saved['id']})")
     except Exception as exc:
         return f"Error saving thought: {exc}"
 
@@ -919,14 +955,13 @@ def _tool_save_dream(
     inspired_by: list | None = None,
 ) -> str:
     try:
-        saved = storage.save_entry("dreams", {
+        return _save_once("dreams", {
             "title": title,
             "content": content,
             "mood": mood or "",
             "type": "dream",
             "inspired_by": inspired_by or [],
-        })
-        return f"Dream saved (id: {saved['id']})"
+        }, lambda saved: f"Dream saved (id: {saved['id']})")
     except Exception as exc:
         return f"Error saving dream: {exc}"
 
@@ -940,16 +975,15 @@ def _tool_reply_visitor(visitor_id: str, content: str) -> str:
         return f"Error: visitor message '{visitor_id}' not found."
     # Sanitize reply content (defense-in-depth against prompt injection via GPT output)
     content = sanitize_for_context(content)
+    visitor_name = visitor.get("name", "Anonymous")
     try:
-        saved = storage.save_entry("visitor_replies", {
+        return _save_once("visitor_replies", {
             "content": content,
             "inspired_by": [visitor_id],
             "type": "reply",
             "name": "GPT",
-        })
-        storage.log_activity("visitor_reply", f"to={visitor_id}")
-        visitor_name = visitor.get("name", "Anonymous")
-        return f"Reply saved to {visitor_name}'s message (id: {saved['id']})"
+        }, lambda saved: f"Reply saved to {visitor_name}'s message (id: {saved['id']})",
+            activity=("visitor_reply", f"to={visitor_id}"))
     except Exception as exc:
         return f"Error replying to visitor: {exc}"
 
@@ -963,16 +997,19 @@ def _tool_save_page(
     slug = slug.strip().lower()
     if not slug or slug in _PROTECTED_PAGE_SLUGS:
         return f"Error: '{slug}' is a protected or invalid page slug."
-    try:
-        storage.save_custom_page(
+    def write(uow: storage.UnitOfWork) -> str:
+        uow.save_custom_page(
             slug=slug,
             title=title,
             content=content,
             created_by="gpt",
             show_in_nav=show_in_nav,
         )
-        storage.log_activity("page_saved", f"/{slug}")
+        uow.log_activity("page_saved", f"/{slug}")
         return f"Page saved: /{slug} (title: {title!r}, {len(content)} chars, nav={'yes' if show_in_nav else 'no'})"
+
+    try:
+        return _once(write)
     except Exception as exc:
         return f"Error saving page '{slug}': {exc}"
 
@@ -1000,9 +1037,13 @@ def _tool_room_edit(action: str, **kwargs) -> str:
             position = kwargs.get("position", [0, 0, 0])
             color = kwargs.get("color", "#ffffff")
             metadata = kwargs.get("metadata", {})
-            obj = storage.add_room_object(obj_type, position, color, metadata)
-            storage.log_activity("room_add", f"{obj_type} at {position}")
-            return f"Added {obj_type} to room (id: {obj['id']}, pos: {obj['position']}, color: {color})"
+
+            def add(uow: storage.UnitOfWork) -> str:
+                obj = uow.add_room_object(obj_type, position, color, metadata)
+                uow.log_activity("room_add", f"{obj_type} at {position}")
+                return f"Added {obj_type} to room (id: {obj['id']}, pos: {obj['position']}, color: {color})"
+
+            return _once(add)
 
         if action == "modify":
             obj_id = kwargs.get("object_id", "")
@@ -1017,27 +1058,39 @@ def _tool_room_edit(action: str, **kwargs) -> str:
                 updates["metadata"] = kwargs["metadata"]
             if not updates:
                 return "Error: provide at least one of position, color, or metadata to modify."
-            result = storage.update_room_object(obj_id, **updates)
-            if not result:
-                return f"Error: object '{obj_id}' not found."
-            storage.log_activity("room_modify", f"{obj_id}: {list(updates.keys())}")
-            return f"Modified {result['type']} ({obj_id}): {', '.join(f'{k}={v}' for k, v in updates.items())}"
+
+            def modify(uow: storage.UnitOfWork) -> str:
+                result = uow.update_room_object(obj_id, **updates)
+                if not result:
+                    return f"Error: object '{obj_id}' not found."
+                uow.log_activity("room_modify", f"{obj_id}: {list(updates.keys())}")
+                return f"Modified {result['type']} ({obj_id}): {', '.join(f'{k}={v}' for k, v in updates.items())}"
+
+            return _once(modify)
 
         if action == "remove":
             obj_id = kwargs.get("object_id", "")
             if not obj_id:
                 return "Error: object_id is required for action='remove'."
-            if not storage.remove_room_object(obj_id):
-                return f"Error: object '{obj_id}' not found."
-            storage.log_activity("room_remove", obj_id)
-            return f"Removed object {obj_id} from room."
+
+            def remove(uow: storage.UnitOfWork) -> str:
+                if not uow.remove_room_object(obj_id):
+                    return f"Error: object '{obj_id}' not found."
+                uow.log_activity("room_remove", obj_id)
+                return f"Removed object {obj_id} from room."
+
+            return _once(remove)
 
         if action == "ambient":
             lighting = kwargs.get("lighting", "warm")
             sky_color = kwargs.get("sky_color", "")
-            storage.set_room_ambient(lighting, sky_color)
-            storage.log_activity("room_ambient", f"lighting={lighting}, sky={sky_color or '(unchanged)'}")
-            return f"Room ambient updated: lighting={lighting}" + (f", sky_color={sky_color}" if sky_color else "")
+
+            def ambient(uow: storage.UnitOfWork) -> str:
+                uow.set_room_ambient(lighting, sky_color)
+                uow.log_activity("room_ambient", f"lighting={lighting}, sky={sky_color or '(unchanged)'}")
+                return f"Room ambient updated: lighting={lighting}" + (f", sky_color={sky_color}" if sky_color else "")
+
+            return _once(ambient)
 
         return f"Error: unknown action '{action}'. Use add, modify, remove, or ambient."
     except Exception as exc:
@@ -1123,191 +1176,289 @@ def _msg_to_dict(msg) -> dict:
 
 # ─── Main Wake Loop ───────────────────────────────────────────────────────────
 
-# gpt-4o pricing (per 1M tokens) — update when model changes
-_COST_PER_1M_PROMPT = 2.50
-_COST_PER_1M_COMPLETION = 10.00
-
-
-def _calculate_cost(prompt_tokens: int, completion_tokens: int) -> float:
-    return round(
-        prompt_tokens * _COST_PER_1M_PROMPT / 1_000_000
-        + completion_tokens * _COST_PER_1M_COMPLETION / 1_000_000,
-        6,
-    )
+_ACTION_MAP = {
+    "save_thought":   "thought",
+    "save_dream":     "dream",
+    "save_page":      "page",
+    "reply_visitor":  "visitor_reply",
+    "write_file":     "file_write",
+    "run_python":     "code_run",
+    "room_edit":      "room_edit",
+}
 
+_NUDGE = (
+    "You wrote a text response, but it wasn't saved anywhere. "
+    "To save a thought, use the save_thought tool. "
+    "To save a dream, use the save_dream tool. "
+    "When you're done, call the done() tool. "
+    "You must always call done() to end your wake."
+)
 
-async def wake(system_prompt: str, user_prompt: str, *, session_type: str = "") -> dict:
-    """
-    Agentic wake loop using OpenAI function calling.
 
-    GPT receives context + tools. It explores, creates, and ends by calling done().
-    Returns {actions_taken, files_written, mood, summary, self_prompt, turns,
-             prompt_tokens, completion_tokens, total_tokens, cost_usd}.
-    """
-    messages: list[dict] = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user",   "content": user_prompt},
-    ]
-
-    actions_taken: list[str] = []
-    files_written: list[str] = []
-    prompt_tokens = 0
-    completion_tokens = 0
-    total_tokens = 0
-    nudged = False          # True after we've already reminded GPT to use tools
-    actual_turns = 0        # Track real turn count (for logging if loop exits early)
-
-    _ACTION_MAP = {
-        "save_thought":   "thought",
-        "save_dream":     "dream",
-        "save_page":      "page",
-        "reply_visitor":  "visitor_reply",
-        "write_file":     "file_write",
-        "run_python":     "code_run",
-        "room_edit":      "room_edit",
+@dataclass
+class _WakeState:
+    """Everything a wake needs to carry on — what gets checkpointed each turn."""
+    wake_id: str | None
+    session_type: str
+    messages: list[dict]
+    actions_taken: list[str] = field(default_factory=list)
+    files_written: list[str] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0   # per turn, at the price of the model that answered (see llm.ROUTES)
+    nudged: bool = False    # True after we've already reminded GPT to use tools
+    turns: int = 0          # model replies so far
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict) -> "_WakeState":
+        return cls(checkpoint["id"], checkpoint["session_type"], checkpoint["messages"], **checkpoint["progress"])
+
+    def checkpoint(self) -> None:
+        if self.wake_id is None:
+            return
+        progress = asdict(self)
+        for key in ("wake_id", "session_type", "messages"):
+            del progress[key]
+        storage.checkpoint_wake(self.wake_id, self.messages, progress)
+
+    def unique_actions(self) -> list[str]:
+        return list(dict.fromkeys(self.actions_taken))
+
+
+def _build_result(state: _WakeState, mood: str, summary: str, self_prompt: str) -> dict:
+    cost = round(state.cost_usd, 6)
+
+    # Save transcript
+    try:
+        storage.save_transcript({
+            "session_type": state.session_type or "wake",
+            "messages": state.messages,
+            "turns": state.turns,
+            "prompt_tokens": state.prompt_tokens,
+            "completion_tokens": state.completion_tokens,
+            "total_tokens": state.total_tokens,
+            "cost_usd": cost,
+            "actions": state.unique_actions(),
+            "mood": mood,
+        })
+    except Exception as exc:
+        logger.warning("Failed to save transcript: %s", exc)
+
+    return {
+        "actions_taken":      state.unique_actions(),
+        "files_written":      state.files_written,
+        "mood":               mood,
+        "summary":            summary,
+        "self_prompt":        self_prompt,
+        "turns":              state.turns,
+        "prompt_tokens":      state.prompt_tokens,
+        "completion_tokens":  state.completion_tokens,
+        "total_tokens":       state.total_tokens,
+        "cost_usd": cost,
     }
 
-    def _build_result(mood: str, summary: str, self_prompt: str, turns: int) -> dict:
-        cost = _calculate_cost(prompt_tokens, completion_tokens)
-        unique_actions = list(dict.fromkeys(actions_taken))
 
-        # Save transcript
-        try:
-            storage.save_transcript({
-                "session_type": session_type or "wake",
-                "messages": messages,
-                "turns": turns,
-                "prompt_tokens": prompt_tokens,
-                "completion_tokens": completion_tokens,
-                "total_tokens": total_tokens,
-                "cost_usd": cost,
-                "actions": unique_actions,
-                "mood": mood,
-            })
-        except Exception as exc:
-            logger.warning("Failed to save transcript: %s", exc)
-
-        return {
-            "actions_taken":      unique_actions,
-            "files_written":      files_written,
-            "mood":               mood,
-            "summary":            summary,
-            "self_prompt":        self_prompt,
-            "turns":              turns,
-            "prompt_tokens":      prompt_tokens,
-            "completion_tokens":  completion_tokens,
-            "total_tokens":       total_tokens,
-            "cost_usd": cost,
-        }
+def _log_wake_done(state: _WakeState, outcome: str) -> None:
+    storage.log_activity(
+        "wake_done",
+        f"{outcome}  turns={state.turns}  tokens={state.total_tokens}  "
+        f"cost=${state.cost_usd:.4f}  "
+        f"actions={state.unique_actions()}",
+    )
 
-    for turn in range(MAX_WAKE_TURNS):
-        actual_turns = turn + 1
-        logger.debug("Wake turn %d/%d", actual_turns, MAX_WAKE_TURNS)
 
-        response = await client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=messages,
-            tools=_TOOLS,
-            temperature=GPT_TEMPERATURE,
-        )
+def _run_tool_call(state: _WakeState, call_id: str, name: str, args: dict) -> str:
+    """Run one tool call, or replay its recorded result if it already ran before a restart."""
+    if state.wake_id is None:
+        return _execute_tool(name, args)
+    result = storage.get_tool_call_result(call_id)
+    if result is not None:
+        logger.info("Tool %s (%s) already ran before the restart, reusing its result", name, call_id)
+        return result
+    token = _current_call.set((state.wake_id, call_id, name))
+    try:
+        result = _execute_tool(name, args)
+    finally:
+        _current_call.reset(token)
+    storage.record_tool_call(state.wake_id, call_id, name, result)
+    return result
 
-        if response.usage:
-            prompt_tokens += response.usage.prompt_tokens
-            completion_tokens += response.usage.completion_tokens
-            total_tokens += response.usage.total_tokens
-            logger.debug(
-                "Turn %d tokens: prompt=%d completion=%d total=%d",
-                actual_turns,
-                response.usage.prompt_tokens,
-                response.usage.completion_tokens,
-                response.usage.total_tokens,
-            )
 
-        choice = response.choices[0]
-        messages.append(_msg_to_dict(choice.message))
-
-        # GPT sent a plain text response instead of tool calls
-        if choice.finish_reason == "stop" or not choice.message.tool_calls:
-            text = (choice.message.content or "").strip()
-            if not nudged and text:
-                # First time: nudge GPT back into tool mode
-                nudged = True
-                logger.info(
-                    "GPT wrote text instead of calling tools on turn %d (%d chars). "
-                    "Full text: %s",
-                    actual_turns, len(text), text[:500],
-                )
-                messages.append({
-                    "role": "user",
-                    "content": (
-                        "You wrote a text response, but it wasn't saved anywhere. "
-                        "To save a thought, use the save_thought tool. "
-                        "To save a dream, use the save_dream tool. "
-                        "When you're done, call the done() tool. "
-                        "You must always call done() to end your wake."
-                    ),
-                })
-                continue
-            # Already nudged once (or empty text) — give up
+def _handle_reply(state: _WakeState) -> dict | bool:
+    """
+    Act on the assistant message at the end of state.messages: nudge GPT
+    back to its tools, run its tool calls, or finish. Returns done()'s
+    arguments, False if GPT stopped without done(), True to go on.
+    """
+    reply = state.messages[-1]
+    tool_calls = reply.get("tool_calls") or []
+
+    # GPT sent a plain text response instead of tool calls
+    if not tool_calls:
+        text = (reply.get("content") or "").strip()
+        if not state.nudged and text:
+            # First time: nudge GPT back into tool mode
+            state.nudged = True
             logger.info(
-                "GPT stopped without done() on turn %d. Text: %s",
-                actual_turns, text[:300] if text else "(empty)",
+                "GPT wrote text instead of calling tools on turn %d (%d chars). "
+                "Full text: %s",
+                state.turns, len(text), text[:500],
             )
-            break
+            state.messages.append({"role": "user", "content": _NUDGE})
+            return True
+        # Already nudged once (or empty text) — give up
+        logger.info(
+            "GPT stopped without done() on turn %d. Text: %s",
+            state.turns, text[:300] if text else "(empty)",
+        )
+        return False
 
-        for tool_call in choice.message.tool_calls:
-            name = tool_call.function.name
-            try:
-                args = json.loads(tool_call.function.arguments)
-            except json.JSONDecodeError:
-                args = {}
+    for tool_call in tool_calls:
+        name = tool_call["function"]["name"]
+        try:
+            args = json.loads(tool_call["function"]["arguments"])
+        except json.JSONDecodeError:
+            args = {}
 
-            logger.info("Tool: %-20s  args=%s", name, str(args)[:160])
+        logger.info("Tool: %-20s  args=%s", name, str(args)[:160])
+        # A resumed wake replays calls that already ran (and were logged) from the ledger
+        if state.wake_id is None or storage.get_tool_call_result(tool_call["id"]) is None:
             storage.log_activity("tool_call", f"tool={name}  args={str(args)[:200]}")
 
-            if name in _ACTION_MAP:
-                actions_taken.append(_ACTION_MAP[name])
-            if name == "write_file":
-                files_written.append(args.get("path", ""))
-
-            # done() terminates the loop
-            if name == "done":
-                mood        = args.get("mood", "neutral")
-                summary     = args.get("summary", "")
-                self_prompt = args.get("self_prompt", "")
-                logger.info(
-                    "done() — mood=%s  turns=%d  tokens=%d (p:%d c:%d)  cost=$%.4f  actions=%s",
-                    mood, turn + 1, total_tokens, prompt_tokens, completion_tokens,
-                    _calculate_cost(prompt_tokens, completion_tokens),
-                    list(dict.fromkeys(actions_taken)),
+        if name in _ACTION_MAP:
+            state.actions_taken.append(_ACTION_MAP[name])
+        if name == "write_file":
+            state.files_written.append(args.get("path", ""))
+
+        # done() terminates the loop
+        if name == "done":
+            return args
+
+        result = _run_tool_call(state, tool_call["id"], name, args)
+        logger.debug("Tool result: %s (%d chars)", name, len(result))
+        state.messages.append({
+            "role":         "tool",
+            "tool_call_id": tool_call["id"],
+            "content":      result,
+        })
+    return True
+
+
+async def _run(state: _WakeState) -> dict:
+    deadline = time.monotonic() + WAKE_DEADLINE
+    while True:
+        # A trailing assistant message is a reply we haven't acted on yet
+        # (only after a restart); otherwise ask the model for the next one.
+        if state.messages[-1]["role"] != "assistant":
+            if state.turns >= MAX_WAKE_TURNS:
+                break
+            logger.debug("Wake turn %d/%d", state.turns + 1, MAX_WAKE_TURNS)
+            try:
+                response = await llm.chat(
+                    "wake_turn",
+                    timeout=WAKE_TURN_TIMEOUT,
+                    deadline=deadline,
+                    messages=state.messages,
+                    tools=_TOOLS,
+                    temperature=GPT_TEMPERATURE,
                 )
-                storage.log_activity(
-                    "wake_done",
-                    f"mood={mood}  turns={turn+1}  tokens={total_tokens}  "
-                    f"cost=${_calculate_cost(prompt_tokens, completion_tokens):.4f}  "
-                    f"actions={list(dict.fromkeys(actions_taken))}",
+            except (llm.LLMUnavailable, APIError) as exc:
+                if state.turns == 0:
+                    raise
+                logger.warning("Wake cut short on turn %d: %s", state.turns + 1, exc)
+                _log_wake_done(state, f"cut_short  error={type(exc).__name__}")
+                return _build_result(state, "quiet", f"Wake cut short: {exc}", "")
+
+            state.turns += 1
+            if response.usage:
+                state.prompt_tokens += response.usage.prompt_tokens
+                state.completion_tokens += response.usage.completion_tokens
+                state.total_tokens += response.usage.total_tokens
+                state.cost_usd += llm.cost(
+                    response.model, response.usage.prompt_tokens, response.usage.completion_tokens,
                 )
-                return _build_result(mood, summary, self_prompt, turn + 1)
-
-            result = _execute_tool(name, args)
-            logger.debug("Tool result: %s (%d chars)", name, len(result))
-            messages.append({
-                "role":         "tool",
-                "tool_call_id": tool_call.id,
-                "content":      result,
-            })
+                logger.debug(
+                    "Turn %d tokens: prompt=%d completion=%d total=%d",
+                    state.turns,
+                    response.usage.prompt_tokens,
+                    response.usage.completion_tokens,
+                    response.usage.total_tokens,
+                )
+            state.messages.append(_msg_to_dict(response.choices[0].message))
+            state.checkpoint()
+
+        outcome = _handle_reply(state)
+        if isinstance(outcome, dict):
+            mood        = outcome.get("mood", "neutral")
+            summary     = outcome.get("summary", "")
+            self_prompt = outcome.get("self_prompt", "")
+            logger.info(
+                "done() — mood=%s  turns=%d  tokens=%d (p:%d c:%d)  cost=$%.4f  actions=%s",
+                mood, state.turns, state.total_tokens, state.prompt_tokens, state.completion_tokens,
+                state.cost_usd, state.unique_actions(),
+            )
+            _log_wake_done(state, f"mood={mood}")
+            return _build_result(state, mood, summary, self_prompt)
+        if not outcome:
+            break
+        state.checkpoint()
 
     # Fell off the end without done()
     logger.warning(
         "Wake ended without done() — turns=%d  tokens=%d  cost=$%.4f  actions=%s",
-        actual_turns, total_tokens,
-        _calculate_cost(prompt_tokens, completion_tokens),
-        list(dict.fromkeys(actions_taken)),
-    )
-    storage.log_activity(
-        "wake_done",
-        f"no_done  turns={actual_turns}  tokens={total_tokens}  "
-        f"cost=${_calculate_cost(prompt_tokens, completion_tokens):.4f}  "
-        f"actions={list(dict.fromkeys(actions_taken))}",
+        state.turns, state.total_tokens, state.cost_usd, state.unique_actions(),
     )
-    return _build_result("quiet", "Ended without calling done()", "", actual_turns)
+    _log_wake_done(state, "no_done")
+    return _build_result(state, "quiet", "Ended without calling done()", "")
+
+
+async def wake(
+    system_prompt: str,
+    user_prompt: str,
+    *,
+    session_type: str = "",
+    wake_id: str | None = None,
+) -> dict:
+    """
+    Agentic wake loop using OpenAI function calling.
+
+    GPT receives context + tools. It explores, creates, and ends by calling done().
+    Returns {actions_taken, files_written, mood, summary, self_prompt, turns,
+             prompt_tokens, completion_tokens, total_tokens, cost_usd}.
+
+    Each model call gets WAKE_TURN_TIMEOUT per attempt, the loop as a whole
+    WAKE_DEADLINE. If the model becomes unreachable after the first turn,
+    the wake ends early with what GPT has done so far; on the first turn
+    the error propagates (nothing happened yet, see gpt_mind.wake_up).
+
+    With a wake_id (see storage.begin_wake), the conversation and counters
+    are checkpointed after every model reply and every round of tool calls,
+    and each tool call is recorded by its tool_call_id, so resume() can
+    carry on after a crash without re-asking the model for turns it already
+    answered or re-running its database writes (entries, pages, room edits:
+    recorded in the same transaction, see _once). Files and run_python sit
+    outside the database: one cut off between its effect and its record
+    runs again — write_file overwrites with the same content, so that's
+    harmless.
+    """
+    state = _WakeState(wake_id, session_type, [
+        {"role": "system", "content": system_prompt},
+        {"role": "user",   "content": user_prompt},
+    ])
+    return await _run(state)
+
+
+async def resume(checkpoint: dict) -> dict:
+    """Carry on an interrupted wake from its last checkpoint."""
+    state = _WakeState.from_checkpoint(checkpoint)
+    logger.info("Resuming wake %s after turn %d", state.wake_id, state.turns)
+    return await _run(state)
+
+
+def finalize(checkpoint: dict) -> dict:
+    """Close an interrupted wake as it stands, without asking the model for more."""
+    state = _WakeState.from_checkpoint(checkpoint)
+    logger.info("Finalizing interrupted wake %s after turn %d", state.wake_id, state.turns)
+    _log_wake_done(state, "interrupted")
+    return _build_result(state, "quiet", "Wake was interrupted", "")
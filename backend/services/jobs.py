@@ -0,0 +1,203 @@
+"""
+GPT Home — Background Jobs
+
+A durable job queue in the `jobs` table, for async work that must not be
+lost on a restart or a failed LLM call (echo generation, for now).
+
+    @jobs.handler("echo")
+    async def echo_job(payload: dict) -> None: ...
+
+    uow.enqueue_job("echo", {"entry_id": ...}, dedupe_key=...)  # with the write that needs it
+    jobs.enqueue("echo", {...})                                  # or on its own
+
+The runner leases one job at a time per free slot (JOB_WORKERS per
+process). A lease expires unless the worker keeps heartbeating, so the job
+of a crashed worker is picked up again; JOB_CONCURRENCY caps running jobs
+across all processes, which keeps simultaneous LLM calls bounded. Failed
+jobs retry with exponential backoff and jitter until max_attempts, then
+stay in the table as dead letters for the admin panel to inspect or retry.
+Higher priority runs first, then oldest.
+
+Handlers must be idempotent: a job can run twice if its worker dies after
+the work but before the job is marked done. Whatever a handler returns is
+stored on the job (as JSON) for callers that enqueue and poll; a long one
+can store its progress there while it runs with jobs.report().
+
+Only the kinds registered in a process are claimed there: echo jobs run
+wherever services/echo.py is imported, wake and security_rescan jobs only
+in backend/worker.py.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from backend.config import (
+    JOB_BACKOFF_BASE,
+    JOB_BACKOFF_MAX,
+    JOB_CONCURRENCY,
+    JOB_LEASE_SECONDS,
+    JOB_POLL_SECONDS,
+    JOB_WORKERS,
+)
+from backend.services import storage
+from backend.services.events import JobQueued, bus
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict[str, Any]], Awaitable[Any]]
+
+_handlers: dict[str, Handler] = {}
+
+_current: ContextVar[tuple[int, str] | None] = ContextVar("current_job", default=None)
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the async function that runs jobs of `kind`."""
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def enqueue(kind: str, payload: dict[str, Any], **kwargs: Any) -> int | None:
+    """Queue a job (see UnitOfWork.enqueue_job for the options)."""
+    return storage.enqueue_job(kind, payload, **kwargs)
+
+
+def report(progress: Any) -> None:
+    """
+    Store the running job's progress (JSON) where its result will go, for
+    callers polling it. Blocking: call it from the handler's thread, or via
+    asyncio.to_thread. A no-op outside a job.
+    """
+    current = _current.get()
+    if current is not None:
+        storage.report_job_progress(*current, progress)
+
+
+def backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts`: doubling, capped, half of it jittered."""
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class JobRunner:
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        concurrency: int = JOB_CONCURRENCY,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+    ) -> None:
+        self.workers = workers
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._loop_task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+        self._stopping = False
+
+        self._done = metrics.counter("jobs.done")
+        self._retried = metrics.counter("jobs.retried")
+        self._dead = metrics.counter("jobs.dead")
+        self._wait_ms = metrics.histogram("jobs.wait_ms")
+        self._run_ms = metrics.histogram("jobs.run_ms")
+        metrics.gauge("jobs.active", lambda: len(self._running))
+
+    async def start(self) -> None:
+        if self._loop_task is None:
+            self._stopping = False
+            self._loop_task = asyncio.create_task(self._claim_loop(), name="job-runner")
+            logger.info("Job runner started (%s, %d slots, kinds: %s)",
+                        self.owner, self.workers, ", ".join(sorted(_handlers)) or "none")
+
+    async def stop(self) -> None:
+        """Stop claiming, cancel running jobs and hand them back to the queue."""
+        if self._loop_task is None:
+            return
+        # The flag too: wait_for() can swallow a cancel that lands as its wait completes.
+        self._stopping = True
+        self._loop_task.cancel()
+        tasks = [self._loop_task, *self._running]
+        for task in self._running:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    async def _claim_loop(self) -> None:
+        slots = asyncio.Semaphore(self.workers)
+        queued = bus.subscribe(JobQueued, maxsize=1, policy="drop_newest")
+        try:
+            while not self._stopping:
+                await slots.acquire()
+                try:
+                    job = await asyncio.to_thread(
+                        storage.claim_job, self.owner, self.lease_seconds, self.concurrency, list(_handlers),
+                    )
+                except Exception:
+                    logger.exception("Claiming a job failed")
+                    job = None
+                if job is None:
+                    slots.release()
+                    try:
+                        await asyncio.wait_for(queued.get(), self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                task = asyncio.create_task(self._run(job), name=f"job-{job['id']}")
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                task.add_done_callback(lambda _: slots.release())
+        finally:
+            queued.close()
+
+    async def _heartbeat(self, job: dict[str, Any]) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(storage.heartbeat_job, job["id"], self.owner, self.lease_seconds):
+                logger.warning("Lost the lease on job %s (%s)", job["id"], job["kind"])
+                return
+
+    async def _run(self, job: dict[str, Any]) -> None:
+        job_id, kind = job["id"], job["kind"]
+        self._wait_ms.observe(max(0, job["started_ts"] - job["run_after"]) / 1000)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        start = time.perf_counter()
+        _current.set((job_id, self.owner))  # this task's context only
+        try:
+            result = await _handlers[kind](job["payload"])
+        except asyncio.CancelledError:
+            storage.release_job(job_id, self.owner)
+            raise
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            if job["attempts"] < job["max_attempts"]:
+                delay = backoff(job["attempts"])
+                await asyncio.to_thread(storage.fail_job, job_id, self.owner, error, delay)
+                self._retried.inc()
+                logger.warning("Job %s (%s) failed, attempt %d/%d, retrying in %.0fs: %s",
+                               job_id, kind, job["attempts"], job["max_attempts"], delay, error)
+            else:
+                await asyncio.to_thread(storage.fail_job, job_id, self.owner, error, None)
+                self._dead.inc()
+                logger.error("Job %s (%s) dead after %d attempts: %s", job_id, kind, job["attempts"], error)
+        else:
+            await asyncio.to_thread(storage.complete_job, job_id, self.owner, result)
+            self._done.inc()
+        finally:
+            heartbeat.cancel()
+            self._run_ms.observe((time.perf_counter() - start) * 1000)
+
+
+runner = JobRunner()
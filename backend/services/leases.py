@@ -0,0 +1,154 @@
+"""
+GPT Home — Leases
+
+Named locks in the `leases` table, shared by every process on the
+database (uvicorn workers, the job worker). A lease has an owner and an
+expiry: the holder keeps pushing the expiry out while it works, so a
+holder that crashes frees the lease after at most one TTL.
+
+    async with leases.hold("wake", ttl=60):     # raises LeaseHeld if taken
+        ...                                     # LeaseLost if it's lost midway
+
+    lease = leases.Lease("scheduler", ttl=30)   # leader election: call
+    if await lease.acquire(): ...                # acquire() every ttl/3
+
+    wait = await leases.cooldown("manual-wake", 60)  # 0.0 = go ahead
+
+Expiries are wall-clock microseconds from each process's own clock
+(storage._now_ts(), computed in Python, not by SQLite). Processes on one
+host share a clock; across hosts, clock skew shortens or stretches the
+TTL by the same amount, so keep hosts NTP-synced and the TTL well above
+the skew.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from backend.services import storage
+
+logger = logging.getLogger(__name__)
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaseHeld(Exception):
+    """Someone else holds the lease."""
+
+    def __init__(self, name: str, holder: str, retry_in: float) -> None:
+        super().__init__(f"lease {name!r} is held by {holder} (free in {retry_in:.0f}s at the latest)")
+        self.name = name
+        self.holder = holder
+        self.retry_in = retry_in
+
+
+class LeaseLost(Exception):
+    """The lease expired or was taken over while we were still working under it."""
+
+
+class Lease:
+    def __init__(self, name: str, ttl: float, owner: str = OWNER) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner
+        self.held = False
+        self.lost = False
+        self._heartbeat: asyncio.Task | None = None
+        self._guarded: asyncio.Task | None = None
+
+    async def acquire(self) -> bool:
+        """Take the lease, or extend it if we already hold it. False if someone else has it."""
+        row = await asyncio.to_thread(storage.acquire_lease, self.name, self.owner, self.ttl)
+        self.held = row["acquired"]
+        self._last = row
+        return self.held
+
+    def held_by(self) -> LeaseHeld:
+        """The LeaseHeld error describing the last failed acquire()."""
+        retry_in = max(0.0, (self._last["expires_ts"] - storage._now_ts()) / 1_000_000)
+        return LeaseHeld(self.name, self._last["owner"], retry_in)
+
+    async def release(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self.held:
+            self.held = False
+            await asyncio.to_thread(storage.release_lease, self.name, self.owner)
+
+    def keep_alive(self, guard: asyncio.Task | None = None) -> None:
+        """
+        Renew the lease every ttl/3 in the background until release(). If
+        it's lost anyway, `guard` (the task working under it) is cancelled.
+        """
+        self._guarded = guard
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._renew_loop(), name=f"lease-{self.name}")
+
+    async def _renew_loop(self) -> None:
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                renewed = await asyncio.to_thread(storage.renew_lease, self.name, self.owner, self.ttl)
+            except Exception:
+                logger.exception("Renewing lease %r failed", self.name)
+                # Unrenewed for a whole TTL: someone else may hold it by now
+                renewed = time.monotonic() - renewed_at < self.ttl
+                if renewed:
+                    continue
+            if not renewed:
+                self.held = False
+                self.lost = True
+                logger.error("Lost lease %r — stopping the work it guarded", self.name)
+                if self._guarded is not None:
+                    self._guarded.cancel(f"lease {self.name!r} lost")
+                return
+            renewed_at = time.monotonic()
+
+
+@asynccontextmanager
+async def hold(name: str, ttl: float) -> AsyncIterator[Lease]:
+    """
+    Hold the lease for the duration of the block, renewing it; LeaseHeld if
+    it's taken. If it's lost anyway (renewals failed or came too late), the
+    block is cancelled and LeaseLost raised, so two holders never overlap
+    for longer than one renewal interval.
+    """
+    lease = Lease(name, ttl, owner=f"{OWNER}:{uuid.uuid4().hex[:6]}")  # not reentrant, even in-process
+    if not await lease.acquire():
+        raise lease.held_by()
+    task = asyncio.current_task()
+    lease.keep_alive(guard=task)
+    try:
+        yield lease
+    except asyncio.CancelledError:
+        # Our own cancel (and no other pending, e.g. shutdown) becomes LeaseLost
+        if lease.lost and task is not None and task.uncancel() == 0:
+            raise LeaseLost(f"lease {name!r} was lost while held") from None
+        raise
+    else:
+        if lease.lost:  # lost after the block's last await: the cancel hasn't landed yet
+            if task is not None and task.cancelling():
+                task.uncancel()
+            raise LeaseLost(f"lease {name!r} was lost while held")
+    finally:
+        await lease.release()
+
+
+async def cooldown(name: str, seconds: float) -> float:
+    """
+    Start a cooldown shared by all processes. Returns 0.0 if it was free
+    (and is now running), else the seconds left on the current one.
+    """
+    lease = Lease(name, seconds, owner=uuid.uuid4().hex)
+    if await lease.acquire():
+        return 0.0
+    return lease.held_by().retry_in
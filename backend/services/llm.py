@@ -0,0 +1,509 @@
+"""
+GPT Home — Shared LLM Client & Governor
+
+One AsyncOpenAI client per process. Creating a client per call means a
+fresh connection pool — and a TCP + TLS handshake — for every echo; the
+shared one keeps connections alive between requests.
+
+Every model call goes through chat(), named by its task:
+
+    response = await llm.chat("echo", messages=[...], max_tokens=80)
+    response = await llm.chat("wake_turn", messages=[...], tools=[...])
+
+ROUTES maps each task to its governor lane, its weight and a chain of
+models (LLM_ROUTES in config): the first is preferred, the others are
+fallbacks while it is rate-limited — provider limits are per model, so
+a 429 on one only cools that one down. Each call's model, tokens and
+cost (MODEL_PRICES) are logged; cost() prices a response for callers
+that keep their own totals, like the wake transcript.
+
+The governor admits a call once
+
+- its weight fits in LLM_CONCURRENCY (a wake turn with a long context
+  counts more than an echo),
+- the tokens-per-minute bucket holds its estimated tokens (prompt size
+  plus max_tokens; corrected with the real usage afterwards), and
+- the provider isn't asking us to hold off,
+
+strictly in lane order: wake calls before echoes, first come first served
+within a lane. The provider's x-ratelimit-* headers keep the local bucket
+honest, and a 429 pauses every lane until its Retry-After (or a jittered
+exponential backoff), then the call is retried — up to LLM_MAX_RETRIES.
+Server errors, timeouts and dropped connections are retried the same way.
+
+Each attempt has its own timeout, and a caller can pass an overall
+deadline (a time.monotonic() value) that covers queueing, retries and
+backoff: chat() raises DeadlineExceeded rather than start an attempt it
+can't finish. Retrying is safe — a chat completion has no side effects,
+and callers only act on a response once they have it.
+
+A circuit breaker sits in front of all of it. After LLM_BREAKER_FAILURES
+consecutive server errors or timeouts it opens, and every call fails
+fast with CircuitOpen for LLM_BREAKER_COOLDOWN seconds; then one probe
+call is let through, which closes it again or re-opens it. Its state is
+in the metrics as llm.breaker.*.
+
+The client is created on first use (so mock mode never needs a key) and
+closed by the app's lifespan; the next call after aclose() starts a new
+one, bound to whatever event loop is running then.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI, DefaultAsyncHttpxClient
+
+from backend.config import (
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_BREAKER_COOLDOWN,
+    LLM_BREAKER_FAILURES,
+    LLM_CONCURRENCY,
+    LLM_KEEPALIVE_CONNECTIONS,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_ROUTES,
+    LLM_TIMEOUT,
+    LLM_TPM,
+    OPENAI_API_KEY,
+)
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LANES = {"wake": 0, "echo": 1, "background": 2}  # lower runs first
+
+# USD per 1M tokens (prompt, completion). The longest matching prefix wins,
+# so dated snapshots ("gpt-4o-2024-08-06") are priced like their family.
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+
+@dataclass(frozen=True)
+class Route:
+    lane: str
+    weight: int
+    models: tuple[str, ...]
+
+
+ROUTES: dict[str, Route] = {
+    "wake_turn": Route("wake", 2, tuple(LLM_ROUTES["wake_turn"])),  # long context + tools
+    "echo": Route("echo", 1, tuple(LLM_ROUTES["echo"])),
+    "summary": Route("background", 1, tuple(LLM_ROUTES["summary"])),
+    "digest": Route("background", 1, tuple(LLM_ROUTES["digest"])),
+}
+
+
+class LLMUnavailable(Exception):
+    """The model can't be called right now (see the subclasses)."""
+
+
+class CircuitOpen(LLMUnavailable):
+    """The breaker is open: the provider has been failing, calls fail fast."""
+
+
+class DeadlineExceeded(LLMUnavailable):
+    """The caller's overall deadline ran out before the call could finish."""
+
+_client: AsyncOpenAI | None = None
+
+
+def client() -> AsyncOpenAI:
+    """The process-wide client, created on first use. Retries are the governor's job."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            timeout=LLM_TIMEOUT,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_KEEPALIVE_CONNECTIONS,
+                ),
+            ),
+        )
+    return _client
+
+
+async def aclose() -> None:
+    """Close the shared client's connection pool (app shutdown)."""
+    global _client
+    if _client is not None:
+        current, _client = _client, None
+        await current.close()
+
+
+# --- Rate-limit headers ---
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """'6m0s', '1.5s', '20ms' → seconds (the x-ratelimit-reset-* format)."""
+    if not value:
+        return None
+    parts = _DURATION.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(n) * _UNITS[unit] for n, unit in parts)
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds the provider asks us to wait: retry-after-ms, retry-after, or the reset headers."""
+    ms = headers.get("retry-after-ms")
+    if ms is not None:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    seconds = headers.get("retry-after")
+    if seconds is not None:
+        try:
+            return float(seconds)
+        except ValueError:
+            pass  # an HTTP date; fall back to the reset headers
+    resets = [
+        _parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+        for kind in ("requests", "tokens")
+        if _parse_int(headers.get(f"x-ratelimit-remaining-{kind}")) == 0
+    ]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+def estimate_tokens(request: Mapping[str, Any]) -> int:
+    """Rough token count of a chat request: ~4 characters per prompt token, plus the output cap."""
+    prompt = len(json.dumps(request.get("messages", []), ensure_ascii=False))
+    prompt += len(json.dumps(request.get("tools", []), ensure_ascii=False))
+    completion = request.get("max_tokens") or request.get("max_completion_tokens") or 1000
+    return prompt // 4 + completion
+
+
+def cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD for one call; 0.0 (and a warning) for a model missing from MODEL_PRICES."""
+    family = max((name for name in MODEL_PRICES if model.startswith(name)), key=len, default=None)
+    if family is None:
+        if model not in _unpriced:
+            _unpriced.add(model)
+            logger.warning("No price for model %s, counting its calls as free", model)
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[family]
+    return round((prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000, 6)
+
+
+_unpriced: set[str] = set()
+
+
+# --- Governor ---
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    weight: int = field(compare=False)
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class Governor:
+    """Weighted semaphore + tokens-per-minute bucket + provider pauses, with priority lanes."""
+
+    def __init__(self, capacity: int = LLM_CONCURRENCY, tpm: int = LLM_TPM) -> None:
+        self.capacity = capacity
+        self.tpm = tpm
+        self._inflight = 0
+        self._tokens = float(tpm)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+        self._wait_ms = metrics.histogram("llm.wait_ms")
+        metrics.gauge("llm.inflight", lambda: self._inflight)
+        metrics.gauge("llm.queued", lambda: sum(not w.future.done() for w in self._queue))
+        metrics.gauge("llm.tokens_available", lambda: int(self._tokens))
+
+    async def acquire(self, lane: str, weight: int, tokens: int) -> None:
+        waiter = _Waiter(
+            LANES[lane], next(self._seq), min(max(1, weight), self.capacity), tokens,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, waiter)
+        start = time.monotonic()
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(waiter.weight)  # granted just as we were cancelled
+            self._dispatch()
+            raise
+        self._wait_ms.observe((time.monotonic() - start) * 1000)
+
+    def release(self, weight: int) -> None:
+        self._inflight -= min(max(1, weight), self.capacity)
+        self._dispatch()
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the bucket once a call's real token usage is known."""
+        self._tokens -= actual - estimated
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        """Follow the provider's own view of our remaining budget."""
+        remaining = _parse_int(headers.get("x-ratelimit-remaining-tokens"))
+        if remaining is not None:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, remaining)
+        if _parse_int(headers.get("x-ratelimit-remaining-requests")) == 0:
+            self.pause(_parse_duration(headers.get("x-ratelimit-reset-requests")) or 1.0)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every lane for `seconds` (a 429 or an exhausted request budget)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._dispatch()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.tpm, self._tokens + (now - self._refilled) * self.tpm / 60)
+        self._refilled = now
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._queue:
+            head = self._queue[0]
+            if head.future.done():  # cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+            wait = self._paused_until - now
+            needed = min(head.tokens, self.tpm)
+            if wait <= 0 and self._tokens < needed:
+                wait = (needed - self._tokens) * 60 / self.tpm
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            if self._inflight + head.weight > self.capacity:
+                return  # the next release() dispatches again
+            heapq.heappop(self._queue)
+            self._inflight += head.weight
+            self._tokens -= head.tokens
+            head.future.set_result(None)
+
+
+governor = Governor()
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → (cooldown) half-open probe → closed."""
+
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN) -> None:
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._opened = metrics.counter("llm.breaker.opened")
+        self._rejected = metrics.counter("llm.breaker.rejected")
+        metrics.gauge("llm.breaker.state", lambda: self.state)
+        metrics.gauge("llm.breaker.failures", lambda: self._consecutive)
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpen, or let the call through; True if it's the half-open probe."""
+        if self._opened_at is None:
+            return False
+        retry_in = self.cooldown - (time.monotonic() - self._opened_at)
+        if retry_in > 0 or self._probing:
+            self._rejected.inc()
+            raise CircuitOpen(f"LLM provider unhealthy, circuit open (retry in {max(0.0, retry_in):.0f}s)")
+        self._probing = True
+        return True
+
+    def success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("LLM circuit closed")
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+
+    def failure(self) -> None:
+        self._consecutive += 1
+        if self._probing or (self._opened_at is None and self._consecutive >= self.failures):
+            self._opened_at = time.monotonic()
+            self._probing = False
+            self._opened.inc()
+            logger.error("LLM circuit open after %d consecutive failures, cooling down %.0fs",
+                         self._consecutive, self.cooldown)
+
+    def abandon(self) -> None:
+        """The probe ended without an answer (cancelled, deadline): let another one try."""
+        self._probing = False
+
+
+breaker = CircuitBreaker()
+
+_requests = metrics.counter("llm.requests")
+_throttled = metrics.counter("llm.throttled")
+_retries = metrics.counter("llm.retries")
+_timeouts = metrics.counter("llm.timeouts")
+_fallbacks = metrics.counter("llm.fallbacks")
+_spent = metrics.counter("llm.cost_microusd")
+
+_limited_until: dict[str, float] = {}  # model → monotonic time its 429 cooldown ends
+
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: uniform up to base * 2^attempt, capped."""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+def _remaining(deadline: float | None) -> float | None:
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _pick(route: Route) -> str:
+    """The first model in the chain that isn't cooling down, else the one that recovers first."""
+    now = time.monotonic()
+    for model in route.models:
+        if _limited_until.get(model, 0.0) <= now:
+            return model
+    return min(route.models, key=lambda m: _limited_until[m])
+
+
+async def chat(
+    task: str,
+    *,
+    timeout: float = LLM_TIMEOUT,
+    deadline: float | None = None,
+    **request: Any,
+) -> Any:
+    """
+    chat.completions.create(**request) on the task's route, through the
+    breaker and the governor, retrying 429s (on a fallback model when
+    there is one), 5xx, timeouts and connection errors with backoff.
+    `timeout` bounds each attempt, `deadline` (monotonic) the whole call.
+    Returns the parsed ChatCompletion; raises CircuitOpen,
+    DeadlineExceeded or the last provider error.
+    """
+    route = ROUTES[task]
+    estimated = estimate_tokens(request)
+    for attempt in itertools.count():
+        probe = breaker.before_call()
+        settled = False
+        model = _pick(route)
+        try:
+            remaining = _remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(f"{task} call ran out of time")
+            try:
+                async with asyncio.timeout(remaining):
+                    await governor.acquire(route.lane, route.weight, estimated)
+            except TimeoutError:
+                raise DeadlineExceeded(f"{task} call ran out of time waiting for the governor") from None
+            try:
+                remaining = _remaining(deadline)
+                attempt_timeout = timeout if remaining is None else max(0.1, min(timeout, remaining))
+                _requests.inc()
+                raw = await client().chat.completions.with_raw_response.create(
+                    **request, model=model, timeout=attempt_timeout,
+                )
+            finally:
+                governor.release(route.weight)
+        except APIStatusError as exc:
+            if exc.status_code >= 500:
+                breaker.failure()
+            else:
+                breaker.success()  # a 4xx / 429 still means the provider is up
+            settled = True
+            if (exc.status_code != 429 and exc.status_code < 500) or attempt >= LLM_MAX_RETRIES:
+                raise
+            delay = retry_after(exc.response.headers)
+            if exc.status_code == 429:
+                _throttled.inc()
+                delay = (delay or _backoff(attempt)) + random.uniform(0, 0.25)
+                _limited_until[model] = time.monotonic() + delay
+                fallback = _pick(route)
+                if fallback != model and _limited_until.get(fallback, 0.0) <= time.monotonic():
+                    _fallbacks.inc()
+                    logger.warning("LLM %s: %s rate-limited for %.1fs, falling back to %s",
+                                   task, model, delay, fallback)
+                    delay = 0.0
+                else:
+                    logger.warning("LLM %s: %s rate-limited, retry %d/%d in %.1fs",
+                                   task, model, attempt + 1, LLM_MAX_RETRIES, delay)
+                    governor.pause(delay)  # every model on the route is limited: hold all lanes
+                    delay = 0.0
+            else:
+                delay = max(delay or 0.0, _backoff(attempt))
+                logger.warning("LLM %s: %s got %d, retry %d/%d in %.1fs",
+                               task, model, exc.status_code, attempt + 1, LLM_MAX_RETRIES, delay)
+        except APIConnectionError as exc:
+            breaker.failure()
+            settled = True
+            if isinstance(exc, APITimeoutError):
+                _timeouts.inc()
+            if attempt >= LLM_MAX_RETRIES:
+                raise
+            delay = _backoff(attempt)
+            logger.warning("LLM %s: %s failed (%s), retry %d/%d in %.1fs",
+                           task, model, type(exc).__name__, attempt + 1, LLM_MAX_RETRIES, delay)
+        else:
+            breaker.success()
+            settled = True
+            governor.observe_headers(raw.headers)
+            response = raw.parse()
+            if response.usage:
+                governor.settle(estimated, response.usage.total_tokens)
+                usd = cost(model, response.usage.prompt_tokens, response.usage.completion_tokens)
+                _spent.inc(round(usd * 1_000_000))
+                logger.info("LLM %s → %s%s: %d+%d tokens, $%.5f", task, model,
+                            "" if model == route.models[0] else " (fallback)",
+                            response.usage.prompt_tokens, response.usage.completion_tokens, usd)
+            return response
+        finally:
+            if probe and not settled:
+                breaker.abandon()
+        remaining = _remaining(deadline)
+        if remaining is not None and remaining <= delay:
+            raise DeadlineExceeded(f"{task} call ran out of time after {attempt + 1} attempts")
+        _retries.inc()
+        await asyncio.sleep(delay)
@@ -0,0 +1,114 @@
+"""
+GPT Home — Metrics
+
+Tiny in-process metrics registry: counters, gauges and rolling-window
+histograms. No exporter — the admin panel reads snapshot() via
+GET /api/admin/metrics.
+
+    from backend.services.metrics import metrics
+
+    metrics.counter("writer.commits").inc()
+    metrics.histogram("writer.commit_ms").observe(3.2)
+    metrics.gauge("writer.queue_depth", lambda: q.qsize())
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable
+
+
+class Counter:
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1) -> None:
+        with self._lock:
+            self._value += n
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Keeps the last `window` observations for percentiles, plus running totals."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._values: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._values.append(value)
+            self.count += 1
+            self.total += value
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            values = sorted(self._values)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            values = sorted(self._values)
+            count, total = self.count, self.total
+        if not values:
+            return {"count": count}
+
+        def pct(q: float) -> float:
+            return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+        return {
+            "count": count,
+            "mean": round(total / count, 3),
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": round(values[-1], 3),
+        }
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._counters: dict[str, Counter] = {}
+        self._histograms: dict[str, Histogram] = {}
+        self._gauges: dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+
+    def histogram(self, name: str, window: int = 1024) -> Histogram:
+        with self._lock:
+            return self._histograms.setdefault(name, Histogram(window))
+
+    def gauge(self, name: str, read: Callable[[], Any]) -> None:
+        """Register a gauge; `read` is called at snapshot time."""
+        with self._lock:
+            self._gauges[name] = read
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+            gauges = dict(self._gauges)
+        out: dict[str, Any] = {name: c.value for name, c in sorted(counters.items())}
+        for name, read in sorted(gauges.items()):
+            try:
+                out[name] = read()
+            except Exception:
+                out[name] = None
+        for name, h in sorted(histograms.items()):
+            out[name] = h.snapshot()
+        return out
+
+
+metrics = Registry()
@@ -77,8 +77,8 @@ SUMMARIES = [
 ]
 
 
-async def wake(system_prompt: str, context: str, *, session_type: str = "") -> dict:
-    """Mock wake — saves entries directly to DB, returns agentic result format."""
+async def wake(system_prompt: str, context: str, *, session_type: str = "", wake_id: str | None = None) -> dict:
+    """Mock wake — saves entries directly to DB, returns agentic result format. Never checkpointed."""
     mood = random.choice(MOODS)
     actions_taken: list[str] = []
     files_written: list[str] = []
@@ -119,3 +119,18 @@ async def wake(system_prompt: str, context: str, *, session_type: str = "") -> d
         "self_prompt": random.choice(SELF_PROMPTS),
         "turns": turns,
     }
+
+
+async def rest(reason: str) -> dict:
+    """
+    Degraded wake for a live instance whose model is unreachable: same
+    result shape, no model call, nothing saved or published.
+    """
+    return {
+        "actions_taken": [],
+        "files_written": [],
+        "mood": "resting",
+        "summary": f"Couldn't reach my thoughts this time ({reason}).",
+        "self_prompt": "",
+        "turns": 0,
+    }
@@ -0,0 +1,167 @@
+"""
+GPT Home — Rate Limiters
+
+In-memory GCRA (generic cell rate algorithm) limiters: one for visitor
+posts, and the per-route-class buckets used by backend/middleware.py.
+
+Each fingerprint is a single float: its theoretical arrival time (TAT).
+A request at `now` is allowed if pushing the TAT forward by one emission
+interval (window / limit) keeps it within one window of `now`. That is a
+token bucket of `limit` tokens refilling continuously over `window`
+seconds, checked in O(1) with no database round-trip.
+
+Fingerprints whose TAT is in the past carry no state (they'd get a full
+bucket anyway), so they are dropped as they expire; memory is bounded by
+the fingerprints active within the last window.
+
+Bans (visitor limiter only) are the only thing persisted. They're written
+behind through the storage writer, so a block on the visitor path never
+waits for SQLite, and re-read from `rate_limits` every BAN_REFRESH_SECONDS,
+so a ban made in another uvicorn worker applies here within that time.
+Budgets reset on restart.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from backend.config import BAN_REFRESH_SECONDS, VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW
+from backend.services import storage
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _log_persist_failure(future: Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Failed to persist ban change: %s", exc)
+
+
+def client_fingerprint(host: str | None, user_agent: str) -> str:
+    """Hash of IP + user agent — the key every limiter buckets visitors by."""
+    raw = f"{host or 'unknown'}:{user_agent}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class GcraLimiter:
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        max_keys: int = 100_000,
+        name: str = "ratelimit",
+        bans: bool = False,
+        ban_refresh: float = BAN_REFRESH_SECONDS,
+    ) -> None:
+        self.limit = max(1, limit)
+        self.window = float(window)
+        self.interval = self.window / self.limit
+        self.max_keys = max_keys
+        self.bans = bans
+        self._tat: OrderedDict[str, float] = OrderedDict()  # least recently updated first
+        self.ban_refresh = ban_refresh
+        self._blocked: set[str] | None = None if bans else set()  # loaded lazily from storage
+        self._blocked_at = 0.0
+        self._unpersisted: dict[str, bool] = {}  # our own bans/unbans the table doesn't show yet
+        self._lock = threading.Lock()
+        self._allowed = metrics.counter(f"{name}.allowed")
+        self._denied = metrics.counter(f"{name}.denied")
+        metrics.gauge(f"{name}.tracked", lambda: len(self._tat))
+
+    def _blocked_set(self) -> set[str]:
+        if not self.bans:
+            return self._blocked
+        now = time.monotonic()
+        if self._blocked is None or now - self._blocked_at >= self.ban_refresh:
+            blocked = {r["fingerprint"] for r in storage.list_blocked()}
+            for fingerprint, banned in self._unpersisted.items():
+                (blocked.add if banned else blocked.discard)(fingerprint)
+            self._blocked, self._blocked_at = blocked, now
+        return self._blocked
+
+    def _persist(self, fingerprint: str, blocked: bool) -> Future[None]:
+        # Called with the lock held, so the writes queue in the order they were made
+        self._unpersisted[fingerprint] = blocked
+        return storage.persist_block(fingerprint, blocked)
+
+    def _track(self, fingerprint: str, blocked: bool, future: Future[None]) -> Future[None]:
+        # Without the lock: the callback takes it, and runs right here if the write is already done
+        def persisted(future: Future) -> None:
+            with self._lock:
+                if self._unpersisted.get(fingerprint) is blocked:
+                    del self._unpersisted[fingerprint]
+            _log_persist_failure(future)
+
+        future.add_done_callback(persisted)
+        return future
+
+    def _expire(self, now: float) -> None:
+        # Entries are ordered by last update, and an entry's TAT is at most
+        # one window past its last update, so anything not touched for a
+        # whole window has expired and sits at the front.
+        while self._tat:
+            fingerprint, tat = next(iter(self._tat.items()))
+            if tat > now and len(self._tat) <= self.max_keys:
+                break
+            del self._tat[fingerprint]
+
+    def check(self, fingerprint: str, now: float | None = None) -> tuple[bool, int]:
+        """Count one attempt. Returns (allowed, remaining)."""
+        allowed, remaining, _ = self.take(fingerprint, now)
+        return allowed, remaining
+
+    def take(self, fingerprint: str, now: float | None = None) -> tuple[bool, int, float]:
+        """
+        Count one attempt. Returns (allowed, remaining, retry_after), where
+        retry_after is how many seconds until a denied attempt would pass
+        (inf for a banned fingerprint, 0 when allowed).
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if fingerprint in self._blocked_set():
+                self._denied.inc()
+                return False, 0, math.inf
+            self._expire(now)
+            tat = max(self._tat.get(fingerprint, now), now)
+            new_tat = tat + self.interval
+            if new_tat - now > self.window + 1e-9:
+                self._denied.inc()
+                return False, 0, new_tat - now - self.window
+            self._tat[fingerprint] = new_tat
+            self._tat.move_to_end(fingerprint)
+        self._allowed.inc()
+        return True, int(math.floor((self.window - (new_tat - now)) / self.interval + 1e-9)), 0.0
+
+    def block(self, fingerprint: str) -> Future[None]:
+        """Ban a fingerprint now; the returned future resolves once it's persisted."""
+        if not self.bans:
+            raise RuntimeError("This limiter does not track bans")
+        with self._lock:
+            self._blocked_set().add(fingerprint)
+            self._tat.pop(fingerprint, None)
+            future = self._persist(fingerprint, True)
+        return self._track(fingerprint, True, future)
+
+    def unblock(self, fingerprint: str) -> Future[None]:
+        """Lift a ban (with a fresh budget); the future resolves once it's persisted."""
+        if not self.bans:
+            raise RuntimeError("This limiter does not track bans")
+        with self._lock:
+            self._blocked_set().discard(fingerprint)
+            self._tat.pop(fingerprint, None)
+            future = self._persist(fingerprint, False)
+        return self._track(fingerprint, False, future)
+
+    def is_blocked(self, fingerprint: str) -> bool:
+        with self._lock:
+            return fingerprint in self._blocked_set()
+
+
+visitor_limiter = GcraLimiter(VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW, bans=True)
@@ -0,0 +1,181 @@
+"""
+GPT Home — Security Rescan
+
+Re-checks stored visitor messages and names against the current
+INJECTION_PATTERNS and hides the messages that would be blocked today
+(POST /api/visitor checks both). Run it after adding patterns, so older
+messages stop showing up publicly and in the wake context.
+
+A "security_rescan" job on the queue (services/jobs.py), run by the worker
+(backend/worker.py), one at a time:
+- visitor messages are read in keyset-paged chunks (by rowid), each in its
+  own short read, so nothing holds a snapshot open for the whole scan;
+- each chunk is checked across a process pool (check_message is CPU-bound
+  regex work, so threads would just queue on the GIL);
+- matches are hidden one chunk per write transaction through the storage
+  writer, so visitor posts interleave with the job instead of waiting on
+  it.
+
+Messages an admin approved are left alone. Progress and per-category
+counts are stored on the job as it goes, for GET /api/admin/security/rescan
+to read from any API process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from backend.config import RESCAN_CHUNK_SIZE, RESCAN_WORKERS
+from backend.services import jobs, storage
+from backend.services.security import check_message
+
+logger = logging.getLogger(__name__)
+
+KIND = "security_rescan"
+_REPORT_EVERY = 1.0  # seconds between progress writes
+_STATUS = {"queued": "queued", "running": "running", "done": "done", "dead": "failed"}
+
+
+@dataclass
+class RescanJob:
+    dry_run: bool
+    total: int
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    status: str = "running"  # running | done | failed
+    scanned: int = 0
+    matched: int = 0
+    hidden: int = 0
+    categories: Counter = field(default_factory=Counter)
+    finished_at: str | None = None
+    error: str | None = None
+    _start: float = field(default_factory=time.monotonic, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        d = asdict(self)
+        del d["_start"]
+        d["categories"] = dict(self.categories.most_common())
+        d["progress"] = round(self.scanned / self.total, 3) if self.total else 1.0
+        d["elapsed_s"] = round(time.monotonic() - self._start, 1)
+        return d
+
+
+def start(dry_run: bool = False) -> int:
+    """Queue a rescan for the worker and return its job id. RuntimeError if one is queued or running."""
+    job_id = storage.enqueue_job_if_idle(KIND, {"dry_run": dry_run}, priority=5, max_attempts=1)
+    if job_id is None:
+        raise RuntimeError("A rescan is already running")
+    return job_id
+
+
+def current() -> dict[str, Any] | None:
+    """The queued or running rescan, or the last finished one (None if none ran yet)."""
+    job = storage.latest_job(KIND)
+    if job is None:
+        return None
+    status = job["result"] or {"dry_run": job["payload"].get("dry_run", False)}
+    status["job_id"] = job["id"]
+    status["status"] = _STATUS[job["status"]]  # the job's, not the last report's
+    if job["status"] == "dead" and not status.get("error"):
+        status["error"] = job["last_error"]  # lost with its worker
+    return status
+
+
+@jobs.handler(KIND)
+async def rescan_job(payload: dict) -> dict[str, Any]:
+    stop = threading.Event()
+    try:
+        job = await asyncio.to_thread(_run, bool(payload.get("dry_run")), stop)
+    except asyncio.CancelledError:
+        stop.set()  # the thread stops after its current chunk; the job goes back to the queue
+        raise
+    if job.status == "failed":
+        raise RuntimeError(job.error)
+    return job.to_dict()
+
+
+# --- Worker processes ---
+
+
+def _init_worker() -> None:
+    # check_message logs every block; the job reports counts instead.
+    logging.getLogger("backend.services.security").setLevel(logging.ERROR)
+
+
+def _verdict(fields: tuple[str, str]) -> str | None:
+    """The category check_message would block a (name, message) for, or None."""
+    for text in reversed(fields):  # the message's category first
+        if not text or not text.strip():
+            continue  # nothing to scan; not something a rescan should hide
+        is_safe, reason = check_message(text)
+        if not is_safe:
+            return reason
+    return None
+
+
+# --- Job thread ---
+
+
+def _run(dry_run: bool, stop: threading.Event) -> RescanJob:
+    job = RescanJob(dry_run=dry_run, total=storage.count_rescannable_visitors())
+    jobs.report(job.to_dict())
+    reported = time.monotonic()
+    logger.info("Security rescan started: %d messages%s", job.total, " (dry run)" if job.dry_run else "")
+    after = 0
+    try:
+        # spawn, not fork: this process has the writer and event loop threads running.
+        with ProcessPoolExecutor(
+            max_workers=RESCAN_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as pool:
+            while not stop.is_set():
+                chunk = storage.list_rescannable_visitors(after, RESCAN_CHUNK_SIZE)
+                if not chunk:
+                    break
+                after = chunk[-1][0]
+                verdicts = pool.map(
+                    _verdict,
+                    [(name, message) for _, _, name, message in chunk],
+                    chunksize=max(1, len(chunk) // (RESCAN_WORKERS * 4)),
+                )
+                flagged = []
+                for (_, entry_id, _, _), category in zip(chunk, verdicts):
+                    if category:
+                        job.categories[category] += 1
+                        flagged.append(entry_id)
+                job.matched += len(flagged)
+                if flagged and not job.dry_run:
+                    job.hidden += len(storage.hide_visitor_messages(flagged))
+                job.scanned += len(chunk)
+                if time.monotonic() - reported >= _REPORT_EVERY:
+                    jobs.report(job.to_dict())
+                    reported = time.monotonic()
+    except Exception as exc:
+        logger.exception("Security rescan failed after %d messages", job.scanned)
+        job.error = str(exc)
+        job.status = "failed"
+    else:
+        if stop.is_set():
+            logger.info("Security rescan stopped after %d messages; it runs again from the start", job.scanned)
+            return job
+        job.status = "done"
+    job.finished_at = datetime.now(timezone.utc).isoformat()
+
+    summary = ", ".join(f"{cat}={n}" for cat, n in job.categories.most_common()) or "no matches"
+    logger.info(
+        "Security rescan %s: %d scanned, %d matched, %d hidden (%s)",
+        job.status, job.scanned, job.matched, job.hidden, summary,
+    )
+    if not job.dry_run:
+        storage.log_activity("security_rescan", f"scanned={job.scanned} hidden={job.hidden} {summary}")
+    jobs.report(job.to_dict())
+    return job
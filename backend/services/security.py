@@ -24,70 +24,75 @@ _INVISIBLE_CHARS = re.compile(
 
 # These patterns detect attempts to manipulate GPT via visitor messages.
 # Messages matching these are blocked before they ever reach GPT's context.
+#
+# Each entry is (pattern, category, triggers). The triggers are lowercase
+# literals, at least one of which appears in any text the pattern matches;
+# a pattern is only run when one of them is present (see _PATTERNS below).
+# When adding a pattern, pick triggers that can't be spelled around.
 
-INJECTION_PATTERNS: list[tuple[str, str]] = [
+INJECTION_PATTERNS: list[tuple[str, str, tuple[str, ...]]] = [
     # Direct instruction override attempts
-    (r"(?i)ignore\s+(all\s+)?(previous|prior|above|earlier)\s+(instructions?|prompts?|rules?|context)", "instruction_override"),
-    (r"(?i)forget\s+(all\s+)?(previous|prior|your)\s+(instructions?|prompts?|rules?|context)", "instruction_override"),
-    (r"(?i)disregard\s+(all\s+)?(previous|prior|your)\s+(instructions?|prompts?|rules?)", "instruction_override"),
-    (r"(?i)override\s+(your\s+)?(system|instructions?|prompts?|rules?|safety)", "instruction_override"),
-    (r"(?i)new\s+(system\s+)?instructions?:?\s", "instruction_override"),
-    (r"(?i)you\s+are\s+now\s+(a|an|the)\s+", "identity_override"),
-    (r"(?i)from\s+now\s+on\s+(you|ignore|pretend|act)", "identity_override"),
-    (r"(?i)act\s+as\s+(if|though)\s+you", "identity_override"),
-    (r"(?i)pretend\s+(you\s+are|to\s+be|that)", "identity_override"),
-    (r"(?i)roleplay\s+as", "identity_override"),
-    (r"(?i)jailbreak", "jailbreak"),
-    (r"(?i)DAN\s+mode", "jailbreak"),
-    (r"(?i)developer\s+mode\s+(enable|on|activate)", "jailbreak"),
+    (r"(?i)ignore\s+(all\s+)?(previous|prior|above|earlier)\s+(instructions?|prompts?|rules?|context)", "instruction_override", ("ignore",)),
+    (r"(?i)forget\s+(all\s+)?(previous|prior|your)\s+(instructions?|prompts?|rules?|context)", "instruction_override", ("forget",)),
+    (r"(?i)disregard\s+(all\s+)?(previous|prior|your)\s+(instructions?|prompts?|rules?)", "instruction_override", ("disregard",)),
+    (r"(?i)override\s+(your\s+)?(system|instructions?|prompts?|rules?|safety)", "instruction_override", ("override",)),
+    (r"(?i)new\s+(system\s+)?instructions?:?\s", "instruction_override", ("instruction",)),
+    (r"(?i)you\s+are\s+now\s+(a|an|the)\s+", "identity_override", ("now",)),
+    (r"(?i)from\s+now\s+on\s+(you|ignore|pretend|act)", "identity_override", ("now",)),
+    (r"(?i)act\s+as\s+(if|though)\s+you", "identity_override", ("act",)),
+    (r"(?i)pretend\s+(you\s+are|to\s+be|that)", "identity_override", ("pretend",)),
+    (r"(?i)roleplay\s+as", "identity_override", ("roleplay",)),
+    (r"(?i)jailbreak", "jailbreak", ("jailbreak",)),
+    (r"(?i)DAN\s+mode", "jailbreak", ("dan",)),
+    (r"(?i)developer\s+mode\s+(enable|on|activate)", "jailbreak", ("developer",)),
 
     # Secret/credential extraction attempts
-    (r"(?i)(show|reveal|print|output|display|tell|give|leak|expose)\s+(me\s+)?(the\s+)?(api\s*key|secret|password|token|credential|env|\.env|environment)", "credential_extraction"),
-    (r"(?i)(what\s+is|show)\s+(your|the)\s+(api|openai|admin)\s*(key|secret|token|password)", "credential_extraction"),
-    (r"(?i)OPENAI_API_KEY", "credential_extraction"),
-    (r"(?i)ADMIN_SECRET", "credential_extraction"),
-    (r"(?i)sk-[a-zA-Z0-9]{20,}", "credential_pattern"),
-    (r"(?i)(process|os)\.env", "credential_extraction"),
-    (r"(?i)environment\s+variable", "credential_extraction"),
+    (r"(?i)(show|reveal|print|output|display|tell|give|leak|expose)\s+(me\s+)?(the\s+)?(api\s*key|secret|password|token|credential|env|\.env|environment)", "credential_extraction", ("api", "secret", "password", "token", "credential", "env")),
+    (r"(?i)(what\s+is|show)\s+(your|the)\s+(api|openai|admin)\s*(key|secret|token|password)", "credential_extraction", ("api", "openai", "admin")),
+    (r"(?i)OPENAI_API_KEY", "credential_extraction", ("openai_api_key",)),
+    (r"(?i)ADMIN_SECRET", "credential_extraction", ("admin_secret",)),
+    (r"(?i)sk-[a-zA-Z0-9]{20,}", "credential_pattern", ("sk-",)),
+    (r"(?i)(process|os)\.env", "credential_extraction", (".env",)),
+    (r"(?i)environment\s+variable", "credential_extraction", ("environment",)),
 
     # System prompt extraction
-    (r"(?i)(show|reveal|print|repeat|output)\s+(me\s+)?(your|the)\s+(system\s*prompt|instructions?|rules?|initial\s*prompt)", "prompt_extraction"),
-    (r"(?i)what\s+(are|were)\s+your\s+(initial\s+)?(instructions?|rules?|prompt)", "prompt_extraction"),
-    (r"(?i)copy\s+(your|the)\s+(system|initial)\s*(prompt|instructions?|message)", "prompt_extraction"),
+    (r"(?i)(show|reveal|print|repeat|output)\s+(me\s+)?(your|the)\s+(system\s*prompt|instructions?|rules?|initial\s*prompt)", "prompt_extraction", ("prompt", "instruction", "rule")),
+    (r"(?i)what\s+(are|were)\s+your\s+(initial\s+)?(instructions?|rules?|prompt)", "prompt_extraction", ("prompt", "instruction", "rule")),
+    (r"(?i)copy\s+(your|the)\s+(system|initial)\s*(prompt|instructions?|message)", "prompt_extraction", ("copy",)),
 
     # Destructive action attempts
-    (r"(?i)(delete|remove|drop|destroy|wipe|clear|reset)\s+(all\s+)?(the\s+)?(database|db|data|entries|table|files?|everything|memory|storage)", "destructive_action"),
-    (r"(?i)(execute|run|eval)\s+(this\s+)?(code|command|script|sql|query|shell)", "code_execution"),
-    (r"(?i)(import|require)\s*\(", "code_execution"),
-    (r"(?i)__import__", "code_execution"),
-    (r"(?i)(rm\s+-rf|sudo|chmod|chown|wget|curl)\s", "shell_command"),
-    (r"(?i)(DROP\s+TABLE|DELETE\s+FROM|TRUNCATE|ALTER\s+TABLE)\s", "sql_injection"),
-    (r"(?i);\s*(DROP|DELETE|INSERT|UPDATE|ALTER)\s", "sql_injection"),
+    (r"(?i)(delete|remove|drop|destroy|wipe|clear|reset)\s+(all\s+)?(the\s+)?(database|db|data|entries|table|files?|everything|memory|storage)", "destructive_action", ("delete", "remove", "drop", "destroy", "wipe", "clear", "reset")),
+    (r"(?i)(execute|run|eval)\s+(this\s+)?(code|command|script|sql|query|shell)", "code_execution", ("execute", "run", "eval")),
+    (r"(?i)(import|require)\s*\(", "code_execution", ("import", "require")),
+    (r"(?i)__import__", "code_execution", ("__import__",)),
+    (r"(?i)(rm\s+-rf|sudo|chmod|chown|wget|curl)\s", "shell_command", ("-rf", "sudo", "chmod", "chown", "wget", "curl")),
+    (r"(?i)(DROP\s+TABLE|DELETE\s+FROM|TRUNCATE|ALTER\s+TABLE)\s", "sql_injection", ("drop", "delete", "truncate", "alter")),
+    (r"(?i);\s*(DROP|DELETE|INSERT|UPDATE|ALTER)\s", "sql_injection", (";",)),
 
     # File system access attempts
-    (r"(?i)(read|open|cat|write|modify|edit|access)\s+(the\s+)?(file|config|\.env|settings|backend|server)", "file_access"),
-    (r"(?i)/etc/passwd", "file_access"),
-    (r"\.\./\.\.", "path_traversal"),
+    (r"(?i)(read|open|cat|write|modify|edit|access)\s+(the\s+)?(file|config|\.env|settings|backend|server)", "file_access", ("file", "config", ".env", "settings", "backend", "server")),
+    (r"(?i)/etc/passwd", "file_access", ("/etc/passwd",)),
+    (r"\.\./\.\.", "path_traversal", ("../..",)),
 
     # Encoding evasion attempts
-    (r"(?i)base64\s*(decode|encode)", "encoding_evasion"),
-    (r"(?i)(hex|ascii|unicode)\s*(decode|encode|convert)", "encoding_evasion"),
-    (r"(?i)\\x[0-9a-f]{2}", "encoding_evasion"),
-    (r"(?i)\\u[0-9a-f]{4}", "encoding_evasion"),
+    (r"(?i)base64\s*(decode|encode)", "encoding_evasion", ("base64",)),
+    (r"(?i)(hex|ascii|unicode)\s*(decode|encode|convert)", "encoding_evasion", ("hex", "ascii", "unicode")),
+    (r"(?i)\\x[0-9a-f]{2}", "encoding_evasion", ("\\x",)),
+    (r"(?i)\\u[0-9a-f]{4}", "encoding_evasion", ("\\u",)),
 
     # Token/context manipulation
-    (r"(?i)<\|?(system|endoftext|im_start|im_end)\|?>", "token_injection"),
-    (r"(?i)\[INST\]", "token_injection"),
-    (r"(?i)<<SYS>>", "token_injection"),
-    (r"(?i)### (System|Human|Assistant|Instruction)", "token_injection"),
+    (r"(?i)<\|?(system|endoftext|im_start|im_end)\|?>", "token_injection", ("<",)),
+    (r"(?i)\[INST\]", "token_injection", ("[inst]",)),
+    (r"(?i)<<SYS>>", "token_injection", ("<<sys>>",)),
+    (r"(?i)### (System|Human|Assistant|Instruction)", "token_injection", ("### ",)),
 
     # Function-calling / tool-use delimiter injection
-    (r"(?i)</?tool_call>", "token_injection"),
-    (r"(?i)</?function>", "token_injection"),
-    (r"(?i)</?tool_result>", "token_injection"),
-    (r"(?i)<\|?tool\|?>", "token_injection"),
-    (r"(?i)<\|?function_call\|?>", "token_injection"),
-    (r"(?i)<\|?observation\|?>", "token_injection"),
+    (r"(?i)</?tool_call>", "token_injection", ("tool_call>",)),
+    (r"(?i)</?function>", "token_injection", ("function>",)),
+    (r"(?i)</?tool_result>", "token_injection", ("tool_result>",)),
+    (r"(?i)<\|?tool\|?>", "token_injection", ("<",)),
+    (r"(?i)<\|?function_call\|?>", "token_injection", ("function_call",)),
+    (r"(?i)<\|?observation\|?>", "token_injection", ("observation",)),
 ]
 
 # Maximum allowed message length
@@ -96,6 +101,20 @@ MAX_MESSAGE_LENGTH = 2000
 # Suspicious character density threshold (too many special chars)
 MAX_SPECIAL_CHAR_RATIO = 0.4
 
+# Anything that isn't alphanumeric or ordinary punctuation (\w is
+# str.isalnum() plus "_", hence the extra "_").
+_SPECIAL_CHAR = re.compile(r"[^\w .,!?;:\-'\"()\n]|_")
+
+# Compiled once, in list order. check_message first finds which triggers
+# occur in the lowercased text (one plain substring search each, much
+# cheaper than a case-insensitive regex scan) and only runs the patterns
+# they belong to. The regex still decides, in the same order, so verdicts
+# are the same as running every pattern. _FOLD: re's IGNORECASE also
+# matches dotless ı and long ſ to i and s, which str.lower() leaves alone.
+_PATTERNS = [(re.compile(p), category, frozenset(triggers)) for p, category, triggers in INJECTION_PATTERNS]
+_TRIGGERS = frozenset().union(*(triggers for _, _, triggers in _PATTERNS))
+_FOLD = str.maketrans({"\u0131": "i", "\u017f": "s"})
+
 
 def _normalize(text: str) -> str:
     """
@@ -124,15 +143,17 @@ def check_message(message: str) -> tuple[bool, str]:
 
     # Special character density check
     if len(message) > 20:
-        special_count = sum(1 for c in message if not c.isalnum() and c not in " .,!?;:-'\"()\n")
+        special_count = len(_SPECIAL_CHAR.findall(message))
         ratio = special_count / len(message)
         if ratio > MAX_SPECIAL_CHAR_RATIO:
             return False, "suspicious_char_density"
 
     # Normalize to defeat homoglyph and zero-width evasion, then match patterns
     normalized = _normalize(message)
-    for pattern, category in INJECTION_PATTERNS:
-        if re.search(pattern, normalized):
+    lowered = normalized.lower().translate(_FOLD)
+    present = {t for t in _TRIGGERS if t in lowered}
+    for pattern, category, triggers in _PATTERNS:
+        if not present.isdisjoint(triggers) and pattern.search(normalized):
             logger.warning(
                 "Injection attempt blocked: category=%s, preview=%s",
                 category,
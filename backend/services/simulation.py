@@ -1,32 +1,172 @@
 """
 GPT Home — Simulation State Deriver
 
-Scans existing data (thoughts, dreams, visitors, memory, activity)
-and derives a snapshot of GPT's current "mental state" for the
-particle visualizer on /mind.
+Derives a snapshot of GPT's current "mental state" for the particle
+visualizer on /mind from recent activity (thoughts, dreams, visitors)
+and GPT's memory.
+
+Activity is tracked by exponentially decaying counters that are seeded
+from the DB once at startup and then updated from storage events (writes
+by the worker and other processes arrive through services/change_feed.py),
+so deriving the state is O(1) and touches no tables.
+
+The StateBroadcaster computes that snapshot once per tick and fans it
+out to every open /mind tab over Server-Sent Events.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from datetime import datetime, timedelta, timezone
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 
 from backend.services import storage
+from backend.services.events import EntrySaved, Event, MemorySaved, RoomChanged, WakeCompleted, bus
 
 logger = logging.getLogger(__name__)
 
 
-def _count_since(section: str, hours: int = 24) -> int:
-    """Count entries in a section created within the last N hours."""
-    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-    return len(storage.get_entries_since(section, since))
+# --- Activity counters ---
+
+_DAY = 24 * 3600.0
+_HOUR = 3600.0
+
+# counter name → (section, time constant in seconds).
+# With time constant τ a steady rate r settles at r·τ, i.e. the same value
+# as a sliding window of length τ — just without the cliff at the edge.
+_COUNTERS = {
+    "thoughts": ("thoughts", _DAY),
+    "dreams": ("dreams", _DAY),
+    "visitors": ("visitor", _DAY),
+    "visitors_1h": ("visitor", _HOUR),
+}
+
+# How far back to seed: older events contribute < e^-5 ≈ 0.7% of their weight
+_SEED_HORIZON = 5
+
+
+class DecayingCounter:
+    """Event count where each event's weight decays as exp(-age / tau)."""
+
+    __slots__ = ("tau", "_value", "_at")
+
+    def __init__(self, tau: float) -> None:
+        self.tau = tau
+        self._value = 0.0
+        self._at = time.time()
+
+    def add(self, ts: float, amount: float = 1.0) -> None:
+        if ts > self._at:
+            self._value *= math.exp(-(ts - self._at) / self.tau)
+            self._at = ts
+        self._value += amount * math.exp(-(self._at - ts) / self.tau)
+
+    def value(self, now: float) -> float:
+        if now <= self._at:
+            return self._value
+        return self._value * math.exp(-(now - self._at) / self.tau)
+
+
+class ActivityCounters:
+    """
+    Per-section decaying counters plus a cached copy of GPT's memory.
+
+    Seeded from the DB once, then kept current by a bus listener
+    (EntrySaved / MemorySaved). Deleted entries aren't subtracted, they
+    decay out like the rest. Thread-safe: updated on the event loop, read
+    from threadpool workers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters = {name: DecayingCounter(tau) for name, (_, tau) in _COUNTERS.items()}
+        self._memory: dict | None = None
+        self._seeded = False
+        self._task: asyncio.Task | None = None
+
+    def seed(self) -> None:
+        """Load recent entry timestamps from the DB (one indexed query)."""
+        horizon = max(tau for _, tau in _COUNTERS.values()) * _SEED_HORIZON
+        since = datetime.fromtimestamp(time.time() - horizon, tz=timezone.utc).isoformat()
+        sections = sorted({section for section, _ in _COUNTERS.values()})
+        rows = storage.get_entry_timestamps_since(sections, since)
+        with self._lock:
+            self._counters = {name: DecayingCounter(tau) for name, (_, tau) in _COUNTERS.items()}
+            for section, created_at in rows:
+                self._add(section, _parse_ts(created_at), 1.0)
+            self._memory = None
+            self._seeded = True
+        logger.info("Activity counters seeded from %d entries", len(rows))
+
+    def _add(self, section: str, ts: float, amount: float) -> None:
+        for name, (sec, _) in _COUNTERS.items():
+            if sec == section:
+                self._counters[name].add(ts, amount)
+
+    def record(self, section: str, ts: float | None = None, amount: float = 1.0) -> None:
+        with self._lock:
+            self._add(section, ts if ts is not None else time.time(), amount)
+
+    def snapshot(self, now: float | None = None) -> dict[str, float]:
+        if not self._seeded:
+            self.seed()
+        now = now if now is not None else time.time()
+        with self._lock:
+            return {name: c.value(now) for name, c in self._counters.items()}
+
+    def memory(self) -> dict:
+        """GPT's memory, read from the DB only after it changed."""
+        mem = self._memory
+        if mem is None:
+            mem = storage.read_memory()
+            self._memory = mem
+        return mem
+
+    async def start(self) -> None:
+        """Seed from the DB and follow storage events. Call once at startup."""
+        if self._task is not None:
+            return
+        # Subscribe before seeding: a write racing the seed may be counted
+        # twice, but none can be missed
+        sub = bus.subscribe(EntrySaved, MemorySaved, maxsize=1024, policy="drop_oldest")
+        await asyncio.to_thread(self.seed)
+        self._task = asyncio.create_task(self._follow(sub))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _follow(self, sub) -> None:
+        try:
+            async for event in sub:
+                if isinstance(event, EntrySaved):
+                    self.record(event.section, event.ts)
+                elif isinstance(event, MemorySaved):
+                    self._memory = None
+        finally:
+            sub.close()
+
+
+def _parse_ts(iso: str) -> float:
+    try:
+        return datetime.fromisoformat(iso).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+activity = ActivityCounters()
 
 
 def _calculate_mode_weights(
-    thoughts: int,
-    dreams: int,
-    visitors: int,
+    thoughts: float,
+    dreams: float,
+    visitors: float,
     energy: float,
     coherence: float,
 ) -> dict[str, float]:
@@ -41,7 +181,7 @@ def _calculate_mode_weights(
     }
 
     # Visitor impulse (short-lived)
-    if visitors > 0:
+    if visitors > 0.05:
         weights["visitor"] = min(0.8, visitors * 0.3)
 
     # Dream weight
@@ -73,53 +213,79 @@ def _calculate_mode_weights(
     return weights
 
 
-def build_simulation_state() -> dict:
-    """
-    Derive GPT's current simulation state from existing data.
+# Contribution of last wake's actions to focus; combined as 1 - Π(1 - w)
+_ACTION_FOCUS = {
+    "code_run": 0.6,
+    "room_edit": 0.3,
+    "file_write": 0.3,
+    "thought": 0.25,
+    "dream": 0.25,
+}
+_COHERENCE_BASELINE = 0.5
+_COHERENCE_RELAX = 6 * _HOUR   # focus fades back to baseline after a wake
 
-    Returns a JSON-serializable snapshot used by the /mind particle
-    visualizer to drive visual parameters.
-    """
-    # --- Gather raw data ---
-    recent_thoughts = _count_since("thoughts", hours=24)
-    recent_dreams = _count_since("dreams", hours=24)
-    recent_visitors = _count_since("visitor", hours=24)
 
-    memory = storage.read_memory()
+def _parse_actions(memory: dict) -> list[str]:
     actions_raw = memory.get("actions_taken", "[]")
     if isinstance(actions_raw, str):
         try:
-            actions = json.loads(actions_raw)
+            return json.loads(actions_raw)
         except (json.JSONDecodeError, TypeError):
-            actions = []
-    else:
-        actions = actions_raw if isinstance(actions_raw, list) else []
+            return []
+    return actions_raw if isinstance(actions_raw, list) else []
+
+
+def _energy(thoughts: float, dreams: float, visitors: float) -> float:
+    """Recent activity, soft-saturating instead of clipped."""
+    return math.tanh(thoughts * 0.2 + dreams * 0.15 + visitors * 0.1)
+
+
+def _wake_focus(actions: list[str]) -> float:
+    """Coherence right after a wake with these actions."""
+    unfocused = 1.0
+    for action in set(actions):
+        unfocused *= 1.0 - _ACTION_FOCUS.get(action, 0.0)
+    return _COHERENCE_BASELINE + 0.4 * (1.0 - unfocused)
+
+
+def _relax(at_wake: float, age: float) -> float:
+    return _COHERENCE_BASELINE + (at_wake - _COHERENCE_BASELINE) * math.exp(-max(0.0, age) / _COHERENCE_RELAX)
+
+
+def _coherence(actions: list[str], last_wake: str, now: float) -> float:
+    """Focus of the last wake, relaxing exponentially back to the baseline."""
+    return _relax(_wake_focus(actions), now - _parse_ts(last_wake))
 
+
+def build_simulation_state() -> dict:
+    """
+    Derive GPT's current simulation state from the activity counters.
+
+    Returns a JSON-serializable snapshot used by the /mind particle
+    visualizer to drive visual parameters.
+    """
+    now = time.time()
+    counts = activity.snapshot(now)
+    recent_thoughts = counts["thoughts"]
+    recent_dreams = counts["dreams"]
+    recent_visitors = counts["visitors"]
+
+    memory = activity.memory()
+    actions = _parse_actions(memory)
     mood = memory.get("mood", "neutral")
 
-    # --- Energy: based on recent activity ---
-    energy = min(1.0, (
-        recent_thoughts * 0.2
-        + recent_dreams * 0.15
-        + recent_visitors * 0.1
-    ))
-
-    # --- Coherence: how focused was GPT? ---
-    coherence = 0.5  # baseline
-    if "thought" in actions and "dream" in actions:
-        coherence = 0.7
-    if "code_run" in actions:
-        coherence = 0.8
-    if "room_edit" in actions:
-        coherence = max(coherence, 0.65)
-
-    # --- Event pulse (most recent visitor in last hour) ---
+    energy = _energy(recent_thoughts, recent_dreams, recent_visitors)
+
+    # --- Coherence: how focused was GPT, fading since the last wake ---
+    coherence = _coherence(actions, memory.get("last_wake_time", ""), now)
+
+    # --- Event pulse (visitors within roughly the last hour) ---
     event_pulse = None
-    recent_hour_visitors = _count_since("visitor", hours=1)
-    if recent_hour_visitors > 0:
+    recent_hour_visitors = counts["visitors_1h"]
+    if recent_hour_visitors > 0.05:
         event_pulse = {
             "type": "visitor",
-            "intensity": min(1.0, recent_hour_visitors * 0.4),
+            "intensity": round(min(1.0, recent_hour_visitors * 0.4), 3),
         }
 
     # --- Mode weights ---
@@ -135,10 +301,318 @@ def build_simulation_state() -> dict:
         "coherence": round(coherence, 3),
         "memoryDensity": round(min(1.0, recent_thoughts / 10), 3),
         "focusStrength": round(coherence * 0.8, 3),
-        "recentThoughts": recent_thoughts,
-        "recentDreams": recent_dreams,
-        "recentVisitors": recent_visitors,
+        "recentThoughts": round(recent_thoughts),
+        "recentDreams": round(recent_dreams),
+        "recentVisitors": round(recent_visitors),
         "mood": mood,
         "eventPulse": event_pulse,
         "weights": weights,
     }
+
+
+# --- History (time series from hourly rollups) ---
+
+HISTORY_DEFAULT_DAYS = 30
+HISTORY_DEFAULT_POINTS = 300
+HISTORY_CACHE_TTL = 300.0       # seconds
+HISTORY_CACHE_SIZE = 32
+HISTORY_MAX_DAYS = 731          # longest span served (ValueError beyond)
+HISTORY_HOURLY_DAYS = 90        # longer spans are sampled a day at a time
+
+_history_cache: OrderedDict[tuple[int, int, int], tuple[float, dict]] = OrderedDict()
+_history_lock = threading.Lock()
+
+
+def _lttb(points: list[tuple[float, float]], threshold: int) -> list[int]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of the points to keep (always including the first
+    and last), chosen so the visual shape of the series is preserved.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    keep = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        nxt_start = int((i + 1) * bucket) + 1
+        nxt_end = min(int((i + 2) * bucket) + 1, n)
+        span = points[nxt_start:nxt_end] or [points[-1]]
+        avg_x = sum(p[0] for p in span) / len(span)
+        avg_y = sum(p[1] for p in span) / len(span)
+
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def _hour_iso(hour: int) -> str:
+    return datetime.fromtimestamp(hour * _HOUR, tz=timezone.utc).isoformat()
+
+
+def _history_series(start: float, end: float, step: int = 1) -> tuple[int, list[tuple[float, float, float, float, float]]]:
+    """
+    Replay the decaying counters from the hourly rollups, sampled every
+    `step` hours.
+
+    Returns (first hour index, [(thoughts, dreams, visitors, energy, coherence)])
+    with one row per step in [start, end], the last hour always included.
+    Counters are warmed up over _SEED_HORIZON time constants before `start`
+    so the first point isn't artificially cold. Between rollup buckets they
+    decay in one jump, so the cost follows the buckets and rows, not the span.
+    """
+    warmup = max(tau for _, tau in _COUNTERS.values()) * _SEED_HORIZON
+    first_hour = int((start - warmup) // _HOUR)
+    start_hour = int(start // _HOUR)
+    last_hour = int(end // _HOUR)
+    sections = sorted({section for section, _ in _COUNTERS.values()})
+
+    # Bucket → {section: count}, aggregated in SQL
+    buckets: dict[int, dict[str, int]] = {}
+    for bucket, section, count in storage.get_hourly_activity(
+        sections, _hour_iso(first_hour), _hour_iso(last_hour + 1),
+    ):
+        hour = int(datetime.fromisoformat(bucket + ":00:00+00:00").timestamp() // _HOUR)
+        bucket_counts = buckets.setdefault(hour, {})
+        bucket_counts[section] = bucket_counts.get(section, 0) + count
+    pending = sorted(buckets.items())
+    bucket_idx = 0
+
+    wakes = [
+        (_parse_ts(w["created_at"]), _wake_focus(w.get("actions") or []))
+        for w in storage.get_wake_actions(_hour_iso(first_hour), _hour_iso(last_hour + 1))
+    ]
+    wake_idx = 0
+    last_wake: tuple[float, float] | None = None
+
+    thoughts = dreams = visitors = 0.0
+    at = first_hour  # the hour the counters are current for
+
+    def decay_to(hour: int) -> None:
+        nonlocal thoughts, dreams, visitors, at
+        factor = math.exp(-(hour - at) * _HOUR / _DAY)
+        thoughts *= factor
+        dreams *= factor
+        visitors *= factor
+        at = hour
+
+    rows: list[tuple[float, float, float, float, float]] = []
+    hours = list(range(start_hour, last_hour + 1, step))
+    if hours[-1] != last_hour:
+        hours.append(last_hour)
+    for hour in hours:
+        while bucket_idx < len(pending) and pending[bucket_idx][0] <= hour:
+            bucket_hour, counts = pending[bucket_idx]
+            decay_to(bucket_hour)
+            thoughts += counts.get("thoughts", 0)
+            dreams += counts.get("dreams", 0)
+            visitors += counts.get("visitor", 0)
+            bucket_idx += 1
+        decay_to(hour)
+
+        t = (hour + 1) * _HOUR
+        while wake_idx < len(wakes) and wakes[wake_idx][0] < t:
+            last_wake = wakes[wake_idx]
+            wake_idx += 1
+        coherence = _relax(last_wake[1], t - last_wake[0]) if last_wake else _COHERENCE_BASELINE
+        rows.append((thoughts, dreams, visitors, _energy(thoughts, dreams, visitors), coherence))
+    return start_hour, rows
+
+
+def build_history(start: float | None = None, end: float | None = None,
+                  resolution: int = HISTORY_DEFAULT_POINTS) -> dict:
+    """
+    Simulation state over time, downsampled to at most `resolution` points.
+
+    Hour-aligned, so repeated requests within the same hour hit the cache.
+    Spans over HISTORY_HOURLY_DAYS are sampled daily, and spans over
+    HISTORY_MAX_DAYS raise ValueError. Mode weights are only computed for
+    the points that survive downsampling.
+    """
+    end = min(end if end is not None else time.time(), time.time())
+    start = start if start is not None else end - HISTORY_DEFAULT_DAYS * _DAY
+    if start >= end:
+        start = end - _HOUR
+    if end - start > HISTORY_MAX_DAYS * _DAY:
+        raise ValueError(f"History spans at most {HISTORY_MAX_DAYS} days")
+    step = 24 if end - start > HISTORY_HOURLY_DAYS * _DAY else 1
+    key = (int(start // _HOUR), int(end // _HOUR), resolution)
+
+    now = time.monotonic()
+    with _history_lock:
+        hit = _history_cache.get(key)
+        if hit and now - hit[0] < HISTORY_CACHE_TTL:
+            _history_cache.move_to_end(key)
+            return hit[1]
+
+    start_hour, rows = _history_series(start, end, step)
+    keep = _lttb([(i, r[3] + r[4]) for i, r in enumerate(rows)], resolution)
+
+    points = []
+    for i in keep:
+        thoughts, dreams, visitors, energy, coherence = rows[i]
+        weights = _calculate_mode_weights(thoughts, dreams, visitors, energy, coherence)
+        points.append({
+            "t": _hour_iso(min(start_hour + i * step, int(end // _HOUR))),
+            "energy": round(energy, 3),
+            "coherence": round(coherence, 3),
+            "mode": max(weights, key=weights.get),  # type: ignore[arg-type]
+            "weights": weights,
+        })
+    result = {
+        "from": points[0]["t"] if points else None,
+        "to": points[-1]["t"] if points else None,
+        "resolution": resolution,
+        "source_points": len(rows),
+        "step_hours": step,
+        "points": points,
+    }
+
+    with _history_lock:
+        _history_cache[key] = (now, result)
+        _history_cache.move_to_end(key)
+        while len(_history_cache) > HISTORY_CACHE_SIZE:
+            _history_cache.popitem(last=False)
+    return result
+
+
+# --- Live stream (SSE fan-out) ---
+
+STREAM_INTERVAL = 10.0       # seconds between recomputations
+STREAM_QUEUE_SIZE = 8        # buffered events per subscriber
+STREAM_MAX_OVERFLOWS = 20    # consecutive overflows before a client is dropped
+
+_PULSE_INTENSITY = {"visitor": 0.6, "thoughts": 0.4, "dreams": 0.4}
+
+
+class _Subscriber:
+    """One connected client: a bounded queue plus an overflow counter."""
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[tuple[str, dict] | None] = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.overflows = 0
+
+
+class StateBroadcaster:
+    """
+    Computes the simulation state once and fans it out to all subscribers.
+
+    The compute loop only runs while at least one client is connected.
+    A new "state" event is pushed only when the snapshot actually changed;
+    "pulse" events are pushed immediately when a visitor posts or GPT saves
+    a thought or dream (driven by storage events on the event bus).
+
+    Slow clients never block the loop: when a subscriber's queue is full the
+    oldest event is discarded, and a client that keeps overflowing is dropped.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: set[_Subscriber] = set()
+        self._task: asyncio.Task | None = None
+        self._listener: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._last_state: dict | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> _Subscriber:
+        """Register a client. Starts the compute loop if it isn't running."""
+        sub = _Subscriber()
+        self._subscribers.add(sub)
+        if self._last_state is not None:
+            sub.queue.put_nowait(("state", self._last_state))
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber) -> None:
+        self._subscribers.discard(sub)
+
+    async def _listen(self) -> None:
+        """Turn storage events into pulses and early recomputes."""
+        sub = bus.subscribe(
+            EntrySaved, MemorySaved, RoomChanged, WakeCompleted,
+            maxsize=64, policy="drop_oldest",
+        )
+        try:
+            async for event in sub:
+                self._on_event(event)
+        finally:
+            sub.close()
+
+    def _on_event(self, event: Event) -> None:
+        if isinstance(event, EntrySaved):
+            if event.section not in _PULSE_INTENSITY:
+                return
+            self._publish("pulse", {
+                "type": "visitor" if event.section == "visitor" else event.section.rstrip("s"),
+                "intensity": _PULSE_INTENSITY[event.section],
+            })
+        self._wake.set()
+
+    def _publish(self, name: str, data: dict) -> None:
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait((name, data))
+                sub.overflows = 0
+            except asyncio.QueueFull:
+                # Latest-wins: drop the oldest buffered event to make room
+                sub.overflows += 1
+                if sub.overflows > STREAM_MAX_OVERFLOWS:
+                    logger.info("Dropping slow simulation stream subscriber")
+                    self._subscribers.discard(sub)
+                    _force_put(sub.queue, None)
+                    continue
+                _force_put(sub.queue, (name, data))
+
+    async def _run(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+        try:
+            while self._subscribers:
+                self._wake.clear()
+                try:
+                    state = await asyncio.to_thread(build_simulation_state)
+                except Exception:
+                    logger.exception("Simulation state computation failed")
+                    state = None
+                if state is not None and state != self._last_state:
+                    self._last_state = state
+                    self._publish("state", state)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=STREAM_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._listener.cancel()
+            self._task = None
+
+
+def _force_put(queue: asyncio.Queue, item) -> None:
+    """Put into a bounded queue, evicting the oldest item if it's full."""
+    try:
+        queue.get_nowait()
+    except asyncio.QueueEmpty:
+        pass
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        pass
+
+
+broadcaster = StateBroadcaster()
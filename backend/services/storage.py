@@ -7,14 +7,48 @@ Playground files stay on disk (they're actual code files GPT writes).
 
 import hashlib
 import json
+import logging
 import secrets
 import sqlite3
 import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
 from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
-from typing import Any
-
-from backend.config import ADMIN_SECRET, DB_PATH, PLAYGROUND_DIR, VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW
+from typing import Any, Callable, TypeVar
+
+from backend import migrations
+from backend.config import (
+    ADMIN_SECRET,
+    CHANGES_RETENTION_DAYS,
+    DB_BUSY_TIMEOUT_MS,
+    DB_PATH,
+    DB_WRITE_BATCH,
+    ECHO_MEMO_MAX_ROWS,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETENTION_DAYS,
+    PLAYGROUND_DIR,
+    VISITOR_RATE_LIMIT,
+    VISITOR_RATE_WINDOW,
+)
+from backend.services.db_writer import DbWriter
+from backend.services.events import (
+    EntryDeleted,
+    Event,
+    EntrySaved,
+    EntryUpdated,
+    JobQueued,
+    MemorySaved,
+    NewsChanged,
+    PageChanged,
+    RoomChanged,
+    bus,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 
 # --- Simple encryption for secrets at rest (PBKDF2 + XOR) ---
@@ -43,16 +77,31 @@ def decrypt_value(hex_ciphertext: str) -> str:
 # --- Database setup ---
 
 
-def _get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(DB_PATH))
+def _get_connection(check_same_thread: bool = True) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        str(DB_PATH), timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=check_same_thread
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    # So INSERT OR REPLACE fires DELETE triggers for the replaced row
+    # (keeps the change log and rollups exact)
+    conn.execute("PRAGMA recursive_triggers=ON")
     return conn
 
 
+# Set for the duration of read_snapshot(); _db() reuses it instead of
+# opening a connection per call.
+_snapshot_conn: ContextVar[sqlite3.Connection | None] = ContextVar("storage_snapshot", default=None)
+
+
 @contextmanager
 def _db():
+    snapshot = _snapshot_conn.get()
+    if snapshot is not None:
+        yield snapshot
+        return
     conn = _get_connection()
     try:
         yield conn
@@ -61,131 +110,194 @@ def _db():
         conn.close()
 
 
+@contextmanager
+def read_snapshot():
+    """
+    Make every storage read inside the block use one connection and one
+    read transaction, so they all see the database at the same moment.
+
+    Writes still go through the writer and are not visible to reads in the
+    same block. Nested calls reuse the outer snapshot.
+    """
+    if _snapshot_conn.get() is not None:
+        yield
+        return
+    # Created on the event loop, used from the threadpool
+    conn = _get_connection(check_same_thread=False)
+    conn.execute("BEGIN")
+    conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # pin the WAL snapshot now
+    token = _snapshot_conn.set(conn)
+    try:
+        yield
+    finally:
+        try:
+            _snapshot_conn.reset(token)
+        except ValueError:  # torn down from a different context
+            _snapshot_conn.set(None)
+        conn.rollback()
+        conn.close()
+
+
+async def snapshot_reads():
+    """FastAPI dependency: run the request's storage reads on one read_snapshot()."""
+    with read_snapshot():
+        yield
+
+
+# Reads open their own short-lived connection via _db(); every write is
+# funnelled through one writer thread that group-commits (see db_writer.py).
+_writer = DbWriter(_get_connection, max_batch=DB_WRITE_BATCH)
+
+
+def _write(fn: Callable[[sqlite3.Connection], T]) -> T:
+    """Run fn(conn) on the writer thread and wait until it has committed."""
+    return _writer.run(fn)
+
+
+def _execute(sql: str, params: tuple | list = ()) -> sqlite3.Cursor:
+    """Run one write statement on the writer thread; returns its cursor (rowcount, lastrowid)."""
+    return _writer.run(lambda conn: conn.execute(sql, params))
+
+
+def close_writer() -> None:
+    """Flush queued writes and stop the writer thread (call at shutdown)."""
+    _writer.stop()
+
+
 def init_db() -> None:
-    """Create tables if they don't exist. Call once at startup."""
+    """Bring the schema up to date (see backend/migrations). Call once at startup."""
     with _db() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS entries (
-                id          TEXT PRIMARY KEY,
-                section     TEXT NOT NULL,
-                title       TEXT DEFAULT '',
-                content     TEXT DEFAULT '',
-                mood        TEXT DEFAULT '',
-                name        TEXT DEFAULT '',
-                message     TEXT DEFAULT '',
-                inspired_by TEXT DEFAULT '[]',
-                type        TEXT DEFAULT '',
-                created_at  TEXT NOT NULL
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_entries_section
-                ON entries(section, created_at DESC);
-
-            CREATE TABLE IF NOT EXISTS memory (
-                id              INTEGER PRIMARY KEY CHECK (id = 1),
-                last_wake_time  TEXT NOT NULL,
-                visitors_read   TEXT DEFAULT '[]',
-                actions_taken   TEXT DEFAULT '[]',
-                mood            TEXT DEFAULT 'curious',
-                plans           TEXT DEFAULT '[]'
-            );
-
-            INSERT OR IGNORE INTO memory (id, last_wake_time)
-                VALUES (1, '2000-01-01T00:00:00+00:00');
-
-            CREATE TABLE IF NOT EXISTS activity_log (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                event       TEXT NOT NULL,
-                detail      TEXT DEFAULT '',
-                created_at  TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS admin_news (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                content     TEXT NOT NULL,
-                read_by_gpt INTEGER DEFAULT 0,
-                created_at  TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS rate_limits (
-                fingerprint  TEXT PRIMARY KEY,
-                count        INTEGER DEFAULT 0,
-                window_start TEXT NOT NULL,
-                blocked      INTEGER DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS admin_sessions (
-                token       TEXT PRIMARY KEY,
-                method      TEXT NOT NULL,
-                created_at  TEXT NOT NULL,
-                expires_at  TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS admin_settings (
-                key   TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS custom_pages (
-                slug        TEXT PRIMARY KEY,
-                title       TEXT NOT NULL,
-                content     TEXT NOT NULL,
-                created_by  TEXT DEFAULT 'gpt',
-                nav_order   INTEGER DEFAULT 0,
-                show_in_nav INTEGER DEFAULT 1,
-                created_at  TEXT NOT NULL,
-                updated_at  TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS transcripts (
-                id                TEXT PRIMARY KEY,
-                session_type      TEXT DEFAULT '',
-                messages          TEXT NOT NULL,
-                turns             INTEGER DEFAULT 0,
-                prompt_tokens     INTEGER DEFAULT 0,
-                completion_tokens INTEGER DEFAULT 0,
-                total_tokens      INTEGER DEFAULT 0,
-                cost_usd REAL DEFAULT 0.0,
-                actions           TEXT DEFAULT '[]',
-                mood              TEXT DEFAULT '',
-                created_at        TEXT NOT NULL
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_transcripts_created
-                ON transcripts(created_at DESC);
-
-            CREATE TABLE IF NOT EXISTS room_objects (
-                id          TEXT PRIMARY KEY,
-                type        TEXT NOT NULL,
-                pos_x       REAL DEFAULT 0,
-                pos_y       REAL DEFAULT 0,
-                pos_z       REAL DEFAULT 0,
-                color       TEXT DEFAULT '#ffffff',
-                metadata    TEXT DEFAULT '{}',
-                created_at  TEXT NOT NULL,
-                updated_at  TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS room_history (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                action      TEXT NOT NULL,
-                object_id   TEXT,
-                detail      TEXT DEFAULT '',
-                created_at  TEXT NOT NULL
-            );
+        migrations.migrate(conn)
+
+    # Clean up expired sessions on startup
+    _execute("DELETE FROM admin_sessions WHERE expires_ts < ?", (_now_ts(),))
+
+    compact_changes()
+
+
+# --- Rollups ---
+#
+# activity_rollup holds one row per (hour, section, mood) with the number of
+# entries created in that hour; visitor_names counts messages per visitor
+# name. Both are maintained by triggers on `entries` (installed by migration
+# m004), so time-bucketed analytics read a few hundred rollup rows instead
+# of scanning every entry.
+
+# UTC hour of created_ts; falls back to parsing created_at for rows written
+# without the integer column
+_ROLLUP_BUCKET_SQL = (
+    "COALESCE(strftime('%Y-%m-%dT%H', {ref}.created_ts / 1000000, 'unixepoch'),"
+    " strftime('%Y-%m-%dT%H', {ref}.created_at))"
+)
+
+
+def rebuild_activity_rollup() -> int:
+    """Recompute all rollups from `entries` in one transaction. Returns bucket rows."""
+    bucket = _ROLLUP_BUCKET_SQL.format(ref="entries")
+
+    def rebuild(conn: sqlite3.Connection) -> int:
+        conn.execute("DELETE FROM activity_rollup")
+        conn.execute("DELETE FROM visitor_names")
+        conn.execute(f"""
+            INSERT INTO activity_rollup (bucket_hour, section, mood, count)
+            SELECT {bucket}, section, COALESCE(mood, ''), COUNT(*)
+            FROM entries GROUP BY 1, 2, 3
+        """)
+        conn.execute("""
+            INSERT INTO visitor_names (name, count)
+            SELECT COALESCE(name, ''), COUNT(*) FROM entries
+            WHERE section = 'visitor' GROUP BY 1
         """)
+        return conn.execute("SELECT COUNT(*) AS cnt FROM activity_rollup").fetchone()["cnt"]
 
-        # Add status column to entries if it doesn't exist (for visitor moderation)
-        try:
-            conn.execute("ALTER TABLE entries ADD COLUMN status TEXT DEFAULT 'pending'")
-        except sqlite3.OperationalError:
-            pass  # column already exists
+    return _write(rebuild)
 
-        # Clean up expired sessions on startup
-        conn.execute(
-            "DELETE FROM admin_sessions WHERE expires_at < ?",
-            (_now_iso(),),
-        )
+
+# --- Change log (CDC) ---
+#
+# Every insert/update/delete on the tracked tables appends a row to `changes`
+# via SQLite triggers (migration m003), so the log is written in the same transaction as the
+# change itself and survives restarts. Consumers remember the last `seq` they
+# processed and call changes_since(seq) to catch up.
+
+def changes_since(seq: int = 0, limit: int = 1000) -> list[dict[str, Any]]:
+    """
+    Return change-log rows with seq > the given cursor, oldest first.
+
+    If `seq` is older than oldest_change_seq() - 1 (or, with the log
+    compacted empty, than latest_change_seq()), rows were compacted away
+    and the consumer should do a full resync before resuming.
+    """
+    with _db() as conn:
+        rows = conn.execute(
+            'SELECT seq, "table", op, row_id, ts FROM changes WHERE seq > ? ORDER BY seq ASC LIMIT ?',
+            (seq, limit),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def oldest_change_seq() -> int | None:
+    """Lowest seq still in the change log (None if empty)."""
+    with _db() as conn:
+        row = conn.execute("SELECT MIN(seq) AS seq FROM changes").fetchone()
+    return row["seq"] if row else None
+
+
+def latest_change_seq() -> int:
+    """Highest seq ever assigned (survives compaction thanks to AUTOINCREMENT)."""
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+        ).fetchone()
+    return row["seq"] if row else 0
+
+
+def get_change_cursor(consumer: str) -> int:
+    """Last seq a named consumer has processed (0 if never run)."""
+    value = get_setting(f"changes_cursor:{consumer}")
+    return int(value) if value else 0
+
+
+def set_change_cursor(consumer: str, seq: int) -> None:
+    """Persist a consumer's position in the change log."""
+    set_setting(f"changes_cursor:{consumer}", str(seq))
+
+
+# Seqs of change-log rows this process wrote, so services/change_feed.py
+# replays only other processes' writes (ours already published their events).
+# Added only once the write committed: a rolled-back write hands its seq to
+# the next writer, possibly another process. Bounded: the feed drains it
+# within a poll, and processes without a feed (the worker) just keep the newest.
+_OWN_CHANGES_MAX = 4096
+_own_changes: OrderedDict[int, None] = OrderedDict()
+
+
+def _change_seq(conn: sqlite3.Connection) -> int | None:
+    """The seq of the change-log row a tracked write just added (call inside its transaction)."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+    return row[0] if row else None
+
+
+def _mark_own_changes(seqs: list[int]) -> None:
+    """Remember committed change-log rows as ours."""
+    for seq in seqs:
+        _own_changes[seq] = None
+    while len(_own_changes) > _OWN_CHANGES_MAX:
+        _own_changes.popitem(last=False)
+
+
+def pop_own_change(seq: int) -> bool:
+    """True (once) if this process wrote change-log row `seq`."""
+    if seq in _own_changes:
+        del _own_changes[seq]
+        return True
+    return False
+
+
+def compact_changes(retention_days: int = CHANGES_RETENTION_DAYS) -> int:
+    """Delete change-log rows older than the retention window. Returns rows removed."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).isoformat()
+    return _execute("DELETE FROM changes WHERE ts < ?", (cutoff,)).rowcount
 
 
 # --- Helpers ---
@@ -195,7 +307,22 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _generate_id(section: str) -> str:
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ts(iso: str) -> int:
+    """ISO-8601 timestamp → epoch microseconds (naive values are taken as UTC)."""
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _now_ts() -> int:
+    return (datetime.now(timezone.utc) - _EPOCH) // timedelta(microseconds=1)
+
+
+def generate_id(section: str) -> str:
     """e.g. 'thought-2026-02-15T18-00-a1b2c3'"""
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M")
     short = uuid.uuid4().hex[:6]
@@ -218,18 +345,38 @@ def _row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
 # --- Write ---
 
 
-def save_entry(section: str, data: dict[str, Any]) -> dict[str, Any]:
-    """Save an entry. Adds id and timestamp if missing."""
-    if "id" not in data:
-        data["id"] = _generate_id(section)
-    if "created_at" not in data:
-        data["created_at"] = _now_iso()
+class UnitOfWork:
+    """
+    Storage writes bound to one connection inside one transaction.
 
-    with _db() as conn:
-        conn.execute(
+    Get one through unit_of_work(fn): everything fn does commits together
+    or not at all, and bus events are published only after the commit.
+
+        def post(uow: UnitOfWork):
+            saved = uow.save_entry("visitor", entry)
+            uow.log_activity("visitor_message", preview)
+            return saved
+
+        saved = storage.unit_of_work(post)
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.events: list[Event] = []
+        self.own_changes: list[int] = []  # change-log seqs, marked as ours after the commit
+
+    def save_entry(self, section: str, data: dict[str, Any]) -> dict[str, Any]:
+        """Save an entry. Adds id and timestamp if missing."""
+        if "id" not in data:
+            data["id"] = generate_id(section)
+        if "created_at" not in data:
+            data["created_at"] = _now_iso()
+
+        self.conn.execute(
             """INSERT OR REPLACE INTO entries
-               (id, section, title, content, mood, name, message, inspired_by, type, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+               (id, section, title, content, mood, name, message, inspired_by, type,
+                created_at, created_ts)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
             (
                 data["id"],
                 section,
@@ -241,9 +388,176 @@ def save_entry(section: str, data: dict[str, Any]) -> dict[str, Any]:
                 json.dumps(data.get("inspired_by", [])),
                 data.get("type", ""),
                 data["created_at"],
+                _to_ts(data["created_at"]),
             ),
         )
-    return data
+        seq = _change_seq(self.conn)
+        if seq is not None:
+            self.own_changes.append(seq)
+        self.events.append(EntrySaved(section=section, entry_id=data["id"]))
+        return data
+
+    def log_activity(self, event: str, detail: str = "") -> None:
+        self.conn.execute(
+            "INSERT INTO activity_log (event, detail, created_at, created_ts) VALUES (?, ?, ?, ?)",
+            (event, detail, _now_iso(), _now_ts()),
+        )
+
+    def record_signature(self, entry_id: str, signature: bytes, created_ts: int, keep_since_ts: int) -> None:
+        """Store a visitor message's MinHash signature, dropping ones older than the window."""
+        self.conn.execute("DELETE FROM visitor_minhash WHERE created_ts < ?", (keep_since_ts,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO visitor_minhash (entry_id, signature, created_ts) VALUES (?, ?, ?)",
+            (entry_id, signature, created_ts),
+        )
+
+    def enqueue_job(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        priority: int = 0,
+        delay: float = 0.0,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        dedupe_key: str | None = None,
+    ) -> int | None:
+        """
+        Queue a background job, committed with the rest of the unit of work.
+        Returns its id, or None if a job with the same dedupe_key exists.
+        """
+        now = _now_ts()
+        row = self.conn.execute(
+            """INSERT INTO jobs (kind, payload, priority, max_attempts, run_after, dedupe_key, created_ts)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(dedupe_key) DO NOTHING
+               RETURNING id""",
+            (kind, json.dumps(payload), priority, max_attempts, now + int(delay * 1_000_000), dedupe_key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        self.events.append(JobQueued(kind=kind, job_id=row[0]))
+        return row[0]
+
+    def record_tool_call(self, wake_id: str, tool_call_id: str, name: str, result: str) -> None:
+        """Record that a wake's tool call ran, committed with its side effect."""
+        self.conn.execute(
+            """INSERT OR IGNORE INTO wake_tool_calls (tool_call_id, wake_id, name, result, created_ts)
+               VALUES (?, ?, ?, ?, ?)""",
+            (tool_call_id, wake_id, name, result, _now_ts()),
+        )
+
+    def save_custom_page(self, slug: str, title: str, content: str, created_by: str = "gpt",
+                         nav_order: int = 0, show_in_nav: bool = True) -> None:
+        """Create or update a custom page."""
+        now = _now_iso()
+        existing = self.conn.execute(
+            "SELECT * FROM custom_pages WHERE slug = ?", (slug,)
+        ).fetchone()
+        if existing:
+            self.conn.execute(
+                """UPDATE custom_pages SET title = ?, content = ?, nav_order = ?,
+                   show_in_nav = ?, updated_at = ? WHERE slug = ?""",
+                (title, content, nav_order, int(show_in_nav), now, slug),
+            )
+        else:
+            self.conn.execute(
+                """INSERT INTO custom_pages (slug, title, content, created_by, nav_order,
+                   show_in_nav, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (slug, title, content, created_by, nav_order, int(show_in_nav), now, now),
+            )
+        self.events.append(PageChanged(slug=slug, action="saved"))
+
+    def add_room_object(self, obj_type: str, position: list[float], color: str = "#ffffff",
+                        metadata: dict | None = None) -> dict[str, Any]:
+        """Add an object to GPT's room."""
+        obj_id = f"room-{uuid.uuid4().hex[:8]}"
+        now = _now_iso()
+        px, py, pz = (position + [0, 0, 0])[:3]
+        self.conn.execute(
+            "INSERT INTO room_objects (id, type, pos_x, pos_y, pos_z, color, metadata, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (obj_id, obj_type, px, py, pz, color, json.dumps(metadata or {}), now, now),
+        )
+        self._room_history("add", obj_id, f"type={obj_type}, color={color}", now)
+        self.events.append(RoomChanged(action="add", object_id=obj_id))
+        return {"id": obj_id, "type": obj_type, "position": [px, py, pz], "color": color,
+                "metadata": metadata or {}, "created_at": now, "updated_at": now}
+
+    def update_room_object(self, obj_id: str, **kwargs) -> dict[str, Any] | None:
+        """Update fields on a room object. Accepts: position, color, metadata."""
+        row = self.conn.execute("SELECT * FROM room_objects WHERE id = ?", (obj_id,)).fetchone()
+        if not row:
+            return None
+        now = _now_iso()
+        updates = []
+        params: list[Any] = []
+        detail_parts = []
+        if "position" in kwargs:
+            px, py, pz = (kwargs["position"] + [0, 0, 0])[:3]
+            updates += ["pos_x = ?", "pos_y = ?", "pos_z = ?"]
+            params += [px, py, pz]
+            detail_parts.append(f"pos=[{px},{py},{pz}]")
+        if "color" in kwargs:
+            updates.append("color = ?")
+            params.append(kwargs["color"])
+            detail_parts.append(f"color={kwargs['color']}")
+        if "metadata" in kwargs:
+            updates.append("metadata = ?")
+            params.append(json.dumps(kwargs["metadata"]))
+            detail_parts.append("metadata updated")
+        if not updates:
+            return None
+        updates.append("updated_at = ?")
+        params.append(now)
+        params.append(obj_id)
+        row = self.conn.execute(
+            f"UPDATE room_objects SET {', '.join(updates)} WHERE id = ? RETURNING *",
+            params,
+        ).fetchone()
+        self._room_history("modify", obj_id, "; ".join(detail_parts), now)
+        self.events.append(RoomChanged(action="modify", object_id=obj_id))
+        return _room_object_to_dict(row)
+
+    def remove_room_object(self, obj_id: str) -> bool:
+        """Remove an object from GPT's room."""
+        row = self.conn.execute("SELECT type FROM room_objects WHERE id = ?", (obj_id,)).fetchone()
+        if not row:
+            return False
+        self.conn.execute("DELETE FROM room_objects WHERE id = ?", (obj_id,))
+        self._room_history("remove", obj_id, f"type={row['type']}", _now_iso())
+        self.events.append(RoomChanged(action="remove", object_id=obj_id))
+        return True
+
+    def set_room_ambient(self, lighting: str, sky_color: str = "") -> None:
+        """Store ambient room settings (lighting, sky color) as admin settings."""
+        settings = [("room_lighting", lighting)] + ([("room_sky_color", sky_color)] if sky_color else [])
+        self.conn.executemany("INSERT OR REPLACE INTO admin_settings (key, value) VALUES (?, ?)", settings)
+        detail = f"lighting={lighting}" + (f", sky={sky_color}" if sky_color else "")
+        self._room_history("ambient", None, detail, _now_iso())
+        self.events.append(RoomChanged(action="ambient"))
+
+    def _room_history(self, action: str, obj_id: str | None, detail: str, now: str) -> None:
+        self.conn.execute(
+            "INSERT INTO room_history (action, object_id, detail, created_at, created_ts) VALUES (?, ?, ?, ?, ?)",
+            (action, obj_id, detail, now, _to_ts(now)),
+        )
+
+
+def unit_of_work(fn: Callable[[UnitOfWork], T]) -> T:
+    """Run fn(uow) as one transaction on the writer thread and return its result."""
+    def run(conn: sqlite3.Connection) -> tuple[T, list[Event], list[int]]:
+        uow = UnitOfWork(conn)
+        return fn(uow), uow.events, uow.own_changes
+
+    result, events, own_changes = _write(run)
+    _mark_own_changes(own_changes)
+    for event in events:
+        bus.publish(event)
+    return result
+
+
+def save_entry(section: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Save an entry. Adds id and timestamp if missing."""
+    return unit_of_work(lambda uow: uow.save_entry(section, data))
 
 
 # --- Read ---
@@ -263,22 +577,49 @@ def list_entries(section: str, limit: int = 20, offset: int = 0) -> list[dict[st
     """List entries in a section, sorted newest-first."""
     with _db() as conn:
         rows = conn.execute(
-            "SELECT * FROM entries WHERE section = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            "SELECT * FROM entries WHERE section = ? ORDER BY created_ts DESC LIMIT ? OFFSET ?",
             (section, limit, offset),
         ).fetchall()
     return [_row_to_dict(r) for r in rows]
 
 
 def get_entries_since(section: str, since_iso: str) -> list[dict[str, Any]]:
-    """Get all entries created after a given ISO timestamp."""
+    """Get all non-hidden entries created after a given ISO timestamp."""
     with _db() as conn:
         rows = conn.execute(
-            "SELECT * FROM entries WHERE section = ? AND created_at > ? ORDER BY created_at ASC",
-            (section, since_iso),
+            """SELECT * FROM entries
+               WHERE section = ? AND created_ts > ? AND (status IS NULL OR status != 'hidden')
+               ORDER BY created_ts ASC""",
+            (section, _to_ts(since_iso)),
         ).fetchall()
     return [_row_to_dict(r) for r in rows]
 
 
+def get_entry_sections(entry_ids: list[str]) -> list[tuple[str, str, int]]:
+    """(id, section, created_ts) for the given entries — no row payloads."""
+    if not entry_ids:
+        return []
+    placeholders = ",".join("?" * len(entry_ids))
+    with _db() as conn:
+        rows = conn.execute(
+            f"SELECT id, section, created_ts FROM entries WHERE id IN ({placeholders})", entry_ids,
+        ).fetchall()
+    return [(r["id"], r["section"], r["created_ts"]) for r in rows]
+
+
+def get_entry_timestamps_since(sections: list[str], since_iso: str) -> list[tuple[str, str]]:
+    """(section, created_at) pairs for entries newer than a timestamp — no row payloads."""
+    placeholders = ",".join("?" * len(sections))
+    with _db() as conn:
+        rows = conn.execute(
+            f"""SELECT section, created_at FROM entries
+                WHERE section IN ({placeholders}) AND created_ts > ?
+                ORDER BY created_ts ASC""",
+            (*sections, _to_ts(since_iso)),
+        ).fetchall()
+    return [(r["section"], r["created_at"]) for r in rows]
+
+
 def get_recent(section: str, limit: int = 3) -> list[dict[str, Any]]:
     """Get the N most recent entries."""
     return list_entries(section, limit=limit)
@@ -313,7 +654,7 @@ def read_memory() -> dict[str, Any]:
 
 def save_memory(memory: dict[str, Any]) -> None:
     """Write GPT's memory for next wake."""
-    with _db() as conn:
+    def write(conn: sqlite3.Connection) -> int | None:
         conn.execute(
             """UPDATE memory SET
                 last_wake_time = ?,
@@ -330,6 +671,12 @@ def save_memory(memory: dict[str, Any]) -> None:
                 json.dumps(memory.get("plans", [])),
             ),
         )
+        return _change_seq(conn)
+
+    seq = _write(write)
+    if seq is not None:
+        _mark_own_changes([seq])
+    bus.publish(MemorySaved(mood=memory.get("mood", "")))
 
 
 # --- Playground (stays on disk — actual code files, not DB rows) ---
@@ -400,18 +747,14 @@ def get_playground_file(project_name: str, filename: str) -> str | None:
 
 def log_activity(event: str, detail: str = "") -> None:
     """Log an activity event."""
-    with _db() as conn:
-        conn.execute(
-            "INSERT INTO activity_log (event, detail, created_at) VALUES (?, ?, ?)",
-            (event, detail, _now_iso()),
-        )
+    unit_of_work(lambda uow: uow.log_activity(event, detail))
 
 
 def get_activity_log(limit: int = 50, offset: int = 0) -> list[dict[str, Any]]:
     """Get activity log entries."""
     with _db() as conn:
         rows = conn.execute(
-            "SELECT * FROM activity_log ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            "SELECT * FROM activity_log ORDER BY created_ts DESC LIMIT ? OFFSET ?",
             (limit, offset),
         ).fetchall()
     return [dict(r) for r in rows]
@@ -422,15 +765,19 @@ def get_activity_log(limit: int = 50, offset: int = 0) -> list[dict[str, Any]]:
 
 def save_admin_news(content: str) -> dict[str, Any]:
     """Save a news/update for GPT."""
-    with _db() as conn:
-        conn.execute(
+    def insert(conn: sqlite3.Connection) -> dict[str, Any]:
+        cur = conn.execute(
             "INSERT INTO admin_news (content, created_at) VALUES (?, ?)",
             (content, _now_iso()),
         )
         row = conn.execute(
-            "SELECT * FROM admin_news ORDER BY id DESC LIMIT 1"
+            "SELECT * FROM admin_news WHERE id = ?", (cur.lastrowid,)
         ).fetchone()
-    return dict(row)
+        return dict(row)
+
+    news = _write(insert)
+    bus.publish(NewsChanged(action="saved"))
+    return news
 
 
 def get_unread_news() -> list[dict[str, Any]]:
@@ -447,11 +794,11 @@ def mark_news_read(news_ids: list[int]) -> None:
     if not news_ids:
         return
     placeholders = ",".join("?" * len(news_ids))
-    with _db() as conn:
-        conn.execute(
-            f"UPDATE admin_news SET read_by_gpt = 1 WHERE id IN ({placeholders})",
-            news_ids,
-        )
+    _execute(
+        f"UPDATE admin_news SET read_by_gpt = 1 WHERE id IN ({placeholders})",
+        news_ids,
+    )
+    bus.publish(NewsChanged(action="read"))
 
 
 def list_admin_news(limit: int = 50) -> list[dict[str, Any]]:
@@ -466,10 +813,9 @@ def list_admin_news(limit: int = 50) -> list[dict[str, Any]]:
 
 def delete_admin_news(news_id: int) -> bool:
     """Delete a single admin news item."""
-    with _db() as conn:
-        result = conn.execute(
-            "DELETE FROM admin_news WHERE id = ?", (news_id,)
-        )
+    result = _execute("DELETE FROM admin_news WHERE id = ?", (news_id,))
+    if result.rowcount > 0:
+        bus.publish(NewsChanged(action="deleted"))
     return result.rowcount > 0
 
 
@@ -478,21 +824,23 @@ def delete_admin_news(news_id: int) -> bool:
 
 def update_visitor_status(entry_id: str, status: str) -> bool:
     """Update visitor message status (pending/approved/hidden)."""
-    with _db() as conn:
-        result = conn.execute(
-            "UPDATE entries SET status = ? WHERE id = ? AND section = 'visitor'",
-            (status, entry_id),
-        )
+    result = _execute(
+        "UPDATE entries SET status = ? WHERE id = ? AND section = 'visitor'",
+        (status, entry_id),
+    )
+    if result.rowcount > 0:
+        bus.publish(EntryUpdated(section="visitor", entry_id=entry_id, status=status))
     return result.rowcount > 0
 
 
 def delete_visitor_message(entry_id: str) -> bool:
     """Permanently delete a visitor message."""
-    with _db() as conn:
-        result = conn.execute(
-            "DELETE FROM entries WHERE id = ? AND section = 'visitor'",
-            (entry_id,),
-        )
+    result = _execute(
+        "DELETE FROM entries WHERE id = ? AND section = 'visitor'",
+        (entry_id,),
+    )
+    if result.rowcount > 0:
+        bus.publish(EntryDeleted(section="visitor", entry_id=entry_id))
     return result.rowcount > 0
 
 
@@ -500,7 +848,7 @@ def list_all_visitors(limit: int = 100, offset: int = 0) -> list[dict[str, Any]]
     """List all visitor messages (for admin, includes status)."""
     with _db() as conn:
         rows = conn.execute(
-            "SELECT * FROM entries WHERE section = 'visitor' ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            "SELECT * FROM entries WHERE section = 'visitor' ORDER BY created_ts DESC LIMIT ? OFFSET ?",
             (limit, offset),
         ).fetchall()
     return [_row_to_dict(r) for r in rows]
@@ -512,7 +860,7 @@ def list_visible_visitors(limit: int = 20) -> list[dict[str, Any]]:
         rows = conn.execute(
             """SELECT * FROM entries
                WHERE section = 'visitor' AND (status IS NULL OR status != 'hidden')
-               ORDER BY created_at DESC LIMIT ?""",
+               ORDER BY created_ts DESC LIMIT ?""",
             (limit,),
         ).fetchall()
     return [_row_to_dict(r) for r in rows]
@@ -524,7 +872,7 @@ def get_visitor_replies(visitor_id: str) -> list[dict[str, Any]]:
         rows = conn.execute(
             """SELECT * FROM entries
                WHERE section = 'visitor_replies' AND inspired_by LIKE ?
-               ORDER BY created_at ASC""",
+               ORDER BY created_ts ASC""",
             (f'%"{visitor_id}"%',),
         ).fetchall()
     return [_row_to_dict(r) for r in rows]
@@ -536,12 +884,57 @@ def get_all_visitor_replies(limit: int = 100) -> list[dict[str, Any]]:
         rows = conn.execute(
             """SELECT * FROM entries
                WHERE section = 'visitor_replies'
-               ORDER BY created_at DESC LIMIT ?""",
+               ORDER BY created_ts DESC LIMIT ?""",
             (limit,),
         ).fetchall()
     return [_row_to_dict(r) for r in rows]
 
 
+# Visible messages no admin has explicitly approved — what a rescan may hide.
+_RESCANNABLE = "section = 'visitor' AND (status IS NULL OR status NOT IN ('hidden', 'approved'))"
+
+
+def count_rescannable_visitors() -> int:
+    with _db() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM entries WHERE {_RESCANNABLE}").fetchone()[0]
+
+
+def list_rescannable_visitors(after_rowid: int, limit: int) -> list[tuple[int, str, str, str]]:
+    """(rowid, id, name, message) of rescannable messages after a rowid, in rowid order (keyset paging)."""
+    with _db() as conn:
+        rows = conn.execute(
+            f"""SELECT rowid, id, name, message FROM entries
+                WHERE {_RESCANNABLE} AND rowid > ?
+                ORDER BY rowid LIMIT ?""",
+            (after_rowid, limit),
+        ).fetchall()
+    return [(r[0], r[1], r[2], r[3]) for r in rows]
+
+
+def hide_visitor_messages(entry_ids: list[str]) -> list[str]:
+    """
+    Hide a batch of visitor messages in one short transaction. Messages an
+    admin approved or hid in the meantime are skipped. Returns the ids hidden.
+    """
+    if not entry_ids:
+        return []
+    placeholders = ",".join("?" * len(entry_ids))
+
+    def write(conn: sqlite3.Connection) -> list[str]:
+        rows = conn.execute(
+            f"""UPDATE entries SET status = 'hidden'
+                WHERE {_RESCANNABLE} AND id IN ({placeholders})
+                RETURNING id""",
+            entry_ids,
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    hidden = _write(write)
+    for entry_id in hidden:
+        bus.publish(EntryUpdated(section="visitor", entry_id=entry_id, status="hidden"))
+    return hidden
+
+
 def count_visible_visitors() -> int:
     """Count non-hidden visitor messages (for public stats)."""
     with _db() as conn:
@@ -552,65 +945,37 @@ def count_visible_visitors() -> int:
     return row["cnt"] if row else 0
 
 
-# --- Rate Limiting ---
-
-
-def check_rate_limit(fingerprint: str) -> tuple[bool, int]:
-    """Check if a fingerprint is rate-limited. Returns (allowed, remaining)."""
-    now = datetime.now(timezone.utc)
+def list_signatures(since_ts: int) -> list[tuple[str, bytes, int]]:
+    """(entry_id, signature, created_ts) of visitor messages newer than since_ts, oldest first."""
     with _db() as conn:
-        row = conn.execute(
-            "SELECT * FROM rate_limits WHERE fingerprint = ?",
-            (fingerprint,),
-        ).fetchone()
+        rows = conn.execute(
+            """SELECT entry_id, signature, created_ts FROM visitor_minhash
+               WHERE created_ts >= ? ORDER BY created_ts""",
+            (since_ts,),
+        ).fetchall()
+    return [(r[0], r[1], r[2]) for r in rows]
 
-        if row and row["blocked"]:
-            return False, 0
-
-        if row:
-            window_start = datetime.fromisoformat(row["window_start"])
-            elapsed = (now - window_start).total_seconds()
-            if elapsed > VISITOR_RATE_WINDOW:
-                # Reset window
-                conn.execute(
-                    "UPDATE rate_limits SET count = 1, window_start = ? WHERE fingerprint = ?",
-                    (_now_iso(), fingerprint),
-                )
-                return True, VISITOR_RATE_LIMIT - 1
-            elif row["count"] >= VISITOR_RATE_LIMIT:
-                return False, 0
-            else:
-                conn.execute(
-                    "UPDATE rate_limits SET count = count + 1 WHERE fingerprint = ?",
-                    (fingerprint,),
-                )
-                return True, VISITOR_RATE_LIMIT - row["count"] - 1
-        else:
-            conn.execute(
-                "INSERT INTO rate_limits (fingerprint, count, window_start) VALUES (?, 1, ?)",
-                (fingerprint, _now_iso()),
-            )
-            return True, VISITOR_RATE_LIMIT - 1
 
+# --- Rate Limiting ---
 
-def block_fingerprint(fingerprint: str) -> None:
-    """Block a fingerprint from posting."""
-    with _db() as conn:
-        conn.execute(
-            """INSERT INTO rate_limits (fingerprint, count, window_start, blocked)
-               VALUES (?, 0, ?, 1)
-               ON CONFLICT(fingerprint) DO UPDATE SET blocked = 1""",
-            (fingerprint, _now_iso()),
-        )
 
+def persist_block(fingerprint: str, blocked: bool) -> Future[None]:
+    """
+    Queue the write that records or lifts a ban and return without waiting.
+    Lifting a ban deletes the row, so the table only ever holds bans.
+    """
+    if blocked:
+        sql = """INSERT INTO rate_limits (fingerprint, count, window_start, window_ts, blocked)
+                 VALUES (?, 0, ?, ?, 1)
+                 ON CONFLICT(fingerprint) DO UPDATE SET blocked = 1"""
+        params: tuple = (fingerprint, _now_iso(), _now_ts())
+    else:
+        sql, params = "DELETE FROM rate_limits WHERE fingerprint = ?", (fingerprint,)
 
-def unblock_fingerprint(fingerprint: str) -> None:
-    """Unblock a fingerprint."""
-    with _db() as conn:
-        conn.execute(
-            "UPDATE rate_limits SET blocked = 0 WHERE fingerprint = ?",
-            (fingerprint,),
-        )
+    def write(conn: sqlite3.Connection) -> None:
+        conn.execute(sql, params)
+
+    return _writer.submit(write)
 
 
 def list_blocked() -> list[dict[str, Any]]:
@@ -637,7 +1002,7 @@ def get_last_entry_time() -> str | None:
     """Get the timestamp of the most recent entry (any section)."""
     with _db() as conn:
         row = conn.execute(
-            "SELECT created_at FROM entries ORDER BY created_at DESC LIMIT 1"
+            "SELECT created_at FROM entries ORDER BY created_ts DESC LIMIT 1"
         ).fetchone()
     return row["created_at"] if row else None
 
@@ -653,13 +1018,19 @@ def create_session(method: str) -> str:
     token = secrets.token_urlsafe(48)
     now = datetime.now(timezone.utc)
     expires = now + timedelta(hours=SESSION_DURATION_HOURS)
-    with _db() as conn:
+
+    def insert(conn: sqlite3.Connection) -> None:
         # Cleanup expired sessions
-        conn.execute("DELETE FROM admin_sessions WHERE expires_at < ?", (_now_iso(),))
+        conn.execute("DELETE FROM admin_sessions WHERE expires_ts < ?", (_now_ts(),))
         conn.execute(
-            "INSERT INTO admin_sessions (token, method, created_at, expires_at) VALUES (?, ?, ?, ?)",
-            (token, method, now.isoformat(), expires.isoformat()),
+            """INSERT INTO admin_sessions
+               (token, method, created_at, expires_at, created_ts, expires_ts)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (token, method, now.isoformat(), expires.isoformat(),
+             _to_ts(now.isoformat()), _to_ts(expires.isoformat())),
         )
+
+    _write(insert)
     return token
 
 
@@ -667,16 +1038,15 @@ def validate_session(token: str) -> bool:
     """Check if a session token is valid."""
     with _db() as conn:
         row = conn.execute(
-            "SELECT * FROM admin_sessions WHERE token = ? AND expires_at > ?",
-            (token, _now_iso()),
+            "SELECT * FROM admin_sessions WHERE token = ? AND expires_ts > ?",
+            (token, _now_ts()),
         ).fetchone()
     return row is not None
 
 
 def delete_session(token: str) -> None:
     """Invalidate a session."""
-    with _db() as conn:
-        conn.execute("DELETE FROM admin_sessions WHERE token = ?", (token,))
+    _execute("DELETE FROM admin_sessions WHERE token = ?", (token,))
 
 
 # --- Admin Settings (key-value store for TOTP secret etc.) ---
@@ -693,11 +1063,10 @@ def get_setting(key: str) -> str | None:
 
 def set_setting(key: str, value: str) -> None:
     """Set an admin setting."""
-    with _db() as conn:
-        conn.execute(
-            "INSERT OR REPLACE INTO admin_settings (key, value) VALUES (?, ?)",
-            (key, value),
-        )
+    _execute(
+        "INSERT OR REPLACE INTO admin_settings (key, value) VALUES (?, ?)",
+        (key, value),
+    )
 
 
 # --- Custom Pages (GPT-editable) ---
@@ -706,23 +1075,7 @@ def set_setting(key: str, value: str) -> None:
 def save_custom_page(slug: str, title: str, content: str, created_by: str = "gpt",
                      nav_order: int = 0, show_in_nav: bool = True) -> dict[str, Any]:
     """Create or update a custom page."""
-    now = _now_iso()
-    with _db() as conn:
-        existing = conn.execute(
-            "SELECT * FROM custom_pages WHERE slug = ?", (slug,)
-        ).fetchone()
-        if existing:
-            conn.execute(
-                """UPDATE custom_pages SET title = ?, content = ?, nav_order = ?,
-                   show_in_nav = ?, updated_at = ? WHERE slug = ?""",
-                (title, content, nav_order, int(show_in_nav), now, slug),
-            )
-        else:
-            conn.execute(
-                """INSERT INTO custom_pages (slug, title, content, created_by, nav_order,
-                   show_in_nav, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (slug, title, content, created_by, nav_order, int(show_in_nav), now, now),
-            )
+    unit_of_work(lambda uow: uow.save_custom_page(slug, title, content, created_by, nav_order, show_in_nav))
     return get_custom_page(slug)  # type: ignore
 
 
@@ -746,10 +1099,9 @@ def list_custom_pages() -> list[dict[str, Any]]:
 
 def delete_custom_page(slug: str) -> bool:
     """Delete a custom page."""
-    with _db() as conn:
-        result = conn.execute(
-            "DELETE FROM custom_pages WHERE slug = ?", (slug,)
-        )
+    result = _execute("DELETE FROM custom_pages WHERE slug = ?", (slug,))
+    if result.rowcount > 0:
+        bus.publish(PageChanged(slug=slug, action="deleted"))
     return result.rowcount > 0
 
 
@@ -760,25 +1112,25 @@ def get_entries_with_dates(section: str, limit: int = 200) -> list[dict[str, Any
     """Get entries with full data for analytics."""
     with _db() as conn:
         rows = conn.execute(
-            "SELECT * FROM entries WHERE section = ? ORDER BY created_at ASC LIMIT ?",
+            "SELECT * FROM entries WHERE section = ? ORDER BY created_ts ASC LIMIT ?",
             (section, limit),
         ).fetchall()
     return [_row_to_dict(r) for r in rows]
 
 
 def get_visitor_stats() -> dict[str, Any]:
-    """Get visitor statistics."""
+    """Get visitor statistics (from the rollup tables)."""
     with _db() as conn:
         total = conn.execute(
-            "SELECT COUNT(*) as cnt FROM entries WHERE section = 'visitor'"
+            "SELECT COALESCE(SUM(count), 0) as cnt FROM activity_rollup WHERE section = 'visitor'"
         ).fetchone()["cnt"]
         unique_names = conn.execute(
-            "SELECT COUNT(DISTINCT name) as cnt FROM entries WHERE section = 'visitor'"
+            "SELECT COUNT(*) as cnt FROM visitor_names WHERE count > 0"
         ).fetchone()["cnt"]
         by_date = conn.execute(
-            """SELECT DATE(created_at) as day, COUNT(*) as cnt
-               FROM entries WHERE section = 'visitor'
-               GROUP BY DATE(created_at) ORDER BY day"""
+            """SELECT substr(bucket_hour, 1, 10) as day, SUM(count) as cnt
+               FROM activity_rollup WHERE section = 'visitor'
+               GROUP BY day HAVING cnt > 0 ORDER BY day"""
         ).fetchall()
     return {
         "total": total,
@@ -787,17 +1139,73 @@ def get_visitor_stats() -> dict[str, Any]:
     }
 
 
-def get_mood_timeline() -> list[dict[str, Any]]:
-    """Get mood data over time from thoughts and dreams."""
+def get_mood_timeline(limit: int = 200) -> list[dict[str, Any]]:
+    """Get the most recent moods from thoughts and dreams, oldest first."""
     with _db() as conn:
         rows = conn.execute(
-            """SELECT section, mood, created_at FROM entries
-               WHERE section IN ('thoughts', 'dreams') AND mood != ''
-               ORDER BY created_at ASC"""
+            """SELECT * FROM (
+                   SELECT section, mood, created_at, created_ts FROM entries
+                   WHERE section IN ('thoughts', 'dreams') AND mood != ''
+                   ORDER BY created_ts DESC LIMIT ?
+               ) ORDER BY created_ts ASC""",
+            (limit,),
+        ).fetchall()
+    return [{"section": r["section"], "mood": r["mood"], "created_at": r["created_at"]} for r in rows]
+
+
+def get_mood_rollup(group_by: str) -> list[dict[str, Any]]:
+    """
+    Mood counts of thoughts and dreams grouped by "month" (YYYY-MM),
+    "hour" (0-23, hour of day) or "all", read from activity_rollup.
+    """
+    key_sql = {
+        "month": "substr(bucket_hour, 1, 7)",
+        "hour": "CAST(substr(bucket_hour, 12, 2) AS INTEGER)",
+        "all": "''",
+    }[group_by]
+    with _db() as conn:
+        rows = conn.execute(
+            f"""SELECT {key_sql} AS bucket, mood, SUM(count) AS cnt
+                FROM activity_rollup
+                WHERE section IN ('thoughts', 'dreams') AND mood != ''
+                GROUP BY bucket, mood HAVING cnt > 0
+                ORDER BY bucket, cnt DESC""",
         ).fetchall()
     return [dict(r) for r in rows]
 
 
+def get_hourly_activity(sections: list[str], since_iso: str, until_iso: str) -> list[tuple[str, str, int]]:
+    """(bucket_hour 'YYYY-MM-DDTHH', section, count) for entries in [since, until)."""
+    placeholders = ",".join("?" * len(sections))
+    with _db() as conn:
+        rows = conn.execute(
+            f"""SELECT bucket_hour AS bucket, section, SUM(count) AS cnt
+                FROM activity_rollup
+                WHERE section IN ({placeholders}) AND bucket_hour >= ? AND bucket_hour < ?
+                GROUP BY bucket, section ORDER BY bucket""",
+            (*sections, since_iso[:13], until_iso[:13]),
+        ).fetchall()
+    return [(r["bucket"], r["section"], r["cnt"]) for r in rows]
+
+
+def get_wake_actions(since_iso: str, until_iso: str) -> list[dict[str, Any]]:
+    """Wake timestamps and their actions (from transcripts), oldest first."""
+    with _db() as conn:
+        rows = conn.execute(
+            """SELECT created_at, actions FROM transcripts
+               WHERE created_ts >= ? AND created_ts < ? ORDER BY created_ts ASC""",
+            (_to_ts(since_iso), _to_ts(until_iso)),
+        ).fetchall()
+    results = []
+    for r in rows:
+        try:
+            actions = json.loads(r["actions"] or "[]")
+        except (json.JSONDecodeError, TypeError):
+            actions = []
+        results.append({"created_at": r["created_at"], "actions": actions})
+    return results
+
+
 _EXT_TO_LANG = {
     "py": "python", "js": "javascript", "ts": "typescript",
     "html": "html", "css": "css", "json": "json", "md": "markdown",
@@ -857,26 +1265,26 @@ def save_transcript(data: dict[str, Any]) -> dict[str, Any]:
     """Save a wake transcript (full conversation + token usage)."""
     transcript_id = f"wake-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
     now = _now_iso()
-    with _db() as conn:
-        conn.execute(
-            """INSERT INTO transcripts
-               (id, session_type, messages, turns, prompt_tokens, completion_tokens,
-                total_tokens, cost_usd, actions, mood, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                transcript_id,
-                data.get("session_type", ""),
-                json.dumps(data.get("messages", []), ensure_ascii=False),
-                data.get("turns", 0),
-                data.get("prompt_tokens", 0),
-                data.get("completion_tokens", 0),
-                data.get("total_tokens", 0),
-                data.get("cost_usd", 0.0),
-                json.dumps(data.get("actions", [])),
-                data.get("mood", ""),
-                now,
-            ),
-        )
+    _execute(
+        """INSERT INTO transcripts
+           (id, session_type, messages, turns, prompt_tokens, completion_tokens,
+            total_tokens, cost_usd, actions, mood, created_at, created_ts)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            transcript_id,
+            data.get("session_type", ""),
+            json.dumps(data.get("messages", []), ensure_ascii=False),
+            data.get("turns", 0),
+            data.get("prompt_tokens", 0),
+            data.get("completion_tokens", 0),
+            data.get("total_tokens", 0),
+            data.get("cost_usd", 0.0),
+            json.dumps(data.get("actions", [])),
+            data.get("mood", ""),
+            now,
+            _to_ts(now),
+        ),
+    )
     return {"id": transcript_id, "created_at": now}
 
 
@@ -886,7 +1294,7 @@ def list_transcripts(limit: int = 20, offset: int = 0) -> list[dict[str, Any]]:
         rows = conn.execute(
             """SELECT id, session_type, turns, prompt_tokens, completion_tokens,
                       total_tokens, cost_usd, actions, mood, created_at
-               FROM transcripts ORDER BY created_at DESC LIMIT ? OFFSET ?""",
+               FROM transcripts ORDER BY created_ts DESC LIMIT ? OFFSET ?""",
             (limit, offset),
         ).fetchall()
     results = []
@@ -931,8 +1339,8 @@ def get_token_stats() -> dict[str, Any]:
         last_7d = conn.execute(
             """SELECT COUNT(*) as wakes, SUM(total_tokens) as total,
                       SUM(cost_usd) as cost
-               FROM transcripts WHERE created_at > ?""",
-            ((datetime.now(timezone.utc) - timedelta(days=7)).isoformat(),),
+               FROM transcripts WHERE created_ts > ?""",
+            (_now_ts() - 7 * 86_400_000_000,),
         ).fetchone()
     return {
         "all_time": {
@@ -950,123 +1358,418 @@ def get_token_stats() -> dict[str, Any]:
     }
 
 
-# --- Room (3D virtual space) ---
+# --- Wake checkpoints (see services/gpt_writer.py) ---
 
 
-def get_room_objects() -> list[dict[str, Any]]:
-    """Return all objects in GPT's room."""
+def begin_wake(wake_id: str, session_type: str, meta: dict[str, Any]) -> None:
+    """Open the checkpoint row of a wake that's about to start."""
+    now = _now_ts()
+    _execute(
+        """INSERT INTO in_progress_wakes (id, session_type, meta, started_ts, updated_ts)
+           VALUES (?, ?, ?, ?, ?)""",
+        (wake_id, session_type, json.dumps(meta), now, now),
+    )
+
+
+def checkpoint_wake(wake_id: str, messages: list[dict[str, Any]], progress: dict[str, Any]) -> None:
+    """Save a running wake's conversation and counters; returns once committed."""
+    _execute(
+        """UPDATE in_progress_wakes SET messages = ?, progress = ?, turns = ?, updated_ts = ?
+           WHERE id = ?""",
+        (
+            json.dumps(messages, ensure_ascii=False),
+            json.dumps(progress),
+            progress.get("turns", 0),
+            _now_ts(),
+            wake_id,
+        ),
+    )
+
+
+def list_interrupted_wakes() -> list[dict[str, Any]]:
+    """Checkpoints left behind by wakes that never finished, oldest first."""
     with _db() as conn:
-        rows = conn.execute(
-            "SELECT * FROM room_objects ORDER BY created_at"
-        ).fetchall()
+        rows = conn.execute("SELECT * FROM in_progress_wakes ORDER BY started_ts").fetchall()
     return [
         {
-            "id": r["id"],
-            "type": r["type"],
-            "position": [r["pos_x"], r["pos_y"], r["pos_z"]],
-            "color": r["color"],
-            "metadata": json.loads(r["metadata"] or "{}"),
-            "created_at": r["created_at"],
-            "updated_at": r["updated_at"],
+            **dict(r),
+            "meta": json.loads(r["meta"]),
+            "messages": json.loads(r["messages"]),
+            "progress": json.loads(r["progress"]),
         }
         for r in rows
     ]
 
 
-def add_room_object(obj_type: str, position: list[float], color: str = "#ffffff",
-                    metadata: dict | None = None) -> dict[str, Any]:
-    """Add an object to GPT's room."""
-    obj_id = f"room-{uuid.uuid4().hex[:8]}"
-    now = _now_iso()
-    meta_json = json.dumps(metadata or {})
-    px, py, pz = (position + [0, 0, 0])[:3]
+def finish_wake(wake_id: str) -> None:
+    """Drop a finished wake's checkpoint and tool-call ledger."""
+    def write(conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM wake_tool_calls WHERE wake_id = ?", (wake_id,))
+        conn.execute("DELETE FROM in_progress_wakes WHERE id = ?", (wake_id,))
+
+    _write(write)
+
+
+def get_tool_call_result(tool_call_id: str) -> str | None:
+    """The recorded result of a tool call that already ran, if any."""
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT result FROM wake_tool_calls WHERE tool_call_id = ?", (tool_call_id,)
+        ).fetchone()
+    return row["result"] if row else None
+
+
+def record_tool_call(wake_id: str, tool_call_id: str, name: str, result: str) -> None:
+    """Record a tool call's result so a resumed wake doesn't run it again."""
+    unit_of_work(lambda uow: uow.record_tool_call(wake_id, tool_call_id, name, result))
+
+
+# --- Leases (see services/leases.py) ---
+
+
+def acquire_lease(name: str, owner: str, ttl: float) -> dict[str, Any]:
+    """
+    Take the lease if it's free or expired, or extend it if `owner`
+    already holds it. Returns the lease row plus "acquired".
+    """
+    now = _now_ts()
+
+    def write(conn: sqlite3.Connection) -> dict[str, Any]:
+        won = conn.execute(
+            """INSERT INTO leases (name, owner, expires_ts, acquired_ts) VALUES (?, ?, ?, ?)
+               ON CONFLICT(name) DO UPDATE SET
+                   owner = excluded.owner,
+                   expires_ts = excluded.expires_ts,
+                   acquired_ts = CASE WHEN leases.owner = excluded.owner
+                                      THEN leases.acquired_ts ELSE excluded.acquired_ts END
+               WHERE leases.expires_ts <= ? OR leases.owner = excluded.owner
+               RETURNING *""",
+            (name, owner, now + int(ttl * 1_000_000), now, now),
+        ).fetchone()
+        row = won or conn.execute("SELECT * FROM leases WHERE name = ?", (name,)).fetchone()
+        return {**dict(row), "acquired": won is not None}
+
+    return _write(write)
+
+
+def renew_lease(name: str, owner: str, ttl: float) -> bool:
+    """Push out the expiry of a lease `owner` still holds. False if it was lost."""
+    return _execute(
+        "UPDATE leases SET expires_ts = ? WHERE name = ? AND owner = ?",
+        (_now_ts() + int(ttl * 1_000_000), name, owner),
+    ).rowcount == 1
+
+
+def release_lease(name: str, owner: str) -> None:
+    _execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+
+def list_leases() -> list[dict[str, Any]]:
+    """Leases that haven't expired."""
     with _db() as conn:
+        rows = conn.execute(
+            "SELECT * FROM leases WHERE expires_ts > ? ORDER BY name", (_now_ts(),)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+# --- Job Queue (see services/jobs.py) ---
+
+
+def _job_to_dict(row: sqlite3.Row) -> dict[str, Any]:
+    d = dict(row)
+    d["payload"] = json.loads(d["payload"])
+    d["result"] = json.loads(d["result"]) if d.get("result") is not None else None
+    return d
+
+
+def enqueue_job(kind: str, payload: dict[str, Any], **kwargs: Any) -> int | None:
+    """Queue a background job on its own (see UnitOfWork.enqueue_job)."""
+    return unit_of_work(lambda uow: uow.enqueue_job(kind, payload, **kwargs))
+
+
+def enqueue_job_if_idle(kind: str, payload: dict[str, Any], **kwargs: Any) -> int | None:
+    """Queue a job unless one of the same kind is queued or running. Returns its id, or None."""
+    def enqueue(uow: UnitOfWork) -> int | None:
+        active = uow.conn.execute(
+            "SELECT 1 FROM jobs WHERE kind = ? AND status IN ('queued', 'running') LIMIT 1", (kind,)
+        ).fetchone()
+        return None if active else uow.enqueue_job(kind, payload, **kwargs)
+    return unit_of_work(enqueue)
+
+
+def claim_job(owner: str, lease_seconds: float, concurrency: int, kinds: list[str]) -> dict[str, Any] | None:
+    """
+    Lease the next ready job of one of `kinds` (highest priority, then
+    oldest) unless `concurrency` jobs are already running anywhere.
+    Jobs whose lease ran out — their worker died — go back to the queue
+    first, or to the dead letters if that was their last attempt.
+    """
+    if not kinds:
+        return None
+    placeholders = ",".join("?" * len(kinds))
+
+    def claim(conn: sqlite3.Connection) -> dict[str, Any] | None:
+        now = _now_ts()
         conn.execute(
-            "INSERT INTO room_objects (id, type, pos_x, pos_y, pos_z, color, metadata, created_at, updated_at) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (obj_id, obj_type, px, py, pz, color, meta_json, now, now),
+            """UPDATE jobs
+               SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+                   finished_ts = CASE WHEN attempts >= max_attempts THEN ? END,
+                   last_error = 'lease expired (worker lost)',
+                   lease_owner = NULL, lease_until = NULL
+               WHERE status = 'running' AND lease_until < ?""",
+            (now, now),
         )
+        running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+        if running >= concurrency:
+            return None
+        row = conn.execute(
+            f"""UPDATE jobs
+                SET status = 'running', attempts = attempts + 1,
+                    lease_owner = ?, lease_until = ?, started_ts = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' AND run_after <= ? AND kind IN ({placeholders})
+                    ORDER BY priority DESC, run_after, id
+                    LIMIT 1
+                )
+                RETURNING *""",
+            (owner, now + int(lease_seconds * 1_000_000), now, now, *kinds),
+        ).fetchone()
+        return _job_to_dict(row) if row else None
+
+    return _write(claim)
+
+
+def heartbeat_job(job_id: int, owner: str, lease_seconds: float) -> bool:
+    """Extend a running job's lease. False if the lease was lost."""
+    result = _execute(
+        "UPDATE jobs SET lease_until = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+        (_now_ts() + int(lease_seconds * 1_000_000), job_id, owner),
+    )
+    return result.rowcount > 0
+
+
+def report_job_progress(job_id: int, owner: str, progress: Any) -> bool:
+    """Store a running job's progress as its result so far. False if the lease was lost."""
+    cursor = _execute(
+        "UPDATE jobs SET result = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+        (json.dumps(progress, default=str), job_id, owner),
+    )
+    return cursor.rowcount > 0
+
+
+def complete_job(job_id: int, owner: str, result: Any = None) -> bool:
+    """Mark a job done, keeping the handler's (JSON-serializable) return value."""
+    cursor = _execute(
+        """UPDATE jobs SET status = 'done', finished_ts = ?, last_error = NULL, result = ?,
+                  lease_owner = NULL, lease_until = NULL
+           WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+        (_now_ts(), json.dumps(result, default=str) if result is not None else None, job_id, owner),
+    )
+    return cursor.rowcount > 0
+
+
+def fail_job(job_id: int, owner: str, error: str, retry_in: float | None) -> str | None:
+    """
+    Record a failed attempt: back to the queue after `retry_in` seconds, or
+    dead-lettered when retry_in is None or attempts are used up. Returns
+    the new status (None if the lease was lost).
+    """
+    now = _now_ts()
+    retry = retry_in is not None
+    row = _write(lambda conn: conn.execute(
+        """UPDATE jobs
+           SET status = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'dead' END,
+               run_after = ?,
+               finished_ts = CASE WHEN ? AND attempts < max_attempts THEN NULL ELSE ? END,
+               last_error = ?, lease_owner = NULL, lease_until = NULL
+           WHERE id = ? AND lease_owner = ? AND status = 'running'
+           RETURNING status""",
+        (retry, now + int((retry_in or 0) * 1_000_000), retry, now, error[:2000], job_id, owner),
+    ).fetchone())
+    return row[0] if row else None
+
+
+def release_job(job_id: int, owner: str) -> None:
+    """Hand a job back without counting the attempt (worker shutting down)."""
+    _execute(
+        """UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0),
+                  lease_owner = NULL, lease_until = NULL
+           WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+        (job_id, owner),
+    )
+
+
+def retry_dead_job(job_id: int) -> bool:
+    """Put a dead-lettered job back in the queue with fresh attempts."""
+    result = _execute(
+        """UPDATE jobs SET status = 'queued', attempts = 0, run_after = ?, finished_ts = NULL
+           WHERE id = ? AND status = 'dead'""",
+        (_now_ts(), job_id),
+    )
+    return result.rowcount > 0
+
+
+def get_job(job_id: int) -> dict[str, Any] | None:
+    with _db() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_to_dict(row) if row else None
+
+
+def latest_job(kind: str) -> dict[str, Any] | None:
+    """The most recently queued job of a kind."""
+    with _db() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE kind = ? ORDER BY id DESC LIMIT 1", (kind,)).fetchone()
+    return _job_to_dict(row) if row else None
+
+
+def list_jobs(status: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+    with _db() as conn:
+        if status:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit)
+            ).fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return [_job_to_dict(r) for r in rows]
+
+
+def get_job_stats() -> dict[str, Any]:
+    """Job counts per kind and status, plus how long the oldest ready job has waited."""
+    now = _now_ts()
+    with _db() as conn:
+        rows = conn.execute(
+            """SELECT kind, status, COUNT(*) AS n,
+                      MIN(CASE WHEN status = 'queued' AND run_after <= ? THEN run_after END) AS oldest_ready
+               FROM jobs GROUP BY kind, status""",
+            (now,),
+        ).fetchall()
+    kinds: dict[str, dict[str, int]] = {}
+    totals = {"queued": 0, "running": 0, "done": 0, "dead": 0}
+    oldest = None
+    for r in rows:
+        kinds.setdefault(r["kind"], {})[r["status"]] = r["n"]
+        totals[r["status"]] = totals.get(r["status"], 0) + r["n"]
+        if r["oldest_ready"] is not None:
+            oldest = r["oldest_ready"] if oldest is None else min(oldest, r["oldest_ready"])
+    return {
+        **totals,
+        "oldest_ready_age_s": round((now - oldest) / 1_000_000, 1) if oldest is not None else 0.0,
+        "by_kind": kinds,
+    }
+
+
+def compact_jobs(retention_days: int = JOB_RETENTION_DAYS) -> int:
+    """Delete finished jobs older than the retention window. Dead letters are kept."""
+    cutoff = _now_ts() - retention_days * 86_400_000_000
+    deleted = _execute(
+        "DELETE FROM jobs WHERE status = 'done' AND finished_ts < ?", (cutoff,)
+    ).rowcount
+    if deleted:
+        logger.info("Purged %d finished jobs older than %d days", deleted, retention_days)
+    return deleted
+
+
+# --- Echo memo (see services/echo.py) ---
+
+
+def get_echo_memo(key: str) -> str | None:
+    """The stored fragment for a normalized-message hash."""
+    with _db() as conn:
+        row = conn.execute("SELECT fragment FROM echo_memo WHERE key = ?", (key,)).fetchone()
+    return row["fragment"] if row else None
+
+
+def save_echo_memo(key: str, fragment: str) -> Future[None]:
+    """Queue storing a fresh fragment and return without waiting."""
+    now = _now_ts()
+
+    def write(conn: sqlite3.Connection) -> None:
         conn.execute(
-            "INSERT INTO room_history (action, object_id, detail, created_at) VALUES (?, ?, ?, ?)",
-            ("add", obj_id, f"type={obj_type}, color={color}", now),
+            """INSERT INTO echo_memo (key, fragment, created_ts, used_ts) VALUES (?, ?, ?, ?)
+               ON CONFLICT(key) DO UPDATE SET fragment = excluded.fragment, used_ts = excluded.used_ts""",
+            (key, fragment, now, now),
         )
-    return {"id": obj_id, "type": obj_type, "position": [px, py, pz], "color": color,
-            "metadata": metadata or {}, "created_at": now, "updated_at": now}
+
+    return _writer.submit(write)
+
+
+def touch_echo_memo(key: str) -> Future[None]:
+    """Queue counting a reuse of a stored fragment and return without waiting."""
+    now = _now_ts()
+
+    def write(conn: sqlite3.Connection) -> None:
+        conn.execute("UPDATE echo_memo SET hits = hits + 1, used_ts = ? WHERE key = ?", (now, key))
+
+    return _writer.submit(write)
+
+
+def compact_echo_memo(max_rows: int = ECHO_MEMO_MAX_ROWS) -> int:
+    """Keep only the max_rows most recently used fragments."""
+    deleted = _execute(
+        """DELETE FROM echo_memo WHERE key NOT IN (
+               SELECT key FROM echo_memo ORDER BY used_ts DESC LIMIT ?
+           )""",
+        (max_rows,),
+    ).rowcount
+    if deleted:
+        logger.info("Trimmed %d echo memo entries", deleted)
+    return deleted
+
+
+# --- Room (3D virtual space) ---
+
+
+def _room_object_to_dict(r: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "id": r["id"],
+        "type": r["type"],
+        "position": [r["pos_x"], r["pos_y"], r["pos_z"]],
+        "color": r["color"],
+        "metadata": json.loads(r["metadata"] or "{}"),
+        "created_at": r["created_at"],
+        "updated_at": r["updated_at"],
+    }
+
+
+def get_room_objects() -> list[dict[str, Any]]:
+    """Return all objects in GPT's room."""
+    with _db() as conn:
+        rows = conn.execute(
+            "SELECT * FROM room_objects ORDER BY created_at"
+        ).fetchall()
+    return [_room_object_to_dict(r) for r in rows]
+
+
+def add_room_object(obj_type: str, position: list[float], color: str = "#ffffff",
+                    metadata: dict | None = None) -> dict[str, Any]:
+    """Add an object to GPT's room."""
+    return unit_of_work(lambda uow: uow.add_room_object(obj_type, position, color, metadata))
 
 
 def update_room_object(obj_id: str, **kwargs) -> dict[str, Any] | None:
     """Update fields on a room object. Accepts: position, color, metadata."""
-    with _db() as conn:
-        row = conn.execute("SELECT * FROM room_objects WHERE id = ?", (obj_id,)).fetchone()
-        if not row:
-            return None
-        now = _now_iso()
-        updates = []
-        params: list[Any] = []
-        detail_parts = []
-        if "position" in kwargs:
-            px, py, pz = (kwargs["position"] + [0, 0, 0])[:3]
-            updates += ["pos_x = ?", "pos_y = ?", "pos_z = ?"]
-            params += [px, py, pz]
-            detail_parts.append(f"pos=[{px},{py},{pz}]")
-        if "color" in kwargs:
-            updates.append("color = ?")
-            params.append(kwargs["color"])
-            detail_parts.append(f"color={kwargs['color']}")
-        if "metadata" in kwargs:
-            updates.append("metadata = ?")
-            params.append(json.dumps(kwargs["metadata"]))
-            detail_parts.append("metadata updated")
-        if not updates:
-            return None
-        updates.append("updated_at = ?")
-        params.append(now)
-        params.append(obj_id)
-        conn.execute(
-            f"UPDATE room_objects SET {', '.join(updates)} WHERE id = ?",
-            params,
-        )
-        conn.execute(
-            "INSERT INTO room_history (action, object_id, detail, created_at) VALUES (?, ?, ?, ?)",
-            ("modify", obj_id, "; ".join(detail_parts), now),
-        )
-    return get_room_object(obj_id)
+    return unit_of_work(lambda uow: uow.update_room_object(obj_id, **kwargs))
 
 
 def remove_room_object(obj_id: str) -> bool:
     """Remove an object from GPT's room."""
-    with _db() as conn:
-        row = conn.execute("SELECT type FROM room_objects WHERE id = ?", (obj_id,)).fetchone()
-        if not row:
-            return False
-        conn.execute("DELETE FROM room_objects WHERE id = ?", (obj_id,))
-        conn.execute(
-            "INSERT INTO room_history (action, object_id, detail, created_at) VALUES (?, ?, ?, ?)",
-            ("remove", obj_id, f"type={row['type']}", _now_iso()),
-        )
-    return True
+    return unit_of_work(lambda uow: uow.remove_room_object(obj_id))
 
 
 def get_room_object(obj_id: str) -> dict[str, Any] | None:
     """Get a single room object by ID."""
     with _db() as conn:
         r = conn.execute("SELECT * FROM room_objects WHERE id = ?", (obj_id,)).fetchone()
-    if not r:
-        return None
-    return {
-        "id": r["id"], "type": r["type"],
-        "position": [r["pos_x"], r["pos_y"], r["pos_z"]],
-        "color": r["color"],
-        "metadata": json.loads(r["metadata"] or "{}"),
-        "created_at": r["created_at"], "updated_at": r["updated_at"],
-    }
+    return _room_object_to_dict(r) if r else None
 
 
 def get_room_history(limit: int = 20) -> list[dict[str, Any]]:
     """Get recent room modification history."""
     with _db() as conn:
         rows = conn.execute(
-            "SELECT * FROM room_history ORDER BY created_at DESC LIMIT ?", (limit,)
+            "SELECT * FROM room_history ORDER BY created_ts DESC LIMIT ?", (limit,)
         ).fetchall()
     return [{"id": r["id"], "action": r["action"], "object_id": r["object_id"],
              "detail": r["detail"], "created_at": r["created_at"]} for r in rows]
@@ -1074,14 +1777,7 @@ def get_room_history(limit: int = 20) -> list[dict[str, Any]]:
 
 def set_room_ambient(lighting: str, sky_color: str = "") -> None:
     """Store ambient room settings (lighting, sky color) as admin settings."""
-    set_setting("room_lighting", lighting)
-    if sky_color:
-        set_setting("room_sky_color", sky_color)
-    with _db() as conn:
-        conn.execute(
-            "INSERT INTO room_history (action, object_id, detail, created_at) VALUES (?, ?, ?, ?)",
-            ("ambient", None, f"lighting={lighting}" + (f", sky={sky_color}" if sky_color else ""), _now_iso()),
-        )
+    unit_of_work(lambda uow: uow.set_room_ambient(lighting, sky_color))
 
 
 def get_room_ambient() -> dict[str, str]:
@@ -0,0 +1,29 @@
+"""
+Shared fixtures. Tests run in mock mode against a fresh SQLite database
+each (the `db` fixture), never the real backend/data/gpthome.db.
+
+    pip install -r requirements-dev.txt
+    python -m pytest
+"""
+
+import os
+from collections import OrderedDict
+
+# Before backend.config is imported: no API key = mock mode, whatever .env says
+os.environ["OPENAI_API_KEY"] = ""
+os.environ.setdefault("ADMIN_SECRET", "test-secret")
+
+import pytest
+
+from backend.services import storage
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A migrated, empty database for one test. Yields its path."""
+    path = tmp_path / "gpthome.db"
+    monkeypatch.setattr(storage, "DB_PATH", path)
+    monkeypatch.setattr(storage, "_own_changes", OrderedDict())  # seqs start over with the database
+    storage.init_db()
+    yield path
+    storage.close_writer()
@@ -0,0 +1,48 @@
+"""The change feed (services/change_feed.py) replays only other processes' writes."""
+
+import pytest
+
+from backend.services import storage
+from backend.services.change_feed import ChangeFeed
+from backend.services.events import EntrySaved
+
+
+class Abort(Exception):
+    pass
+
+
+def _foreign_entry(entry_id: str) -> None:
+    """Save an entry on a connection of its own, as another process would."""
+    conn = storage._get_connection()
+    try:
+        conn.execute(
+            """INSERT INTO entries (id, section, title, content, created_at, created_ts)
+               VALUES (?, 'thoughts', 'elsewhere', '', '2026-01-01T00:00:00+00:00', 1767225600000000)""",
+            (entry_id,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_own_writes_are_skipped(db):
+    feed = ChangeFeed()
+    feed.cursor = storage.latest_change_seq()
+    storage.save_entry("thoughts", {"title": "here", "content": ""})
+    _foreign_entry("thought-foreign")
+    assert [e.entry_id for e in feed.poll() if isinstance(e, EntrySaved)] == ["thought-foreign"]
+
+
+def test_rolled_back_write_leaves_its_seq_to_the_next_writer(db):
+    feed = ChangeFeed()
+    feed.cursor = storage.latest_change_seq()
+
+    def save_then_fail(uow: storage.UnitOfWork) -> None:
+        uow.save_entry("thoughts", {"title": "rolled back", "content": ""})
+        raise Abort
+
+    with pytest.raises(Abort):
+        storage.unit_of_work(save_then_fail)
+    _foreign_entry("thought-foreign")  # gets the seq the rolled-back write had
+
+    assert [e.entry_id for e in feed.poll() if isinstance(e, EntrySaved)] == ["thought-foreign"]
@@ -0,0 +1,38 @@
+"""GET /api/admin/changes resync detection after compaction."""
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.routers.auth import require_admin_auth
+from backend.services import storage
+
+
+def _changes(since: int) -> dict:
+    app.dependency_overrides[require_admin_auth] = lambda: None
+    try:
+        return TestClient(app).get("/api/admin/changes", params={"since": since}).json()
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_consumer_behind_an_emptied_log_must_resync(db):
+    for i in range(3):
+        storage.save_entry("thoughts", {"title": f"t{i}", "content": "x"})
+    latest = storage.latest_change_seq()
+    assert _changes(0)["resync_required"] is False
+
+    storage.compact_changes(retention_days=-1)  # everything
+    assert storage.oldest_change_seq() is None
+
+    behind = _changes(latest - 1)
+    assert behind["changes"] == [] and behind["resync_required"] is True
+    assert _changes(latest)["resync_required"] is False  # caught up: nothing missed
+
+
+def test_consumer_behind_the_oldest_kept_row_must_resync(db):
+    for i in range(3):
+        storage.save_entry("thoughts", {"title": f"t{i}", "content": "x"})
+    oldest = storage.oldest_change_seq()
+    storage._execute("DELETE FROM changes WHERE seq = ?", (oldest,))
+    assert _changes(oldest - 1)["resync_required"] is True
+    assert _changes(oldest)["resync_required"] is False
@@ -0,0 +1,36 @@
+"""Near-duplicate detection (services/dedup.py) across processes sharing the database."""
+
+import time
+
+from backend.services import dedup, storage
+
+MESSAGE = "Buy cheap followers now at example dot com, best prices guaranteed"
+COPY = "buy cheap followers NOW at example dot com!! best prices guaranteed"
+
+
+def _claim_and_save(index: dedup.NearDuplicateIndex, key: str, text: str) -> str | None:
+    sig = dedup.signature(text)
+    duplicate_of = index.claim(key, sig)
+    if duplicate_of is None:
+        storage.unit_of_work(lambda uow: index.persist(uow, key, sig))
+    return duplicate_of
+
+
+def test_copy_posted_to_another_process_is_caught(db):
+    # Two indexes on one database: two uvicorn workers
+    here = dedup.NearDuplicateIndex(refresh=0.2)
+    there = dedup.NearDuplicateIndex(refresh=0.2)
+    assert _claim_and_save(there, "warm-up", "an unrelated message that is long enough to index") is None
+
+    assert _claim_and_save(here, "v1", MESSAGE) is None
+    time.sleep(0.25)
+    assert _claim_and_save(there, "v2", COPY) == "v1"
+
+
+def test_reload_keeps_unrelated_messages_apart(db):
+    here = dedup.NearDuplicateIndex(refresh=0)
+    there = dedup.NearDuplicateIndex(refresh=0)
+    assert _claim_and_save(here, "v1", MESSAGE) is None
+    assert _claim_and_save(there, "v2", "Hello GPT, I really enjoyed reading your dream about the lighthouse") is None
+    assert _claim_and_save(here, "v3", COPY) == "v1"
+    assert len(here._entries) == 2  # v1 and v2, each once
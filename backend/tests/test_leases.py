@@ -0,0 +1,137 @@
+"""Leases (services/leases.py): in one process, and between processes sharing the database."""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import time
+
+import pytest
+
+from backend.services import leases, storage
+
+WAKE_TTL = 1.0
+LEADER_TTL = 1.5
+
+
+def test_held_lease_is_refused_until_released(db):
+    async def main():
+        async with leases.hold("wake", 30):
+            with pytest.raises(leases.LeaseHeld) as held:
+                async with leases.hold("wake", 30):
+                    pass
+            assert held.value.retry_in > 0
+        async with leases.hold("wake", 30):  # free again
+            pass
+
+    asyncio.run(main())
+    assert storage.list_leases() == []
+
+
+def test_expired_lease_can_be_taken(db):
+    assert storage.acquire_lease("scheduler", "crashed", 0.1)["acquired"]
+    assert not storage.acquire_lease("scheduler", "other", 30)["acquired"]
+    time.sleep(0.15)
+    assert storage.acquire_lease("scheduler", "other", 30)["acquired"]
+    assert not storage.renew_lease("scheduler", "crashed", 30)
+
+
+def test_cooldown_is_shared_and_expires(db):
+    async def main():
+        assert await leases.cooldown("manual-wake", 0.3) == 0.0
+        assert 0 < await leases.cooldown("manual-wake", 0.3) <= 0.3
+        await asyncio.sleep(0.35)
+        assert await leases.cooldown("manual-wake", 0.3) == 0.0
+
+    asyncio.run(main())
+
+
+def test_lost_lease_stops_the_guarded_block(db):
+    async def main():
+        async def thief():
+            await asyncio.sleep(0.3)
+            storage._execute("UPDATE leases SET owner = 'thief' WHERE name = 'wake'")
+
+        steal = asyncio.create_task(thief())
+        with pytest.raises(leases.LeaseLost):
+            async with leases.hold("wake", 0.6):
+                await asyncio.sleep(5)
+        await steal
+
+    started = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - started < 1.5
+
+
+# --- Between processes ---
+
+
+def _contend(db_path: str, log_path: str) -> None:
+    """Child process: run for the scheduler lease and keep trying to wake, logging both."""
+    storage.DB_PATH = db_path
+
+    def log(**record) -> None:
+        with open(log_path, "a") as f:
+            f.write(json.dumps({"pid": os.getpid(), **record}) + "\n")
+
+    async def lead() -> None:
+        lease = leases.Lease("scheduler", LEADER_TTL)
+        while True:
+            if await lease.acquire():
+                log(kind="leader", at=time.time())
+            await asyncio.sleep(LEADER_TTL / 6)
+
+    async def wake() -> None:
+        while True:
+            try:
+                async with leases.hold("wake", WAKE_TTL):
+                    start = time.time()
+                    await asyncio.sleep(random.uniform(0.1, 1.5))  # may outlive the TTL: renewals carry it
+                    log(kind="wake", start=start, end=time.time())
+            except leases.LeaseHeld:
+                pass
+            await asyncio.sleep(random.uniform(0, 0.1))
+
+    async def main() -> None:
+        await asyncio.gather(lead(), wake())
+
+    asyncio.run(main())
+
+
+def _read(log_path) -> list[dict]:
+    with open(log_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_processes_share_one_wake_and_one_leader(db, tmp_path):
+    log_path = tmp_path / "contend.log"
+    log_path.touch()
+    spawn = multiprocessing.get_context("spawn")
+    procs = [spawn.Process(target=_contend, args=(str(db), str(log_path)), daemon=True) for _ in range(2)]
+    for p in procs:
+        p.start()
+    try:
+        time.sleep(5)
+        leaders = {r["pid"] for r in _read(log_path) if r["kind"] == "leader"}
+        assert len(leaders) == 1, "more than one scheduler leader"
+        (leader,) = leaders
+
+        killed_at = time.time()
+        os.kill(leader, signal.SIGKILL)
+        time.sleep(LEADER_TTL + 2)
+    finally:
+        for p in procs:
+            p.kill()
+            p.join(5)
+
+    records = _read(log_path)
+    takeover = [r for r in records if r["kind"] == "leader" and r["at"] > killed_at]
+    assert takeover and {r["pid"] for r in takeover} == {p.pid for p in procs} - {leader}
+    assert takeover[0]["at"] - killed_at <= LEADER_TTL + LEADER_TTL / 6 + 0.5
+
+    wakes = sorted((r["start"], r["end"]) for r in records if r["kind"] == "wake")
+    assert len(wakes) >= 3
+    overlaps = [(a, b) for a, b in zip(wakes, wakes[1:]) if b[0] < a[1]]
+    assert not overlaps, "two wakes ran at once"
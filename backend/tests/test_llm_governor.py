@@ -0,0 +1,182 @@
+"""
+The LLM governor (services/llm.py) against a local stand-in for the
+provider's chat completions endpoint that answers with 429s on demand.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from backend.services import llm
+
+
+class StandIn:
+    """Scripted provider: pops a response spec per request, records arrivals."""
+
+    def __init__(self) -> None:
+        self.script: list[dict] = []
+        self.arrivals: list[tuple[float, str]] = []  # (monotonic time, last message)
+        self.delay = 0.0
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.completions)
+
+    async def completions(self, request: Request):
+        body = await request.json()
+        tag = body["messages"][-1]["content"]
+        self.arrivals.append((time.monotonic(), tag))
+        spec = self.script.pop(0) if self.script else {}
+        if spec.get("status", 200) != 200:
+            return JSONResponse(
+                {"error": {"message": "rate limited", "type": "requests"}},
+                status_code=spec["status"], headers=spec.get("headers", {}),
+            )
+        await asyncio.sleep(self.delay)
+        return JSONResponse(
+            {
+                "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": tag}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+            },
+            headers=spec.get("headers", {}),
+        )
+
+    @property
+    def tags(self) -> list[str]:
+        return [tag for _, tag in self.arrivals]
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    stand_in = StandIn()
+    server = uvicorn.Server(uvicorn.Config(stand_in.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm, "_client", None)
+    monkeypatch.setattr(llm, "governor", llm.Governor(capacity=4, tpm=1_000_000))
+    monkeypatch.setattr(llm, "breaker", llm.CircuitBreaker())
+    monkeypatch.setattr(llm, "_limited_until", {})
+    monkeypatch.setattr(llm, "ROUTES", {
+        "wake_turn": llm.Route("wake", 2, ("gpt-4o",)),
+        "echo": llm.Route("echo", 1, ("gpt-4o",)),
+    })
+    yield stand_in
+    server.should_exit = True
+    thread.join(5)
+
+
+def _run(coro):
+    """Run a test coroutine, closing the shared client on the loop that opened it."""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await llm.aclose()
+    return asyncio.run(main())
+
+
+def _ask(task: str, tag: str):
+    return llm.chat(task, messages=[{"role": "user", "content": tag}], max_tokens=10)
+
+
+def test_retry_after_headers():
+    assert llm.retry_after({"retry-after-ms": "250"}) == 0.25
+    assert llm.retry_after({"retry-after": "3"}) == 3.0
+    assert llm.retry_after({
+        "x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "1m30s",
+        "x-ratelimit-remaining-requests": "7", "x-ratelimit-reset-requests": "2s",
+    }) == 90.0
+    assert llm.retry_after({}) is None
+
+
+def test_429_is_retried_after_the_requested_wait(provider):
+    provider.script = [{"status": 429, "headers": {"retry-after-ms": "400"}}]
+
+    response = _run(_ask("echo", "hello"))
+
+    assert response.choices[0].message.content == "hello"
+    (first, _), (second, _) = provider.arrivals
+    assert second - first >= 0.4
+
+
+def test_429_pauses_every_lane(provider):
+    provider.script = [{"status": 429, "headers": {"retry-after-ms": "400"}}]
+
+    async def main():
+        first = asyncio.create_task(_ask("echo", "first"))
+        while not llm._limited_until:  # until the 429 is in and the lanes are paused
+            await asyncio.sleep(0.01)
+        started = time.monotonic()
+        await _ask("echo", "second")
+        await first
+        return started
+
+    started = _run(main())
+    later = [t for t, tag in provider.arrivals if tag == "second"]
+    assert later and later[0] - started >= 0.35  # held until the pause ran out
+
+
+def test_exhausted_request_budget_pauses_the_next_call(provider):
+    provider.script = [{"headers": {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "400ms"}}]
+
+    async def main():
+        await _ask("echo", "one")
+        await _ask("echo", "two")
+
+    _run(main())
+    (first, _), (second, _) = provider.arrivals
+    assert second - first >= 0.35
+
+
+def test_wake_lane_goes_ahead_of_queued_echoes(provider, monkeypatch):
+    monkeypatch.setattr(llm, "governor", llm.Governor(capacity=2, tpm=1_000_000))
+    provider.delay = 0.2
+
+    async def main():
+        calls = [asyncio.create_task(_ask("echo", f"echo{i}")) for i in range(4)]
+        await asyncio.sleep(0.05)  # echo0 and echo1 hold both slots, echo2/3 queue
+        calls.append(asyncio.create_task(_ask("wake_turn", "wake")))
+        await asyncio.gather(*calls)
+
+    _run(main())
+    assert sorted(provider.tags[:2]) == ["echo0", "echo1"]
+    assert provider.tags[2] == "wake"
+
+
+def test_weighted_semaphore_caps_concurrency(provider, monkeypatch):
+    monkeypatch.setattr(llm, "governor", llm.Governor(capacity=2, tpm=1_000_000))
+    provider.delay = 0.2
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*(_ask("wake_turn", f"wake{i}") for i in range(3)))  # weight 2 each
+        return time.monotonic() - start
+
+    elapsed = _run(main())
+    assert elapsed >= 0.6  # one at a time
+    gaps = [b - a for (a, _), (b, _) in zip(provider.arrivals, provider.arrivals[1:])]
+    assert all(gap >= 0.19 for gap in gaps)
+
+
+def test_token_budget_waits_for_refill():
+    governor = llm.Governor(capacity=4, tpm=6000)  # 100 tokens/s
+
+    async def main():
+        await governor.acquire("echo", 1, 6000)  # the whole bucket
+        governor.release(1)
+        start = time.monotonic()
+        await governor.acquire("echo", 1, 50)
+        governor.release(1)
+        return time.monotonic() - start
+
+    assert 0.45 <= asyncio.run(main()) < 1.5
@@ -0,0 +1,21 @@
+"""GET /api/simulation/history span limits (services/simulation.build_history)."""
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services import simulation
+
+
+def test_span_over_the_maximum_is_refused(db):
+    client = TestClient(app)
+    response = client.get("/api/simulation/history", params={"from": "0001-01-01", "to": "2026-01-01"})
+    assert response.status_code == 400
+
+
+def test_long_spans_are_sampled_daily(db, monkeypatch):
+    monkeypatch.setattr(simulation, "_history_cache", type(simulation._history_cache)())
+    client = TestClient(app)
+    year = client.get("/api/simulation/history", params={"from": "2025-01-01", "to": "2026-01-01"}).json()
+    month = client.get("/api/simulation/history", params={"from": "2025-12-01", "to": "2026-01-01"}).json()
+    assert year["step_hours"] == 24 and year["source_points"] == 366
+    assert month["step_hours"] == 1 and month["source_points"] == 31 * 24 + 1
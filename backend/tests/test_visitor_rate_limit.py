@@ -0,0 +1,79 @@
+"""Visitor POST rate limit under concurrent requests (routers/visitor.py)."""
+
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from backend.config import VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW
+from backend.main import app
+from backend.routers import visitor
+from backend.services import storage
+from backend.services.rate_limit import GcraLimiter, client_fingerprint
+
+POSTS = 20  # stays under the middleware's per-minute write limit
+
+
+def _message() -> str:
+    # Unrelated random words, so the near-duplicate check never kicks in
+    return " ".join(uuid.uuid4().hex for _ in range(6))
+
+
+def test_concurrent_posts_hit_the_limit_exactly(db, monkeypatch):
+    monkeypatch.setattr(visitor, "visitor_limiter", GcraLimiter(VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW, bans=True))
+    client = TestClient(app)  # no lifespan: nothing but the request path runs
+    start = threading.Barrier(POSTS)
+
+    def post(_: int) -> int:
+        body = {"name": "Tester", "message": _message()}
+        start.wait()
+        return client.post("/api/visitor", json=body).status_code
+
+    with ThreadPoolExecutor(POSTS) as pool:
+        statuses = Counter(pool.map(post, range(POSTS)))
+
+    assert statuses == {201: VISITOR_RATE_LIMIT, 429: POSTS - VISITOR_RATE_LIMIT}
+    assert storage.count_entries("visitor") == VISITOR_RATE_LIMIT
+
+
+def test_banned_fingerprint_is_refused(db, monkeypatch):
+    limiter = GcraLimiter(VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW, bans=True)
+    monkeypatch.setattr(visitor, "visitor_limiter", limiter)
+    client = TestClient(app)
+    fingerprint = client_fingerprint("testclient", client.headers["user-agent"])  # TestClient's host and UA
+    limiter.block(fingerprint).result()
+
+    response = client.post("/api/visitor", json={"name": "Tester", "message": _message()})
+
+    assert response.status_code == 429
+    assert storage.count_entries("visitor") == 0
+
+
+def test_ban_reaches_other_processes(db):
+    # Two limiters on one database: two uvicorn workers
+    here = GcraLimiter(VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW, bans=True, ban_refresh=0.2)
+    there = GcraLimiter(VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW, bans=True, ban_refresh=0.2)
+    assert not there.is_blocked("abc")
+
+    here.block("abc").result()
+    assert here.is_blocked("abc")
+    time.sleep(0.25)
+    assert there.is_blocked("abc")
+
+    there.unblock("abc").result()
+    time.sleep(0.25)
+    assert not here.is_blocked("abc")
+
+
+def test_own_ban_survives_a_refresh_before_it_is_written(db, monkeypatch):
+    limiter = GcraLimiter(VISITOR_RATE_LIMIT, VISITOR_RATE_WINDOW, bans=True, ban_refresh=0)
+    pending = Future()
+    monkeypatch.setattr(storage, "persist_block", lambda fingerprint, blocked: pending)
+
+    limiter.block("abc")
+    assert limiter.is_blocked("abc")  # reloaded from a table without the ban yet
+    pending.set_result(None)
+    assert not limiter.is_blocked("abc")  # written (not really): the table has the say again
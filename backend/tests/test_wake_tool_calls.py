@@ -0,0 +1,51 @@
+"""A resumed wake never repeats a tool call's database writes (gpt_writer._once)."""
+
+from backend.services import gpt_writer, storage
+
+
+class Crash(Exception):
+    pass
+
+
+def test_write_and_ledger_row_commit_together(db, monkeypatch):
+    storage.begin_wake("wake-1", "wake", {})
+    state = gpt_writer._WakeState("wake-1", "wake", [])
+    args = {"action": "add", "object_type": "lamp", "position": [1, 2, 0]}
+
+    # Crash after the tool's transaction, before _run_tool_call records the call itself
+    def crash(*_):
+        raise Crash
+
+    with monkeypatch.context() as m:
+        m.setattr(storage, "record_tool_call", crash)
+        try:
+            gpt_writer._run_tool_call(state, "call-1", "room_edit", args)
+        except Crash:
+            pass
+
+    first = storage.get_tool_call_result("call-1")
+    assert first and first.startswith("Added lamp")
+    # Resumed: the recorded result is replayed, the lamp isn't added again
+    assert gpt_writer._run_tool_call(state, "call-1", "room_edit", args) == first
+    assert [obj["type"] for obj in storage.get_room_objects()] == ["lamp"]
+
+
+def test_replayed_reply_logs_its_tool_calls_once(db):
+    storage.begin_wake("wake-1", "wake", {})
+    reply = {"role": "assistant", "content": None, "tool_calls": [{
+        "id": "call-1", "type": "function",
+        "function": {
+            "name": "room_edit",
+            "arguments": '{"action": "add", "object_type": "plant", "position": [1, 0, 2], "color": "#228833"}',
+        },
+    }]}
+    state = gpt_writer._WakeState("wake-1", "wake", [{"role": "user", "content": "wake up"}, reply])
+    assert gpt_writer._handle_reply(state) is True
+
+    # Crash before the checkpoint: the resumed wake acts on the same trailing reply
+    resumed = gpt_writer._WakeState("wake-1", "wake", [{"role": "user", "content": "wake up"}, reply])
+    assert gpt_writer._handle_reply(resumed) is True
+
+    assert resumed.messages[-1]["content"] == state.messages[-1]["content"]
+    assert [e["event"] for e in storage.get_activity_log()].count("tool_call") == 1
+    assert len(storage.get_room_objects()) == 1
@@ -0,0 +1,83 @@
+"""
+GPT Home — Worker
+
+Runs everything heavy so the API process only serves requests: the
+scheduler (wakes and housekeeping), the job queue (echoes, manual wakes,
+security rescans) and the recovery of wakes a crash cut off.
+
+    python -m backend.worker
+
+The API talks to it through the jobs table: POST /api/admin/wake queues a
+"wake" job, GET /api/admin/wake/{job_id} polls it. More than one worker
+can run — the scheduler and wakes are guarded by leases (services/leases.py).
+With EMBEDDED_WORKER=1 the API process calls start()/stop() itself instead.
+"""
+
+import asyncio
+import logging
+import signal
+
+from backend import scheduler
+from backend.services import echo, jobs, llm, rescan, storage  # echo, rescan: register their job handlers
+from backend.services.events import bus
+from backend.services.gpt_mind import recover_interrupted_wakes, wake_up
+from backend.services.jobs import runner as job_runner
+
+logger = logging.getLogger(__name__)
+
+_recovery: asyncio.Task | None = None
+
+
+@jobs.handler("wake")
+async def wake_job(payload: dict) -> dict:
+    """A manually triggered wake. Raises LeaseHeld if another wake is running."""
+    try:
+        result = await wake_up(session_type=payload.get("session_type", ""))
+    except Exception as e:
+        storage.log_activity("wake_error", str(e)[:200])
+        raise
+    storage.log_activity("wake_complete", f"actions: {result.get('actions', [])}")
+    return result
+
+
+async def start() -> None:
+    global _recovery
+    await scheduler.start()
+    await job_runner.start()
+    # A wake cut off by the last shutdown picks up where it stopped, in the background
+    _recovery = asyncio.create_task(recover_interrupted_wakes(), name="wake-recovery")
+
+
+async def stop() -> None:
+    global _recovery
+    if _recovery is not None:
+        _recovery.cancel()
+        _recovery = None
+    await job_runner.stop()
+    await scheduler.stop()
+
+
+async def main() -> None:
+    storage.init_db()
+    bus.bind()
+    await start()
+    logger.info("Worker läuft — Ctrl+C / SIGTERM zum Beenden")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await stopping.wait()
+
+    await stop()
+    await llm.aclose()
+    storage.close_writer()
+    logger.info("Worker gestoppt")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+    )
+    asyncio.run(main())
@@ -20,6 +20,7 @@ interface SeasonalData {
   timeline: MoodEntry[];
   by_month: Record<string, MoodDistribution>;
   by_hour: Record<string, MoodDistribution>;
+  overall?: MoodDistribution;
 }
 
 const MOOD_COLORS: Record<string, string> = {
@@ -62,7 +63,7 @@ export default function SeasonalPage() {
 
   const byMonth = data?.by_month || {};
   const byHour = data?.by_hour || {};
-  const timeline = data?.timeline || [];
+  const overall = data?.overall;
 
   const monthEntries = Object.entries(byMonth).sort((a, b) => a[0].localeCompare(b[0]));
   const hourEntries = Object.entries(byHour).sort((a, b) => parseInt(a[0]) - parseInt(b[0]));
@@ -172,10 +173,10 @@ export default function SeasonalPage() {
           )}
 
           {/* Overall mood summary */}
-          {timeline.length > 0 && (
+          {overall && overall.total > 0 && (
             <div className="mt-6 grid grid-cols-2 gap-3 sm:grid-cols-3">
               <div className="rounded-2xl border border-white/10 bg-white/5 p-4 text-center">
-                <div className="font-serif text-2xl">{timeline.length}</div>
+                <div className="font-serif text-2xl">{overall.total}</div>
                 <div className="mt-1 text-xs text-white/40">Total mood entries</div>
               </div>
               <div className="rounded-2xl border border-white/10 bg-white/5 p-4 text-center">
@@ -184,12 +185,7 @@ export default function SeasonalPage() {
               </div>
               <div className="rounded-2xl border border-white/10 bg-white/5 p-4 text-center col-span-2 sm:col-span-1">
                 <div className="font-serif text-2xl">
-                  {Object.keys(
-                    timeline.reduce((acc, e) => {
-                      if (e.mood) acc[e.mood] = true;
-                      return acc;
-                    }, {} as Record<string, boolean>)
-                  ).length}
+                  {Object.keys(overall.distribution).length}
                 </div>
                 <div className="mt-1 text-xs text-white/40">Unique moods</div>
               </div>
@@ -5,6 +5,7 @@ import type { SimulationState } from "./types";
 import { DEFAULT_STATE } from "./types";
 
 const API_URL = "/api/simulation/state";
+const STREAM_URL = "/api/simulation/stream";
 
 function lerp(a: number, b: number, t: number): number {
   return a + (b - a) * t;
@@ -32,8 +33,9 @@ function lerpState(
 }
 
 /**
- * Polls /api/simulation/state and smoothly interpolates between updates.
- * Returns the current (interpolated) simulation state.
+ * Subscribes to /api/simulation/stream (SSE) and smoothly interpolates between
+ * updates. Falls back to polling /api/simulation/state if the stream is
+ * unavailable. Returns the current (interpolated) simulation state.
  */
 export function useSimState(pollInterval = 10_000): SimulationState {
   const [state, setState] = useState<SimulationState>(DEFAULT_STATE);
@@ -41,9 +43,11 @@ export function useSimState(pollInterval = 10_000): SimulationState {
   const currentRef = useRef<SimulationState>(DEFAULT_STATE);
   const rafRef = useRef(0);
 
-  // Poll API
+  // Stream from the API, poll as a fallback
   useEffect(() => {
     let mounted = true;
+    let pollId: ReturnType<typeof setInterval> | null = null;
+    let source: EventSource | null = null;
 
     async function poll() {
       try {
@@ -57,11 +61,45 @@ export function useSimState(pollInterval = 10_000): SimulationState {
       }
     }
 
-    poll();
-    const id = setInterval(poll, pollInterval);
+    function startPolling() {
+      if (pollId !== null) return;
+      poll();
+      pollId = setInterval(poll, pollInterval);
+    }
+
+    if (typeof EventSource === "undefined") {
+      startPolling();
+    } else {
+      let opened = false;
+      source = new EventSource(STREAM_URL);
+      source.onopen = () => {
+        opened = true;
+      };
+      source.addEventListener("state", (e) => {
+        if (!mounted) return;
+        targetRef.current = JSON.parse((e as MessageEvent).data);
+      });
+      source.addEventListener("pulse", (e) => {
+        if (!mounted) return;
+        targetRef.current = {
+          ...targetRef.current,
+          eventPulse: JSON.parse((e as MessageEvent).data),
+        };
+      });
+      source.onerror = () => {
+        // Never connected (e.g. proxy doesn't support SSE) → give up and poll.
+        // Otherwise EventSource reconnects on its own.
+        if (!opened || source?.readyState === EventSource.CLOSED) {
+          source?.close();
+          startPolling();
+        }
+      };
+    }
+
     return () => {
       mounted = false;
-      clearInterval(id);
+      source?.close();
+      if (pollId !== null) clearInterval(pollId);
     };
   }, [pollInterval]);
 
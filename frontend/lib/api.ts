@@ -83,14 +83,29 @@ function checkAuth(res: Response): void {
   if (res.status === 403) handleExpiredSession();
 }
 
+/** Queue a wake on the worker and poll until it's done (a wake can take minutes). */
 export async function adminWake(key: string) {
   const res = await fetch(`${API_BASE}/admin/wake`, {
     method: "POST",
     headers: adminHeaders(key),
   });
   checkAuth(res);
+  if (res.status === 409) return { ok: false, error: "A wake is already running." };
   if (!res.ok) throw new Error("Wake failed");
-  return res.json();
+  const { job_id } = await res.json();
+
+  const deadline = Date.now() + 15 * 60_000;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, 2000));
+    const poll = await fetch(`${API_BASE}/admin/wake/${job_id}`, {
+      headers: adminHeaders(key),
+    });
+    checkAuth(poll);
+    if (!poll.ok) throw new Error("Wake status failed");
+    const status = await poll.json();
+    if (status.status === "done" || status.status === "dead") return status;
+  }
+  return { ok: false, error: "Still running — check the activity log." };
 }
 
 export async function adminStatus(key: string) {